@@ -11,6 +11,12 @@ python manage.py collectstatic --no-input
 # Apply any outstanding database migrations
 python manage.py migrate
 
+# Reconstruir el resumen financiero precalculado
+python manage.py reconstruir_resumen_financiero
+
+# Reconstruir el resumen diario de asistencia precalculado
+python manage.py reconstruir_resumen_asistencia
+
 
 #creacion de usuario admin 
 #export DJANGO_SUPERUSER_USERNAME=admin
@@ -6,7 +6,7 @@ from django.utils.safestring import mark_safe
 from .models import (
     CustomUser, CicloLectivo, Curso, Alumno, Familiar,
     RegistroAsistenciaMaestro, RegistroRetiroAlumno, CuotaCurso, PagoCuota,
-    ConfiguracionSistema
+    ConfiguracionSistema, ResumenFinancieroMensual, PoliticaRecargo
 )
 
 
@@ -133,6 +133,16 @@ class ConfiguracionSistemaAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(PoliticaRecargo)
+class PoliticaRecargoAdmin(admin.ModelAdmin):
+    list_display = ('monto_fijo', 'porcentaje_diario', 'tope', 'fecha_actualizacion', 'actualizado_por')
+    readonly_fields = ('fecha_actualizacion', 'actualizado_por')
+    
+    def save_model(self, request, obj, form, change):
+        obj.actualizado_por = request.user
+        super().save_model(request, obj, form, change)
+
+
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'dni', 'rol_badges', 'is_active')
@@ -334,13 +344,30 @@ class CuotaCursoAdmin(admin.ModelAdmin):
         return meses[obj.mes]
     mes_nombre.short_description = 'Mes'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('curso', 'resumen_financiero')
+    
+    def _resumen(self, obj):
+        try:
+            return obj.resumen_financiero
+        except ResumenFinancieroMensual.DoesNotExist:
+            return None
+    
     def pagos_realizados(self, obj):
+        resumen = self._resumen(obj)
+        if resumen is not None:
+            return resumen.pagos_realizados
         return obj.pagos.count()
     pagos_realizados.short_description = 'Pagos'
     
     def estado_cobranza(self, obj):
-        pagos = obj.pagos.count()
-        alumnos = obj.curso.alumnos_inscriptos
+        resumen = self._resumen(obj)
+        if resumen is not None:
+            pagos = resumen.pagos_realizados
+            alumnos = resumen.alumnos_inscriptos
+        else:
+            pagos = obj.pagos.count()
+            alumnos = obj.curso.alumnos_inscriptos
         if alumnos == 0:
             return format_html('<span style="color: gray;">Sin alumnos</span>')
         
@@ -0,0 +1,144 @@
+"""
+Eventos en vivo (server-sent events) de los avisos a directivos.
+
+El difusor en memoria reparte cada evento a las conexiones abiertas del mismo
+proceso: alcanza para los tests y para un único nodo ASGI. Con varios procesos
+cada uno solo ve los eventos publicados por él mismo.
+"""
+import asyncio
+import json
+import threading
+
+from django.core import signing
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class DifusorEnMemoria:
+    """Reparte los eventos publicados a todas las suscripciones abiertas"""
+
+    def __init__(self, tamaño_cola=100):
+        self.tamaño_cola = tamaño_cola
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+        self._ultimo_id = 0
+
+    def suscribir(self):
+        """Registra una cola en el loop actual; debe llamarse desde código async"""
+        suscripcion = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.tamaño_cola))
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    @property
+    def cantidad_suscripciones(self):
+        return len(self._suscripciones)
+
+    def publicar(self, evento, datos):
+        """Publica un evento; puede llamarse desde cualquier hilo"""
+        with self._lock:
+            self._ultimo_id += 1
+            mensaje = {'id': self._ultimo_id, 'evento': evento, 'datos': datos}
+            suscripciones = list(self._suscripciones)
+
+        for suscripcion in suscripciones:
+            loop, cola = suscripcion
+            try:
+                loop.call_soon_threadsafe(self._encolar, cola, mensaje)
+            except RuntimeError:
+                # El loop de la conexión ya se cerró
+                self.desuscribir(suscripcion)
+        return mensaje
+
+    @staticmethod
+    def _encolar(cola, mensaje):
+        try:
+            cola.put_nowait(mensaje)
+        except asyncio.QueueFull:
+            # Cliente demasiado lento: se corta la conexión para que reconecte
+            # y vuelva a consultar los pendientes
+            while not cola.empty():
+                cola.get_nowait()
+            cola.put_nowait(None)
+
+
+difusor = DifusorEnMemoria()
+
+
+def formatear_evento(evento, datos, id_evento=None):
+    """Serializa un evento con el formato text/event-stream"""
+    lineas = []
+    if id_evento is not None:
+        lineas.append(f'id: {id_evento}')
+    lineas.append(f'event: {evento}')
+    lineas.append(f'data: {json.dumps(datos, cls=JSONEncoder)}')
+    return '\n'.join(lineas) + '\n\n'
+
+
+async def flujo_eventos(suscripcion, inicial=None, intervalo_keepalive=15):
+    """
+    Generador async del cuerpo de la respuesta. Envía comentarios periódicos
+    para que los proxies no corten la conexión y libera la suscripción al cerrar
+    """
+    _, cola = suscripcion
+    try:
+        yield 'retry: 3000\n\n'
+        if inicial:
+            yield formatear_evento(*inicial)
+        while True:
+            try:
+                mensaje = await asyncio.wait_for(cola.get(), intervalo_keepalive)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if mensaje is None:
+                break
+            yield formatear_evento(mensaje['evento'], mensaje['datos'], mensaje['id'])
+    finally:
+        difusor.desuscribir(suscripcion)
+
+
+# Segundos de validez de un ticket para abrir el flujo de eventos
+VIGENCIA_TICKET = 60
+
+
+def emitir_ticket(usuario):
+    """
+    Ticket firmado y de corta duración para conectarse al flujo. EventSource
+    no envía encabezados y la URL queda en los logs de acceso, por eso no se
+    usa el token de la API
+    """
+    return signing.TimestampSigner(salt='eventos_avisos').sign(str(usuario.pk))
+
+
+def usuario_del_ticket(ticket):
+    """Id del usuario del ticket, o None si es inválido o ya venció"""
+    try:
+        return int(signing.TimestampSigner(salt='eventos_avisos').unsign(ticket, max_age=VIGENCIA_TICKET))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def datos_aviso(aviso):
+    """Datos de un aviso tal como los devuelve AvisoDirectivoViewSet.pendientes"""
+    return {
+        'id': aviso.id,
+        'tipo': aviso.tipo,
+        'maestro_nombre': f"{aviso.maestro.first_name} {aviso.maestro.last_name}",
+        'curso_nombre': aviso.curso.nombre,
+        'fecha': aviso.fecha,
+        'hora_solicitada': aviso.hora_solicitada.strftime('%H:%M')
+    }
+
+
+def publicar_aviso(aviso, evento):
+    """
+    Publica un evento de aviso (aviso_creado, aviso_actualizado o
+    aviso_procesado) una vez confirmada la transacción en curso
+    """
+    datos = {**datos_aviso(aviso), 'procesado': aviso.procesado}
+    transaction.on_commit(lambda: difusor.publicar(evento, datos))
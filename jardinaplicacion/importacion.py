@@ -0,0 +1,48 @@
+"""Lectura en streaming de archivos de importación de pagos"""
+import codecs
+import csv
+import json
+
+
+FORMATOS_IMPORTACION = ['csv', 'ndjson', 'json']
+
+
+def detectar_formato(nombre_archivo):
+    """Deduce el formato a partir de la extensión del archivo"""
+    extension = nombre_archivo.rsplit('.', 1)[-1].lower() if '.' in nombre_archivo else ''
+    if extension in ['jsonl', 'ndjson']:
+        return 'ndjson'
+    if extension in FORMATOS_IMPORTACION:
+        return extension
+    return None
+
+
+def leer_filas(archivo, formato):
+    """
+    Genera (número de fila, dict) leyendo `archivo` (binario) de a una línea:
+    - csv: con encabezado (alumno,cuota,familiar,monto_pagado,fecha_pago)
+    - ndjson: un objeto JSON por línea
+    - json: un arreglo JSON de objetos (se carga completo)
+    """
+    if formato == 'csv':
+        lector = csv.DictReader(codecs.iterdecode(archivo, 'utf-8-sig'))
+        # La fila 1 es el encabezado
+        for numero, fila in enumerate(lector, start=2):
+            yield numero, {clave.strip(): (valor or '').strip() for clave, valor in fila.items() if clave}
+    elif formato == 'ndjson':
+        for numero, linea in enumerate(codecs.iterdecode(archivo, 'utf-8-sig'), start=1):
+            if not linea.strip():
+                continue
+            try:
+                fila = json.loads(linea)
+            except ValueError:
+                fila = None
+            yield numero, fila if isinstance(fila, dict) else None
+    elif formato == 'json':
+        filas = json.load(codecs.getreader('utf-8-sig')(archivo))
+        if not isinstance(filas, list):
+            raise ValueError('El JSON debe ser un arreglo de pagos')
+        for numero, fila in enumerate(filas, start=1):
+            yield numero, fila if isinstance(fila, dict) else None
+    else:
+        raise ValueError(f'Formato no soportado. Use: {", ".join(FORMATOS_IMPORTACION)}')
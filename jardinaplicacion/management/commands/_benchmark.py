@@ -0,0 +1,83 @@
+"""
+Base de datos sobre la que corren los comandos de benchmark.
+
+Por defecto se crea una base de pruebas descartable (como en los tests) que se
+elimina al terminar, así los datos generados y los bloqueos de DROP INDEX o de
+los UPDATE masivos nunca tocan la base configurada. Para medir sobre una base
+existente hay que nombrar con --database un alias que no apunte a la base de
+producción (`default`), o confirmarlo explícitamente con --confirm.
+"""
+from contextlib import contextmanager
+
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def agregar_argumentos(parser):
+    parser.add_argument(
+        '--database',
+        help='Alias de una base existente, distinta de la de producción, sobre la que medir '
+             '(por defecto se usa una base de pruebas descartable)'
+    )
+    parser.add_argument(
+        '--confirm',
+        action='store_true',
+        help='Permite medir directamente sobre la base de producción (`default`)'
+    )
+
+
+def _misma_base(alias, otro_alias):
+    datos = connections[alias].settings_dict
+    otros = connections[otro_alias].settings_dict
+    return all(datos.get(clave) == otros.get(clave) for clave in ['ENGINE', 'HOST', 'PORT', 'NAME'])
+
+
+@contextmanager
+def base_de_benchmark(comando, options):
+    """
+    Deja la conexión `default` (la que usa el ORM) apuntando a la base donde
+    debe correr el benchmark y la restaura al salir
+    """
+    conexion = connections[DEFAULT_DB_ALIAS]
+    alias = options['database']
+    verbosity = options['verbosity']
+
+    if alias is None and not options['confirm']:
+        nombre_original = conexion.settings_dict['NAME']
+        conexion.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+        comando.stdout.write(f"Base de pruebas descartable: {conexion.settings_dict['NAME']}")
+        try:
+            yield
+        finally:
+            conexion.creation.destroy_test_db(nombre_original, verbosity=verbosity)
+        return
+
+    alias = alias or DEFAULT_DB_ALIAS
+    if alias not in connections.settings:
+        raise CommandError(f'No existe el alias de base de datos "{alias}"')
+    if _misma_base(alias, DEFAULT_DB_ALIAS) and not options['confirm']:
+        raise CommandError(
+            f'"{alias}" es la base de producción. Omita --database para usar una base '
+            'de pruebas descartable o agregue --confirm para medir igualmente sobre ella'
+        )
+    if alias == DEFAULT_DB_ALIAS:
+        comando.stdout.write(comando.style.WARNING('Midiendo sobre la base de producción (--confirm)'))
+        yield
+        return
+
+    destino = connections[alias].settings_dict
+    if destino['ENGINE'] != conexion.settings_dict['ENGINE']:
+        raise CommandError(f'"{alias}" debe usar el mismo motor que la base por defecto')
+
+    # Igual que el runner de tests con la base de pruebas: se cambian los
+    # parámetros de la conexión por defecto y se reconecta
+    originales = conexion.settings_dict.copy()
+    conexion.close()
+    conexion.settings_dict.update(destino)
+    comando.stdout.write(f'Midiendo sobre la base "{alias}"')
+    try:
+        yield
+    finally:
+        conexion.close()
+        conexion.settings_dict.clear()
+        conexion.settings_dict.update(originales)
@@ -0,0 +1,36 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from jardinaplicacion.models import DeudorCuota, PoliticaRecargo
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el interés por mora de las deudas abiertas según la política de recargos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fecha',
+            type=str,
+            help='Fecha de cálculo (formato: YYYY-MM-DD, por defecto hoy)',
+            required=False
+        )
+
+    def handle(self, *args, **options):
+        fecha_especifica = options.get('fecha')
+
+        if fecha_especifica:
+            try:
+                fecha = datetime.strptime(fecha_especifica, '%Y-%m-%d').date()
+            except ValueError:
+                self.stdout.write(
+                    self.style.ERROR('Formato de fecha inválido. Use YYYY-MM-DD')
+                )
+                return
+        else:
+            fecha = timezone.now().date()
+
+        politica = PoliticaRecargo.get_politica()
+        actualizadas = DeudorCuota.aplicar_recargos(fecha, politica)
+        self.stdout.write(self.style.SUCCESS(
+            f'Recargos aplicados a {actualizadas} deudas abiertas ({politica})'
+        ))
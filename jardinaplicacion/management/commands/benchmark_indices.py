@@ -0,0 +1,270 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Sum
+from django.utils import timezone
+
+from jardinaplicacion.models import (
+    CicloLectivo, Curso, Alumno, Familiar, CustomUser, CuotaCurso, PagoCuota,
+    DeudorCuota, RegistroAsistenciaAlumno, _contar, _sumar
+)
+
+from ._benchmark import agregar_argumentos, base_de_benchmark
+
+
+class _Rollback(Exception):
+    """Fuerza la reversión de los datos de prueba"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Carga datos de prueba en una base descartable (o, con --database/--confirm, dentro '
+        'de una transacción que se revierte) y muestra planes de ejecución y tiempos de '
+        'las consultas frecuentes sin y con los índices'
+    )
+
+    MODELOS = [CuotaCurso, DeudorCuota, PagoCuota, RegistroAsistenciaAlumno]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ciclos', type=int, default=3, help='Ciclos lectivos de historia (por defecto 3)')
+        parser.add_argument('--cursos', type=int, default=20, help='Cursos por ciclo (por defecto 20)')
+        parser.add_argument('--alumnos', type=int, default=30, help='Alumnos por curso (por defecto 30)')
+        parser.add_argument('--dias', type=int, default=120, help='Días de asistencia a generar (por defecto 120)')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Ejecuciones por consulta (por defecto 5)')
+        parser.add_argument('--sin-explain', action='store_true', help='No mostrar los planes de ejecución')
+        agregar_argumentos(parser)
+
+    def handle(self, *args, **options):
+        with base_de_benchmark(self, options):
+            try:
+                with transaction.atomic():
+                    self._ejecutar(options)
+                    raise _Rollback
+            except _Rollback:
+                self.stdout.write(self.style.SUCCESS('Datos de prueba revertidos'))
+
+    def _ejecutar(self, options):
+        inicio = time.perf_counter()
+        datos = self._cargar_datos(options)
+        self.stdout.write(
+            f"Datos cargados en {time.perf_counter() - inicio:.1f}s: "
+            + ', '.join(f'{modelo.__name__}={modelo.objects.count()}' for modelo in self.MODELOS)
+        )
+
+        consultas = self._consultas(datos)
+        indices = [(modelo, indice) for modelo in self.MODELOS for indice in modelo._meta.indexes]
+        editor = connection.schema_editor()
+
+        with connection.cursor() as cursor:
+            for modelo, indice in indices:
+                cursor.execute(editor.sql_delete_index % {
+                    'name': editor.quote_name(indice.name),
+                    'table': editor.quote_name(modelo._meta.db_table),
+                })
+        self._analizar()
+        antes = self._medir(consultas, options, 'SIN ÍNDICES')
+
+        with connection.cursor() as cursor:
+            for modelo, indice in indices:
+                cursor.execute(str(indice.create_sql(modelo, editor)))
+        self._analizar()
+        despues = self._medir(consultas, options, 'CON ÍNDICES')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nResumen (mediana en ms)'))
+        for nombre, _ in consultas:
+            mejora = antes[nombre] / despues[nombre] if despues[nombre] else 0
+            self.stdout.write(
+                f'  {nombre:<40} {antes[nombre]:>9.2f} → {despues[nombre]:>9.2f}  (x{mejora:.1f})'
+            )
+
+    def _cargar_datos(self, options):
+        random.seed(42)
+        hoy = timezone.now().date()
+        ciclos = [
+            CicloLectivo.objects.create(
+                inicio=date(hoy.year - anterior, 3, 1),
+                finalizacion=date(hoy.year - anterior, 12, 15)
+            )
+            for anterior in range(options['ciclos'])
+        ]
+        maestro = CustomUser.objects.create_user(
+            username='benchmark_maestro', password=None, dni='bench-0', es_maestro=True
+        )
+
+        cursos = Curso.objects.bulk_create([
+            Curso(
+                nombre=f'Sala benchmark {i}',
+                cupo_habilitado=options['alumnos'],
+                turno='mañana',
+                horario='8:00 - 12:00',
+                edad_sala=3,
+                ciclo_lectivo=ciclo,
+                cuota_mensual=Decimal('25000.00')
+            )
+            for ciclo in ciclos
+            for i in range(options['cursos'])
+        ])
+        alumnos = Alumno.objects.bulk_create([
+            Alumno(
+                nombre=f'Alumno {i}',
+                apellido=f'Benchmark {i % 97}',
+                dni=f'b{curso.pk}-{i}'[:10],
+                fecha_nacimiento=date(hoy.year - 4, 1, 1),
+                curso=curso
+            )
+            for curso in cursos
+            for i in range(options['alumnos'])
+        ], batch_size=1000)
+        familiares = Familiar.objects.bulk_create([
+            Familiar(
+                nombre='Familiar',
+                apellido=alumno.apellido,
+                dni='0',
+                telefono='0',
+                relacion_con_alumno='madre',
+                alumno=alumno
+            )
+            for alumno in alumnos
+        ], batch_size=1000)
+        familiar_de = {familiar.alumno_id: familiar.pk for familiar in familiares}
+
+        CuotaCurso.objects.bulk_create([
+            CuotaCurso(
+                curso=curso,
+                mes=mes,
+                año=año,
+                monto=curso.cuota_mensual,
+                fecha_vencimiento=curso.get_fecha_vencimiento(mes, año)
+            )
+            for curso in cursos
+            for año, mes in curso.ciclo_lectivo.meses_del_ciclo()
+        ], batch_size=1000)
+        cuotas_por_curso = {}
+        for cuota in CuotaCurso.objects.filter(curso__in=cursos):
+            cuotas_por_curso.setdefault(cuota.curso_id, []).append(cuota)
+
+        # Cuotas vencidas: 70% pagadas (a tiempo o con atraso), el resto deudores.
+        # Los pagos con atraso dejan su deuda saldada, como en producción
+        pagos = []
+        deudas = []
+        for alumno in alumnos:
+            for cuota in cuotas_por_curso[alumno.curso_id]:
+                if cuota.fecha_vencimiento >= hoy:
+                    continue
+                if random.random() < 0.7:
+                    atraso = random.choice([0, 0, 0, 5, 15, 40])
+                    pagos.append(PagoCuota(
+                        alumno=alumno,
+                        cuota=cuota,
+                        familiar_id=familiar_de[alumno.pk],
+                        fecha_pago=cuota.fecha_vencimiento + timedelta(days=atraso),
+                        monto_pagado=cuota.monto,
+                        estado_pago='con_atraso' if atraso else 'a_tiempo',
+                        dias_atraso_pago=atraso
+                    ))
+                    if atraso:
+                        deudas.append(DeudorCuota(
+                            alumno=alumno,
+                            cuota=cuota,
+                            fecha_vencimiento=cuota.fecha_vencimiento,
+                            dias_atraso=atraso,
+                            monto_adeudado=cuota.monto,
+                            pagado=True,
+                            fecha_pago=timezone.now()
+                        ))
+                else:
+                    deudas.append(DeudorCuota(
+                        alumno=alumno,
+                        cuota=cuota,
+                        fecha_vencimiento=cuota.fecha_vencimiento,
+                        dias_atraso=(hoy - cuota.fecha_vencimiento).days,
+                        monto_adeudado=cuota.monto
+                    ))
+        PagoCuota.objects.bulk_create(pagos, batch_size=1000)
+        DeudorCuota.objects.bulk_create(deudas, batch_size=1000)
+
+        # Asistencia de los alumnos del ciclo actual
+        alumnos = [alumno for alumno in alumnos if alumno.curso.ciclo_lectivo == ciclos[0]]
+        registros = []
+        for dia in range(options['dias']):
+            fecha = hoy - timedelta(days=dia)
+            registros.extend(
+                RegistroAsistenciaAlumno(
+                    alumno=alumno,
+                    curso_id=alumno.curso_id,
+                    maestro=maestro,
+                    fecha=fecha,
+                    presente=random.random() < 0.9
+                )
+                for alumno in alumnos
+            )
+            if len(registros) >= 5000:
+                RegistroAsistenciaAlumno.objects.bulk_create(registros, batch_size=1000)
+                registros = []
+        RegistroAsistenciaAlumno.objects.bulk_create(registros, batch_size=1000)
+
+        curso = cursos[options['cursos'] // 2]
+        return {
+            'hoy': hoy,
+            'curso': curso,
+            'cuota': min(cuotas_por_curso[curso.pk], key=lambda cuota: cuota.fecha_vencimiento)
+        }
+
+    def _consultas(self, datos):
+        """Consultas de los listados y reportes de cuotas, deudores, pagos y asistencia"""
+        hoy = datos['hoy']
+        curso = datos['curso']
+        # Mismas subconsultas que ResumenFinancieroMensual.recalcular
+        deudas_abiertas = DeudorCuota.objects.filter(cuota=OuterRef('pk'), pagado=False)
+        return [
+            ('cuotas vencidas', CuotaCurso.objects.filter(fecha_vencimiento__lt=hoy - timedelta(days=60))),
+            ('cuotas por año y mes', CuotaCurso.objects.filter(año=hoy.year, mes=hoy.month)),
+            ('deudas abiertas', DeudorCuota.objects.filter(pagado=False, fecha_vencimiento__gte=hoy - timedelta(days=30))),
+            ('deudas abiertas de un curso', DeudorCuota.objects.filter(pagado=False, cuota__curso=curso)),
+            # Sin deudor_abierta_cuota_idx estas dos usan el índice de la FK
+            # cuota_id, que también recorre las deudas saldadas
+            ('deudas abiertas de una cuota', DeudorCuota.objects.filter(pagado=False, cuota=datos['cuota'])),
+            ('resumen de deudas abiertas por cuota', CuotaCurso.objects.filter(curso=curso).annotate(
+                deudores_abiertos=_contar(deudas_abiertas),
+                saldo_pendiente=_sumar(deudas_abiertas, 'monto_adeudado')
+            )),
+            ('antigüedad de deudas', DeudorCuota.objects.filter(
+                pagado=False, fecha_vencimiento__lt=hoy
+            ).con_tramo(hoy).order_by().values('tramo').annotate(cantidad=Count('pk'), monto=Sum('monto_adeudado'))),
+            ('pagos del último mes', PagoCuota.objects.filter(fecha_pago__gte=hoy - timedelta(days=30))),
+            ('pagos con atraso del último mes', PagoCuota.objects.filter(
+                estado_pago='con_atraso', fecha_pago__gte=hoy - timedelta(days=30)
+            )),
+            ('asistencia de un curso en el día', RegistroAsistenciaAlumno.objects.filter(curso=curso, fecha=hoy)),
+        ]
+
+    def _analizar(self):
+        """Actualiza las estadísticas del planificador"""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _medir(self, consultas, options, titulo):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n=== {titulo} ==='))
+        tiempos = {}
+        for nombre, queryset in consultas:
+            muestras = []
+            for _ in range(options['repeticiones']):
+                inicio = time.perf_counter()
+                list(queryset.all())
+                muestras.append((time.perf_counter() - inicio) * 1000)
+            tiempos[nombre] = statistics.median(muestras)
+
+            self.stdout.write(f'\n{nombre}: {tiempos[nombre]:.2f} ms')
+            if not options['sin_explain']:
+                if connection.vendor == 'postgresql':
+                    plan = queryset.explain(analyze=True)
+                else:
+                    plan = queryset.explain()
+                for linea in plan.splitlines():
+                    self.stdout.write(f'    {linea}')
+        return tiempos
@@ -0,0 +1,123 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from jardinaplicacion.models import (
+    CicloLectivo, Curso, Alumno, CuotaCurso, DeudorCuota, PoliticaRecargo
+)
+
+from ._benchmark import agregar_argumentos, base_de_benchmark
+
+
+class _Rollback(Exception):
+    """Fuerza la reversión de los datos de prueba"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el cálculo de recargos sobre un volumen de deudas abiertas generadas en '
+        'una base descartable (o, con --database/--confirm, dentro de una transacción '
+        'que se revierte)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--deudas', type=int, default=100000, help='Deudas abiertas a generar (por defecto 100000)')
+        parser.add_argument('--repeticiones', type=int, default=3, help='Ejecuciones del cálculo (por defecto 3)')
+        agregar_argumentos(parser)
+
+    def handle(self, *args, **options):
+        with base_de_benchmark(self, options):
+            try:
+                with transaction.atomic():
+                    self._ejecutar(options)
+                    raise _Rollback
+            except _Rollback:
+                self.stdout.write(self.style.SUCCESS('Datos de prueba revertidos'))
+
+    def _ejecutar(self, options):
+        hoy = timezone.now().date()
+        meses = 10
+        cursos_cantidad = 100
+        alumnos_por_curso = max(-(-options['deudas'] // (meses * cursos_cantidad)), 1)
+
+        inicio = time.perf_counter()
+        ciclo = CicloLectivo.objects.create(
+            inicio=date(hoy.year - 1, 1, 1),
+            finalizacion=date(hoy.year - 1, 12, 31)
+        )
+        cursos = Curso.objects.bulk_create([
+            Curso(
+                nombre=f'Sala benchmark {i}',
+                cupo_habilitado=alumnos_por_curso,
+                turno='mañana',
+                horario='8:00 - 12:00',
+                edad_sala=3,
+                ciclo_lectivo=ciclo,
+                cuota_mensual=Decimal('25000.00'),
+                dia_vencimiento_cuota=1 + i % 28
+            )
+            for i in range(cursos_cantidad)
+        ])
+        alumnos = Alumno.objects.bulk_create([
+            Alumno(
+                nombre=f'Alumno {i}',
+                apellido='Benchmark',
+                dni=f'r{curso.pk}-{i}'[:10],
+                fecha_nacimiento=date(hoy.year - 4, 1, 1),
+                curso=curso
+            )
+            for curso in cursos
+            for i in range(alumnos_por_curso)
+        ], batch_size=1000)
+        cuotas = CuotaCurso.objects.bulk_create([
+            CuotaCurso(
+                curso=curso,
+                mes=mes,
+                año=hoy.year - 1,
+                monto=curso.cuota_mensual,
+                fecha_vencimiento=curso.get_fecha_vencimiento(mes, hoy.year - 1)
+            )
+            for curso in cursos
+            for mes in range(1, meses + 1)
+        ], batch_size=1000)
+        cuotas_por_curso = {}
+        for cuota in cuotas:
+            cuotas_por_curso.setdefault(cuota.curso_id, []).append(cuota)
+
+        deudas = [
+            DeudorCuota(
+                alumno=alumno,
+                cuota=cuota,
+                fecha_vencimiento=cuota.fecha_vencimiento,
+                monto_adeudado=cuota.monto
+            )
+            for alumno in alumnos
+            for cuota in cuotas_por_curso[alumno.curso_id]
+        ][:options['deudas']]
+        DeudorCuota.objects.bulk_create(deudas, batch_size=2000)
+        self.stdout.write(
+            f'{len(deudas)} deudas generadas en {time.perf_counter() - inicio:.1f}s '
+            f'({len({deuda.fecha_vencimiento for deuda in deudas})} fechas de vencimiento distintas)'
+        )
+
+        politica = PoliticaRecargo(
+            monto_fijo=Decimal('500.00'),
+            porcentaje_diario=Decimal('0.100'),
+            tope=Decimal('10000.00')
+        )
+        for repeticion in range(1, options['repeticiones'] + 1):
+            inicio = time.perf_counter()
+            actualizadas = DeudorCuota.aplicar_recargos(hoy + timedelta(days=repeticion - 1), politica)
+            self.stdout.write(
+                f'Ejecución {repeticion}: {actualizadas} deudas en {time.perf_counter() - inicio:.2f}s'
+            )
+
+        muestra = DeudorCuota.objects.filter(
+            pk__in=[deudas[0].pk, deudas[-1].pk]
+        ).values_list('fecha_vencimiento', 'dias_atraso', 'monto_adeudado', 'interes')
+        for fecha_vencimiento, dias, monto, interes in muestra:
+            self.stdout.write(f'  vencimiento {fecha_vencimiento}: {dias} días, ${monto} → interés ${interes}')
@@ -0,0 +1,48 @@
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from jardinaplicacion.importacion import FORMATOS_IMPORTACION, detectar_formato, leer_filas
+from jardinaplicacion.models import PagoCuota
+
+
+class Command(BaseCommand):
+    help = 'Importa pagos de cuotas desde un archivo CSV, NDJSON o JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', type=str, help='Ruta del archivo a importar')
+        parser.add_argument(
+            '--formato',
+            choices=FORMATOS_IMPORTACION,
+            help='Formato del archivo (por defecto se deduce de la extensión)',
+        )
+        parser.add_argument(
+            '--tamano-lote',
+            type=int,
+            default=500,
+            help='Cantidad de filas por lote (por defecto 500)',
+        )
+
+    def handle(self, *args, **options):
+        formato = options.get('formato') or detectar_formato(options['archivo'])
+        if formato not in FORMATOS_IMPORTACION:
+            raise CommandError(f'Formato no soportado. Use --formato {"|".join(FORMATOS_IMPORTACION)}')
+
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                resultado = PagoCuota.importar(
+                    leer_filas(archivo, formato),
+                    tamaño_lote=options['tamano_lote']
+                )
+        except OSError as e:
+            raise CommandError(f'No se pudo abrir el archivo: {e}')
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            raise CommandError(f'No se pudo leer el archivo: {e}')
+
+        for error in resultado['errores']:
+            self.stdout.write(
+                self.style.WARNING(f"✗ Fila {error['fila']}: {'; '.join(error['errores'])}")
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Importación finalizada: {resultado['procesadas']} filas procesadas, "
+            f"{resultado['creados']} pagos creados, {len(resultado['errores'])} filas con errores"
+        ))
@@ -0,0 +1,46 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from jardinaplicacion.models import CuotaCurso
+
+
+class Command(BaseCommand):
+    help = 'Marca deudores de cuotas vencidas (completo o incremental)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Procesar solo cuotas vencidas y alumnos cambiados desde la última ejecución',
+        )
+        parser.add_argument(
+            '--fecha',
+            type=str,
+            help='Fecha de corte (formato: YYYY-MM-DD, por defecto hoy)',
+            required=False
+        )
+
+    def handle(self, *args, **options):
+        fecha_especifica = options.get('fecha')
+
+        if fecha_especifica:
+            try:
+                fecha = datetime.strptime(fecha_especifica, '%Y-%m-%d').date()
+            except ValueError:
+                self.stdout.write(
+                    self.style.ERROR('Formato de fecha inválido. Use YYYY-MM-DD')
+                )
+                return
+        else:
+            fecha = timezone.now().date()
+
+        if options['incremental']:
+            resultado = CuotaCurso.procesar_vencimientos_incremental(fecha)
+        else:
+            resultado = CuotaCurso.procesar_vencimientos_masivos(fecha)
+
+        for item in resultado['resultados']:
+            if item['deudores_marcados'] > 0:
+                self.stdout.write(f"✓ {item['cuota']}: {item['mensaje']}")
+
+        self.stdout.write(self.style.SUCCESS(resultado['message']))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from jardinaplicacion.models import ResumenAsistenciaDiaria
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero el resumen diario de asistencia de alumnos'
+
+    def handle(self, *args, **options):
+        total = ResumenAsistenciaDiaria.reconstruir()
+        self.stdout.write(
+            self.style.SUCCESS(f'Resumen de asistencia reconstruido: {total} días de curso')
+        )
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from jardinaplicacion.models import ResumenFinancieroMensual
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero el resumen financiero mensual de las cuotas'
+
+    def handle(self, *args, **options):
+        total = ResumenFinancieroMensual.reconstruir()
+        self.stdout.write(
+            self.style.SUCCESS(f'Resumen financiero reconstruido: {total} cuotas')
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jardinaplicacion', '0015_alumno_observaciones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ControlVencimientos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_corte', models.DateField(blank=True, help_text='Las cuotas con vencimiento anterior a esta fecha ya fueron procesadas', null=True)),
+                ('ultima_ejecucion', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Control de Vencimientos',
+                'verbose_name_plural': 'Control de Vencimientos',
+            },
+        ),
+        migrations.AddField(
+            model_name='alumno',
+            name='fecha_cambio_curso',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Último cambio de curso, usado por el procesamiento incremental de deudores', null=True),
+        ),
+    ]
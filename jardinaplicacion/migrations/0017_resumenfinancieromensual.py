@@ -0,0 +1,41 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:28
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jardinaplicacion', '0016_controlvencimientos_alumno_fecha_cambio_curso'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenFinancieroMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('año', models.PositiveIntegerField()),
+                ('mes', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(12)])),
+                ('fecha_vencimiento', models.DateField()),
+                ('alumnos_inscriptos', models.PositiveIntegerField(default=0)),
+                ('monto_facturado', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('monto_cobrado', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('pagos_a_tiempo', models.PositiveIntegerField(default=0)),
+                ('pagos_con_atraso', models.PositiveIntegerField(default=0)),
+                ('alumnos_sin_pago', models.PositiveIntegerField(default=0, help_text='Alumnos actuales del curso sin pago registrado para la cuota')),
+                ('deudores_abiertos', models.PositiveIntegerField(default=0)),
+                ('saldo_pendiente', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('cuota', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resumen_financiero', to='jardinaplicacion.cuotacurso')),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_financieros', to='jardinaplicacion.curso')),
+            ],
+            options={
+                'verbose_name': 'Resumen Financiero Mensual',
+                'verbose_name_plural': 'Resúmenes Financieros Mensuales',
+                'ordering': ['-año', '-mes'],
+                'unique_together': {('curso', 'año', 'mes')},
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jardinaplicacion', '0017_resumenfinancieromensual'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cuotacurso',
+            index=models.Index(fields=['fecha_vencimiento'], name='cuota_vencimiento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cuotacurso',
+            index=models.Index(fields=['año', 'mes'], name='cuota_anio_mes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deudorcuota',
+            index=models.Index(fields=['pagado', 'fecha_vencimiento'], name='deudor_pagado_venc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deudorcuota',
+            index=models.Index(condition=models.Q(('pagado', False)), fields=['fecha_vencimiento'], name='deudor_abierta_venc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deudorcuota',
+            index=models.Index(condition=models.Q(('pagado', False)), fields=['cuota'], name='deudor_abierta_cuota_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagocuota',
+            index=models.Index(fields=['fecha_pago'], name='pago_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagocuota',
+            index=models.Index(fields=['estado_pago', 'fecha_pago'], name='pago_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroasistenciaalumno',
+            index=models.Index(fields=['curso', 'fecha'], name='asistencia_curso_fecha_idx'),
+        ),
+    ]
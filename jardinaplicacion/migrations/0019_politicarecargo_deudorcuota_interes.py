@@ -0,0 +1,36 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:36
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jardinaplicacion', '0018_indices_finanzas_asistencia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deudorcuota',
+            name='interes',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Recargo por mora según la política de recargos vigente', max_digits=10),
+        ),
+        migrations.CreateModel(
+            name='PoliticaRecargo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('monto_fijo', models.DecimalField(decimal_places=2, default=0, help_text='Recargo fijo por deuda vencida', max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('porcentaje_diario', models.DecimalField(decimal_places=3, default=0, help_text='Porcentaje del monto adeudado que se suma por cada día de atraso', max_digits=6, validators=[django.core.validators.MinValueValidator(0)])),
+                ('tope', models.DecimalField(blank=True, decimal_places=2, help_text='Recargo máximo por deuda (vacío: sin tope)', max_digits=10, null=True, validators=[django.core.validators.MinValueValidator(0)])),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('actualizado_por', models.ForeignKey(blank=True, limit_choices_to={'es_directivo': True}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='politicas_recargo_actualizadas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Política de Recargos',
+                'verbose_name_plural': 'Políticas de Recargos',
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:39
+
+import re
+from datetime import time
+
+from django.db import migrations, models
+
+
+def completar_horarios(apps, schema_editor):
+    """Replica Curso.parse_horario() para los cursos existentes"""
+    Curso = apps.get_model('jardinaplicacion', 'Curso')
+    cursos = []
+    for curso in Curso.objects.only('pk', 'horario'):
+        match = re.match(r'(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})', re.sub(r'\s+', '', curso.horario or ''))
+        if not match:
+            continue
+        try:
+            curso.hora_inicio = time(int(match.group(1)), int(match.group(2)))
+            curso.hora_fin = time(int(match.group(3)), int(match.group(4)))
+        except ValueError:
+            continue
+        cursos.append(curso)
+    Curso.objects.bulk_update(cursos, ['hora_inicio', 'hora_fin'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jardinaplicacion', '0019_politicarecargo_deudorcuota_interes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='hora_fin',
+            field=models.TimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='curso',
+            name='hora_inicio',
+            field=models.TimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(completar_horarios, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jardinaplicacion', '0020_curso_hora_inicio_hora_fin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenAsistenciaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('alumnos_inscriptos', models.PositiveIntegerField(default=0)),
+                ('presentes', models.PositiveIntegerField(default=0)),
+                ('ausentes', models.PositiveIntegerField(default=0)),
+                ('llegadas_tarde', models.PositiveIntegerField(default=0, help_text='Presentes con hora de llegada posterior al inicio del curso')),
+                ('sin_registro', models.PositiveIntegerField(default=0, help_text='Alumnos del curso sin registro de asistencia en el día')),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_asistencia', to='jardinaplicacion.curso')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Asistencia Diaria',
+                'verbose_name_plural': 'Resúmenes de Asistencia Diaria',
+                'ordering': ['-fecha', 'curso__nombre'],
+                'unique_together': {('curso', 'fecha')},
+            },
+        ),
+    ]
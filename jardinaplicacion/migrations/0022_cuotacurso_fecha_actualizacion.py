@@ -0,0 +1,20 @@
+# Generated by Django 5.2.2 on 2026-10-18 13:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jardinaplicacion', '0021_resumenasistenciadiaria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cuotacurso',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.2 on 2026-10-18 13:07
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jardinaplicacion', '0022_cuotacurso_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='deudorcuota',
+            name='deudor_pagado_venc_idx',
+        ),
+    ]
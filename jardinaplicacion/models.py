@@ -1,8 +1,14 @@
-from django.db import models
+from django.db import connection, models, transaction, DatabaseError
+from django.db.models.constants import OnConflict
+from django.db.models.functions import Coalesce, Least, Round, TruncDate, TruncMonth, TruncWeek
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
+from collections import Counter
+import calendar
+import re
 
 
 class ConfiguracionSistema(models.Model):
@@ -38,6 +44,87 @@ class ConfiguracionSistema(models.Model):
         return config
 
 
+class PoliticaRecargo(models.Model):
+    """Política de recargos por mora sobre las deudas de cuotas"""
+    monto_fijo = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0,
+        validators=[MinValueValidator(0)],
+        help_text="Recargo fijo por deuda vencida"
+    )
+    porcentaje_diario = models.DecimalField(
+        max_digits=6, decimal_places=3, default=0,
+        validators=[MinValueValidator(0)],
+        help_text="Porcentaje del monto adeudado que se suma por cada día de atraso"
+    )
+    tope = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True,
+        validators=[MinValueValidator(0)],
+        help_text="Recargo máximo por deuda (vacío: sin tope)"
+    )
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    actualizado_por = models.ForeignKey(
+        'CustomUser',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        limit_choices_to={'es_directivo': True},
+        related_name='politicas_recargo_actualizadas'
+    )
+    
+    class Meta:
+        verbose_name = "Política de Recargos"
+        verbose_name_plural = "Políticas de Recargos"
+    
+    def __str__(self):
+        tope = f", tope ${self.tope}" if self.tope is not None else ""
+        return f"Recargo ${self.monto_fijo} + {self.porcentaje_diario}% diario{tope}"
+    
+    @classmethod
+    def get_politica(cls):
+        """Obtener la política actual (crea una sin recargos si no existe)"""
+        politica, created = cls.objects.get_or_create(pk=1)
+        return politica
+
+
+class ControlVencimientos(models.Model):
+    """Marca de agua del procesamiento de vencimientos de cuotas"""
+    fecha_corte = models.DateField(
+        null=True, blank=True,
+        help_text="Las cuotas con vencimiento anterior a esta fecha ya fueron procesadas"
+    )
+    ultima_ejecucion = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Control de Vencimientos"
+        verbose_name_plural = "Control de Vencimientos"
+    
+    def __str__(self):
+        return f"Vencimientos procesados hasta {self.fecha_corte or '-'}"
+    
+    @classmethod
+    def get_control(cls):
+        """Obtener el control actual (crea uno vacío si no existe)"""
+        control, created = cls.objects.get_or_create(pk=1)
+        return control
+    
+    @classmethod
+    def bloquear(cls):
+        """
+        Obtiene el control con un bloqueo de fila (SELECT ... FOR UPDATE) para
+        que dos procesamientos simultáneos no tomen la misma ventana.
+        Debe llamarse dentro de una transacción
+        """
+        cls.get_control()
+        return cls.objects.select_for_update().get(pk=1)
+    
+    def avanzar(self, fecha_corte, ejecucion):
+        """Avanza la marca de agua sin retroceder nunca la fecha de corte"""
+        if self.fecha_corte is None or fecha_corte > self.fecha_corte:
+            self.fecha_corte = fecha_corte
+        self.ultima_ejecucion = ejecucion
+        self.save()
+
+
 class CustomUser(AbstractUser):
     """Usuario personalizado que puede ser habilitado como maestro y/o directivo"""
     dni = models.CharField(max_length=10, unique=True)
@@ -63,6 +150,29 @@ class CicloLectivo(models.Model):
     
     def __str__(self):
         return f"Ciclo {self.inicio.year}"
+    
+    def meses_del_ciclo(self):
+        """Lista de (año, mes) desde el inicio hasta la finalización del ciclo"""
+        meses = []
+        año, mes = self.inicio.year, self.inicio.month
+        while (año, mes) <= (self.finalizacion.year, self.finalizacion.month):
+            meses.append((año, mes))
+            año, mes = (año + 1, 1) if mes == 12 else (año, mes + 1)
+        return meses
+
+
+class CursoQuerySet(models.QuerySet):
+    def con_alumnos_sin_asistencia(self, fecha):
+        """Anota alumnos_sin_registro: alumnos del curso sin asistencia en la fecha"""
+        return self.annotate(
+            alumnos_sin_registro=_contar(
+                Alumno.objects.filter(curso=models.OuterRef('pk')).filter(
+                    ~models.Exists(RegistroAsistenciaAlumno.objects.filter(
+                        alumno=models.OuterRef('pk'), fecha=fecha
+                    ))
+                )
+            )
+        )
 
 
 class Curso(models.Model):
@@ -85,6 +195,9 @@ class Curso(models.Model):
     cupo_habilitado = models.PositiveIntegerField(validators=[MinValueValidator(1)])
     turno = models.CharField(max_length=10, choices=TURNOS)
     horario = models.CharField(max_length=100)  # Ej: "8:00 - 12:00"
+    # Horario estructurado, derivado de `horario` al guardar
+    hora_inicio = models.TimeField(null=True, blank=True, db_index=True, editable=False)
+    hora_fin = models.TimeField(null=True, blank=True, db_index=True, editable=False)
     edad_sala = models.PositiveIntegerField(choices=EDADES_SALA)
     ciclo_lectivo = models.ForeignKey(CicloLectivo, on_delete=models.CASCADE, related_name='cursos')
     
@@ -110,6 +223,8 @@ class Curso(models.Model):
         blank=True
     )
     
+    objects = CursoQuerySet.as_manager()
+    
     def get_maestros_disponibles(self):
         """Obtener todos los usuarios que pueden ser asignados como maestros"""
         return CustomUser.objects.filter(es_maestro=True)
@@ -126,6 +241,13 @@ class Curso(models.Model):
         dia_vencimiento = min(self.dia_vencimiento_cuota, ultimo_dia_mes)
         
         return date(año, mes, dia_vencimiento)
+    
+    def save(self, *args, **kwargs):
+        self.hora_inicio, self.hora_fin = self.parse_horario()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'horario' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'hora_inicio', 'hora_fin'}
+        super().save(*args, **kwargs)
         
     def __str__(self):
         return f"{self.nombre} - {self.turno} ({self.ciclo_lectivo})"
@@ -158,25 +280,30 @@ class Curso(models.Model):
         except (ValueError, AttributeError):
             return None, None
     
-    def ya_paso_horario(self, fecha=None, margen_minutos=30):
+    def ya_paso_horario(self, fecha=None, margen_minutos=30, ahora=None):
         """
-        Verifica si ya pasó el horario de clases del curso
+        Verifica si ya pasó el horario de clases del curso.
+        `ahora` permite evaluar varios cursos con una misma lectura del reloj
         """
+        if ahora is None:
+            ahora = timezone.now()
         if fecha is None:
-            fecha = timezone.now().date()
-        
-        # Solo verificar para el día actual
-        if fecha != timezone.now().date():
-            return True  # Para fechas pasadas, consideramos que ya pasó
+            fecha = ahora.date()
         
-        hora_inicio, hora_fin = self.parse_horario()
+        return self.horario_terminado(self.hora_fin, fecha, ahora, margen_minutos)
+    
+    @staticmethod
+    def horario_terminado(hora_fin, fecha, ahora, margen_minutos=30):
+        """
+        Verifica si una hora de fin (más el margen) ya pasó. Para fechas
+        distintas de la actual se considera que ya pasó
+        """
+        if fecha != ahora.date():
+            return True
         if not hora_fin:
             return False
-        
-        hora_actual = timezone.now().time()
         hora_limite = (datetime.combine(fecha, hora_fin) + timedelta(minutes=margen_minutos)).time()
-        
-        return hora_actual >= hora_limite
+        return ahora.time() >= hora_limite
     
     def get_alumnos_sin_asistencia(self, fecha):
         """
@@ -186,48 +313,122 @@ class Curso(models.Model):
             registros_asistencia__fecha=fecha
         )
     
-    def marcar_ausencias_automaticas(self, fecha, maestro=None):
+    def marcar_ausencias_automaticas(self, fecha, maestro=None, dry_run=False):
         """
         Marca como ausentes a los alumnos sin registro de asistencia
         """
+        resultado = Curso.procesar_ausencias_alumnos(
+            fecha, Curso.objects.filter(pk=self.pk), maestro=maestro, dry_run=dry_run
+        )
+        if not resultado['success']:
+            return 0, resultado['message']
+        
+        resultado_curso = resultado['resultados'][0]
+        return resultado_curso['ausencias_marcadas'], resultado_curso['mensaje']
+    
+    @classmethod
+    def procesar_ausencias_alumnos(cls, fecha, cursos, maestro=None, verificar_horario=True,
+                                   margen_minutos=30, dry_run=False):
+        """
+        Marca como ausentes a todos los alumnos de los cursos indicados que no
+        tienen registro de asistencia en la fecha, con un único INSERT ... SELECT.
+        
+        Solo se procesan los cursos cuyo horario ya terminó (si verificar_horario)
+        y que tienen maestro; el registro se asigna a `maestro` o, si no se indica,
+        al primer maestro de cada curso. Con dry_run solo se cuentan las ausencias.
+        """
+        ahora = timezone.now()
+        
         # Verificar que no sea fin de semana
-        if fecha.weekday() >= 5:  # Sábado (5) o Domingo (6)
-            return 0, "No se procesan ausencias en fines de semana"
-        
-        # Verificar que ya pasó el horario (solo para fecha actual)
-        if fecha == timezone.now().date() and not self.ya_paso_horario(fecha):
-            return 0, "Aún no es hora de marcar ausencias para este curso"
-        
-        # Usar el primer maestro del curso si no se especifica uno
-        if maestro is None:
-            maestro = self.maestros.first()
-        
-        if not maestro:
-            return 0, "No hay maestros asignados a este curso"
-        
-        # Obtener alumnos sin registro
-        alumnos_sin_registro = self.get_alumnos_sin_asistencia(fecha)
-        
-        if not alumnos_sin_registro.exists():
-            return 0, "Todos los alumnos ya tienen registro de asistencia"
-        
-        # Crear registros de ausencia usando bulk_create para mejor rendimiento
-        registros_crear = []
-        for alumno in alumnos_sin_registro:
-            registros_crear.append(
-                RegistroAsistenciaAlumno(
-                    alumno=alumno,
-                    curso=self,
-                    maestro=maestro,
-                    fecha=fecha,
-                    presente=False,
-                    hora_llegada=None
-                )
+        if fecha.weekday() >= 5:
+            return {
+                'success': False,
+                'message': 'No se procesan ausencias en fines de semana',
+                'total_ausencias': 0,
+                'cursos_procesados': 0
+            }
+        
+        Asignacion = cls.maestros.through
+        primer_maestro = models.Subquery(
+            Asignacion.objects.filter(curso_id=models.OuterRef('curso_id'))
+            .order_by('customuser_id').values('customuser_id')[:1]
+        )
+        cursos = list(cursos.annotate(
+            tiene_maestros=models.Exists(Asignacion.objects.filter(curso_id=models.OuterRef('pk')))
+        ).values('pk', 'nombre', 'hora_fin', 'tiene_maestros'))
+        
+        habilitados = [
+            curso['pk'] for curso in cursos
+            if (maestro or curso['tiene_maestros'])
+            and (not verificar_horario or cls.horario_terminado(curso['hora_fin'], fecha, ahora, margen_minutos))
+        ]
+        
+        # Alumnos inscriptos sin registro en la fecha, ya con las columnas del registro
+        faltantes = Alumno.objects.filter(curso_id__in=habilitados).filter(
+            ~models.Exists(RegistroAsistenciaAlumno.objects.filter(alumno=models.OuterRef('pk'), fecha=fecha))
+        ).order_by()
+        
+        ausencias_por_curso = dict(
+            faltantes.values_list('curso_id').annotate(cantidad=models.Count('pk'))
+        ) if habilitados else {}
+        total_ausencias = sum(ausencias_por_curso.values())
+        
+        if total_ausencias and not dry_run:
+            seleccion = faltantes.annotate(
+                registro_alumno=models.F('pk'),
+                registro_curso=models.F('curso_id'),
+                registro_maestro=models.Value(maestro.pk) if maestro else primer_maestro,
+                registro_fecha=models.Value(fecha, output_field=models.DateField()),
+                registro_presente=models.Value(False, output_field=models.BooleanField()),
+                registro_hora_llegada=models.Value(None, output_field=models.TimeField())
+            ).values(
+                'registro_alumno', 'registro_curso', 'registro_maestro',
+                'registro_fecha', 'registro_presente', 'registro_hora_llegada'
             )
+            with transaction.atomic():
+                total_ausencias = RegistroAsistenciaAlumno._insertar_desde(
+                    seleccion, ['alumno_id', 'curso_id', 'maestro_id', 'fecha', 'presente', 'hora_llegada']
+                )
+                ResumenAsistenciaDiaria.recalcular((curso_id, fecha) for curso_id in ausencias_por_curso)
         
-        RegistroAsistenciaAlumno.objects.bulk_create(registros_crear)
+        habilitados = set(habilitados)
+        resultados = []
+        for curso in cursos:
+            ausencias_marcadas = ausencias_por_curso.get(curso['pk'], 0)
+            if curso['pk'] not in habilitados:
+                if not maestro and not curso['tiene_maestros']:
+                    mensaje = "No hay maestros asignados a este curso"
+                else:
+                    mensaje = "Aún no es hora de marcar ausencias para este curso"
+            elif not ausencias_marcadas:
+                mensaje = "Todos los alumnos ya tienen registro de asistencia"
+            elif dry_run:
+                mensaje = f"Se marcarían {ausencias_marcadas} ausencias"
+            else:
+                mensaje = f"Marcadas {ausencias_marcadas} ausencias automáticamente"
+            
+            resultados.append({
+                'curso_id': curso['pk'],
+                'curso': curso['nombre'],
+                'ausencias_marcadas': ausencias_marcadas,
+                'mensaje': mensaje
+            })
         
-        return len(registros_crear), f"Marcadas {len(registros_crear)} ausencias automáticamente"
+        cursos_procesados = len(ausencias_por_curso)
+        return {
+            'success': True,
+            'message': (
+                f'Vista previa: {cursos_procesados} cursos, {total_ausencias} ausencias a marcar'
+                if dry_run else
+                f'Proceso completado: {cursos_procesados} cursos procesados, {total_ausencias} ausencias marcadas'
+            ),
+            'total_ausencias': total_ausencias,
+            'cursos_procesados': cursos_procesados,
+            'resultados': resultados,
+            'fecha': fecha.strftime('%Y-%m-%d'),
+            'dry_run': dry_run
+        }
+    
     def get_maestros_sin_asistencia(self, fecha):
         """
         Obtiene maestros del curso que no tienen registro de asistencia en la fecha
@@ -241,59 +442,25 @@ class Curso(models.Model):
         """
         Marca como ausentes a los maestros sin registro de asistencia
         """
-        # Verificar que no sea fin de semana
-        if fecha.weekday() >= 5:  # Sábado (5) o Domingo (6)
-            return 0, "No se procesan ausencias en fines de semana"
-        
-        # Verificar que ya pasó el horario (solo para fecha actual)
-        if fecha == timezone.now().date() and not self.ya_paso_horario(fecha, margen_minutos):
-            return 0, "Aún no es hora de marcar ausencias para este curso"
-        
-        # Obtener maestros sin registro y sin avisos pendientes
-        maestros_sin_registro = self.get_maestros_sin_asistencia(fecha)
-        
-        # Filtrar maestros que tampoco tienen avisos pendientes
-        maestros_realmente_ausentes = []
-        for maestro in maestros_sin_registro:
-            # Verificar si tiene avisos pendientes para este curso y fecha
-            tiene_aviso_pendiente = AvisoDirectivo.objects.filter(
-                maestro=maestro,
-                curso=self,
-                fecha=fecha,
-                procesado=False
-            ).exists()
-            
-            if not tiene_aviso_pendiente:
-                maestros_realmente_ausentes.append(maestro)
-        
-        if not maestros_realmente_ausentes:
-            return 0, "Todos los maestros tienen registro de asistencia o avisos pendientes"
-        
-        # Crear registros de ausencia usando bulk_create para mejor rendimiento
-        registros_crear = []
-        for maestro in maestros_realmente_ausentes:
-            registros_crear.append(
-                RegistroAsistenciaMaestro(
-                    maestro=maestro,
-                    curso=self,
-                    fecha=fecha,
-                    hora_ingreso=None,
-                    hora_salida=None,
-                    ausente=True  # Nuevo campo para marcar ausencia
-                )
-            )
-        
-        RegistroAsistenciaMaestro.objects.bulk_create(registros_crear)
+        resultado = Curso.marcar_ausencias_maestros_masivas(
+            fecha, margen_minutos, cursos=Curso.objects.filter(pk=self.pk)
+        )
+        if not resultado['success']:
+            return 0, resultado['message']
         
-        return len(registros_crear), f"Marcadas {len(registros_crear)} ausencias de maestros automáticamente"
+        resultado_curso = resultado['resultados'][0]
+        return resultado_curso['ausencias_marcadas'], resultado_curso['mensaje']
 
     @classmethod
-    def marcar_ausencias_maestros_masivas(cls, fecha=None):
+    def marcar_ausencias_maestros_masivas(cls, fecha=None, margen_minutos=30, cursos=None):
         """
-        Marca ausencias de maestros para todos los cursos
+        Marca ausencias de maestros para todos los cursos (o los indicados).
+        Busca en una sola consulta las asignaciones maestro-curso sin registro
+        ni aviso pendiente en la fecha y las da de alta en un único INSERT
         """
+        ahora = timezone.now()
         if fecha is None:
-            fecha = timezone.now().date()
+            fecha = ahora.date()
         
         # Verificar que no sea fin de semana
         if fecha.weekday() >= 5:
@@ -304,24 +471,66 @@ class Curso(models.Model):
                 'cursos_procesados': 0
             }
         
-        cursos = cls.objects.all()
-        total_ausencias = 0
-        cursos_procesados = 0
+        if cursos is None:
+            cursos = cls.objects.all()
+        cursos = list(cursos.values('pk', 'nombre', 'hora_fin'))
+        
+        # Para la fecha actual solo se procesan los cursos cuyo horario ya terminó
+        terminados = [
+            curso['pk'] for curso in cursos
+            if cls.horario_terminado(curso['hora_fin'], fecha, ahora, margen_minutos)
+        ]
+        
+        Asignacion = cls.maestros.through
+        faltantes = list(
+            Asignacion.objects.filter(curso_id__in=terminados).filter(
+                ~models.Exists(RegistroAsistenciaMaestro.objects.filter(
+                    maestro=models.OuterRef('customuser'),
+                    curso=models.OuterRef('curso'),
+                    fecha=fecha
+                )),
+                ~models.Exists(AvisoDirectivo.objects.filter(
+                    maestro=models.OuterRef('customuser'),
+                    curso=models.OuterRef('curso'),
+                    fecha=fecha,
+                    procesado=False
+                ))
+            ).values_list('curso_id', 'customuser_id')
+        ) if terminados else []
+        
+        RegistroAsistenciaMaestro.objects.bulk_create([
+            RegistroAsistenciaMaestro(
+                maestro_id=maestro_id,
+                curso_id=curso_id,
+                fecha=fecha,
+                hora_ingreso=None,
+                hora_salida=None,
+                ausente=True
+            )
+            for curso_id, maestro_id in faltantes
+        ], ignore_conflicts=True)
+        
+        ausencias_por_curso = Counter(curso_id for curso_id, _ in faltantes)
+        terminados = set(terminados)
+        total_ausencias = len(faltantes)
         resultados = []
         
         for curso in cursos:
-            ausencias_marcadas, mensaje = curso.marcar_ausencias_maestros_automaticas(fecha)
-            
-            if ausencias_marcadas > 0:
-                total_ausencias += ausencias_marcadas
-                cursos_procesados += 1
+            ausencias_marcadas = ausencias_por_curso[curso['pk']]
+            if curso['pk'] not in terminados:
+                mensaje = "Aún no es hora de marcar ausencias para este curso"
+            elif not ausencias_marcadas:
+                mensaje = "Todos los maestros tienen registro de asistencia o avisos pendientes"
+            else:
+                mensaje = f"Marcadas {ausencias_marcadas} ausencias de maestros automáticamente"
             
             resultados.append({
-                'curso': curso.nombre,
+                'curso': curso['nombre'],
                 'ausencias_marcadas': ausencias_marcadas,
                 'mensaje': mensaje
             })
         
+        cursos_procesados = len(ausencias_por_curso)
         return {
             'success': True,
             'message': f'Proceso completado: {cursos_procesados} cursos procesados, {total_ausencias} ausencias de maestros marcadas',
@@ -333,22 +542,13 @@ class Curso(models.Model):
 
 
     @classmethod
-    def marcar_ausencias_masivas(cls, fecha=None, maestro_usuario=None):
+    def marcar_ausencias_masivas(cls, fecha=None, maestro_usuario=None, verificar_horario=True, dry_run=False):
         """
         Marca ausencias para todos los cursos según el rol del usuario
         """
         if fecha is None:
             fecha = timezone.now().date()
         
-        # Verificar que no sea fin de semana
-        if fecha.weekday() >= 5:
-            return {
-                'success': False,
-                'message': 'No se procesan ausencias en fines de semana',
-                'total_ausencias': 0,
-                'cursos_procesados': 0
-            }
-        
         # Obtener cursos según el rol del usuario
         if maestro_usuario and maestro_usuario.es_directivo:
             cursos = cls.objects.all()
@@ -357,31 +557,9 @@ class Curso(models.Model):
         else:
             cursos = cls.objects.none()
         
-        total_ausencias = 0
-        cursos_procesados = 0
-        resultados = []
-        
-        for curso in cursos:
-            ausencias_marcadas, mensaje = curso.marcar_ausencias_automaticas(fecha)
-            
-            if ausencias_marcadas > 0:
-                total_ausencias += ausencias_marcadas
-                cursos_procesados += 1
-            
-            resultados.append({
-                'curso': curso.nombre,
-                'ausencias_marcadas': ausencias_marcadas,
-                'mensaje': mensaje
-            })
-        
-        return {
-            'success': True,
-            'message': f'Proceso completado: {cursos_procesados} cursos procesados, {total_ausencias} ausencias marcadas',
-            'total_ausencias': total_ausencias,
-            'cursos_procesados': cursos_procesados,
-            'resultados': resultados,
-            'fecha': fecha.strftime('%Y-%m-%d')
-        }
+        return cls.procesar_ausencias_alumnos(
+            fecha, cursos, verificar_horario=verificar_horario, dry_run=dry_run
+        )
 
 
 
@@ -400,10 +578,53 @@ class Alumno(models.Model):
         related_name='alumnos',
         null=True, blank=True
     )
+    fecha_cambio_curso = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        help_text="Último cambio de curso, usado por el procesamiento incremental de deudores"
+    )
     
     def __str__(self):
         return f"{self.nombre} {self.apellido}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._curso_id_original = instance.__dict__.get('curso_id')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        curso_original = getattr(self, '_curso_id_original', None)
+        cambio_curso = self.curso_id != curso_original
+        # Solo un traslado entre cursos marca la fecha: las deudas del curso
+        # nuevo se generan a partir de ella
+        if cambio_curso and not self._state.adding and curso_original is not None:
+            self.fecha_cambio_curso = timezone.now()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'fecha_cambio_curso'}
+        
+        super().save(*args, **kwargs)
+        self._curso_id_original = self.curso_id
+        
+        # Un cambio de curso agrega o quita deudas en el momento
+        if cambio_curso:
+            DeudorCuota.sincronizar_alumnos(Alumno.objects.filter(pk=self.pk))
+            ResumenFinancieroMensual.recalcular(
+                CuotaCurso.objects.filter(curso_id__in=[curso_original, self.curso_id])
+            )
+            ResumenAsistenciaDiaria.recalcular_hoy([curso_original, self.curso_id])
+    
+    def delete(self, *args, **kwargs):
+        curso_id = self.curso_id
+        # Días con registros del alumno, que se borran en cascada con él
+        dias_con_registros = list(
+            self.registros_asistencia.order_by().values_list('curso_id', 'fecha').distinct()
+        )
+        resultado = super().delete(*args, **kwargs)
+        ResumenFinancieroMensual.recalcular(CuotaCurso.objects.filter(curso_id=curso_id))
+        ResumenAsistenciaDiaria.recalcular(dias_con_registros)
+        ResumenAsistenciaDiaria.recalcular_hoy([curso_id])
+        return resultado
+    
     @property
     def edad(self):
         from datetime import date
@@ -550,13 +771,130 @@ class RegistroAsistenciaAlumno(models.Model):
     class Meta:
         unique_together = ['alumno', 'fecha']  # Un registro por alumno por día
         ordering = ['-fecha', 'alumno__apellido', 'alumno__nombre']
+        indexes = [
+            models.Index(fields=['curso', 'fecha'], name='asistencia_curso_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.alumno} - {self.fecha} - {'Presente' if self.presente else 'Ausente'}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._resumen_original = (instance.__dict__.get('curso_id'), instance.__dict__.get('fecha'))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            pares = {(self.curso_id, self.fecha)}
+            if getattr(self, '_resumen_original', None):
+                pares.add(self._resumen_original)
+            ResumenAsistenciaDiaria.recalcular(pares)
+        self._resumen_original = (self.curso_id, self.fecha)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            ResumenAsistenciaDiaria.recalcular([(self.curso_id, self.fecha)])
+        return resultado
+    
+    @classmethod
+    def _insertar_desde(cls, seleccion, columnas):
+        """
+        INSERT ... SELECT de las filas de `seleccion` (un values() con las
+        columnas en el mismo orden), ignorando las que ya existan.
+        Devuelve la cantidad de filas insertadas
+        """
+        ops = connection.ops
+        opciones = cls._meta
+        select_sql, params = seleccion.query.sql_with_params()
+        sql = '{insert} {tabla} ({columnas}) {select} {conflicto}'.format(
+            insert=ops.insert_statement(on_conflict=OnConflict.IGNORE),
+            tabla=ops.quote_name(opciones.db_table),
+            columnas=', '.join(ops.quote_name(opciones.get_field(columna).column) for columna in columnas),
+            select=select_sql,
+            conflicto=ops.on_conflict_suffix_sql(
+                [opciones.get_field(columna) for columna in columnas], OnConflict.IGNORE, None, None
+            )
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+    
     @classmethod
-    def obtener_estadisticas_ausencias(cls, fecha_inicio=None, fecha_fin=None, curso=None):
+    def registrar_masiva(cls, curso, fecha, maestro, registros):
         """
-        Obtiene estadísticas de ausencias para un período
+        Crea o actualiza la asistencia de varios alumnos del curso en una fecha.
+        Valida todos los alumnos con una sola consulta y escribe los registros
+        con un único upsert. Devuelve (creados, actualizados) y lanza
+        Alumno.DoesNotExist si algún ID no pertenece al curso
+        """
+        por_alumno = {}
+        invalidos = []
+        for registro_data in registros:
+            alumno_id = registro_data.get('alumno')
+            try:
+                alumno_id = int(alumno_id)
+            except (TypeError, ValueError):
+                invalidos.append(alumno_id)
+                continue
+            # Si un alumno viene repetido prevalece el último, como al procesarlos en orden
+            por_alumno[alumno_id] = registro_data
+        
+        invalidos += sorted(
+            set(por_alumno) - set(curso.alumnos.filter(pk__in=por_alumno).values_list('pk', flat=True))
+        )
+        if invalidos:
+            raise Alumno.DoesNotExist(
+                f"Alumno con ID {', '.join(str(alumno_id) for alumno_id in invalidos)} no encontrado en el curso"
+            )
+        
+        nuevos = []
+        for alumno_id, registro_data in por_alumno.items():
+            presente = registro_data.get('presente', False)
+            hora_llegada = registro_data.get('hora_llegada')
+            nuevos.append(cls(
+                alumno_id=alumno_id,
+                curso=curso,
+                maestro=maestro,
+                fecha=fecha,
+                presente=presente,
+                hora_llegada=hora_llegada if presente and hora_llegada else None
+            ))
+        
+        with transaction.atomic():
+            cursos_previos = list(
+                cls.objects.filter(alumno_id__in=por_alumno, fecha=fecha).values_list('curso_id', flat=True)
+            )
+            cls.objects.bulk_create(
+                nuevos,
+                update_conflicts=True,
+                unique_fields=['alumno', 'fecha'],
+                update_fields=['curso', 'maestro', 'presente', 'hora_llegada']
+            )
+            ResumenAsistenciaDiaria.recalcular(
+                (curso_id, fecha) for curso_id in {curso.pk, *cursos_previos}
+            )
+        
+        existentes = len(cursos_previos)
+        return len(nuevos) - existentes, existentes
+    
+    # Campos de cada desglose de estadísticas: nombre en la respuesta -> campo agrupado
+    AGRUPACIONES_ESTADISTICAS = {
+        'curso': {'curso_nombre': 'curso__nombre', 'curso_id': 'curso'},
+        'dia': {'fecha': 'fecha'},
+        'semana': {'semana': 'periodo'},
+        'mes': {'mes': 'periodo'},
+        'alumno': {'alumno_apellido': 'alumno__apellido', 'alumno_nombre': 'alumno__nombre', 'alumno_id': 'alumno'},
+    }
+    
+    @classmethod
+    def obtener_estadisticas_ausencias(cls, fecha_inicio=None, fecha_fin=None, curso=None, agrupar_por=None):
+        """
+        Obtiene estadísticas de ausencias para un período en una sola consulta.
+        Con agrupar_por (curso, dia, semana, mes o alumno) agrega el desglose
+        en 'desglose' y los totales se suman a partir de esos grupos
         """
         queryset = cls.objects.all()
         
@@ -567,19 +905,212 @@ class RegistroAsistenciaAlumno(models.Model):
         if curso:
             queryset = queryset.filter(curso=curso)
         
-        total_registros = queryset.count()
-        ausencias = queryset.filter(presente=False).count()
-        presencias = queryset.filter(presente=True).count()
+        conteos = {
+            'total_registros': models.Count('pk'),
+            'ausencias': models.Count('pk', filter=models.Q(presente=False)),
+            'presencias': models.Count('pk', filter=models.Q(presente=True))
+        }
+        
+        if not agrupar_por:
+            return cls._con_porcentajes(queryset.aggregate(**conteos))
         
+        campos = cls.AGRUPACIONES_ESTADISTICAS[agrupar_por]
+        if agrupar_por in ('semana', 'mes'):
+            truncar = TruncWeek if agrupar_por == 'semana' else TruncMonth
+            queryset = queryset.annotate(periodo=truncar('fecha', output_field=models.DateField()))
+        
+        desglose = []
+        totales = dict.fromkeys(conteos, 0)
+        for fila in queryset.order_by(*campos.values()).values(*campos.values()).annotate(**conteos):
+            for clave in totales:
+                totales[clave] += fila[clave]
+            desglose.append(cls._con_porcentajes({
+                nombre: fila[campo] for nombre, campo in campos.items()
+            } | {clave: fila[clave] for clave in conteos}))
+        
+        return {**cls._con_porcentajes(totales), 'agrupado_por': agrupar_por, 'desglose': desglose}
+    
+    @staticmethod
+    def _con_porcentajes(conteos):
+        total_registros = conteos['total_registros']
         return {
-            'total_registros': total_registros,
-            'ausencias': ausencias,
-            'presencias': presencias,
-            'porcentaje_ausencias': (ausencias / total_registros * 100) if total_registros > 0 else 0,
-            'porcentaje_presencias': (presencias / total_registros * 100) if total_registros > 0 else 0
+            **conteos,
+            'porcentaje_ausencias': (conteos['ausencias'] / total_registros * 100) if total_registros > 0 else 0,
+            'porcentaje_presencias': (conteos['presencias'] / total_registros * 100) if total_registros > 0 else 0
         }
 
 
+def _dias_atraso_expr(fechas_vencimiento, hoy, campo='fecha_vencimiento'):
+    """
+    Expresión con los días de atraso respecto de `hoy`, armada como un CASE
+    sobre las fechas de vencimiento involucradas (portable entre motores)
+    """
+    return models.Case(
+        *[
+            models.When(**{campo: fecha}, then=models.Value(max((hoy - fecha).days, 0)))
+            for fecha in set(fechas_vencimiento)
+        ],
+        default=models.F('dias_atraso'),
+        output_field=models.PositiveIntegerField()
+    )
+
+
+def _contar(queryset):
+    """Subconsulta escalar con la cantidad de filas de `queryset`"""
+    return Coalesce(
+        models.Subquery(
+            queryset.order_by().annotate(
+                total=models.Func(models.F('pk'), function='COUNT')
+            ).values('total')[:1]
+        ),
+        0
+    )
+
+
+def _sumar(queryset, campo):
+    """Subconsulta escalar con la suma de `campo` en las filas de `queryset`"""
+    return Coalesce(
+        models.Subquery(
+            queryset.order_by().annotate(
+                total=models.Func(
+                    models.F(campo), function='SUM',
+                    output_field=models.DecimalField(max_digits=12, decimal_places=2)
+                )
+            ).values('total')[:1]
+        ),
+        models.Value(Decimal('0.00')),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2)
+    )
+
+
+class CuotaCursoQuerySet(models.QuerySet):
+    """Consultas de conjunto sobre cuotas"""
+    
+    @staticmethod
+    def _cantidad_pagos():
+        return _contar(PagoCuota.objects.filter(cuota=models.OuterRef('pk')))
+    
+    @staticmethod
+    def _cantidad_deudores():
+        return _contar(
+            Alumno.objects.filter(
+                curso=models.OuterRef('curso')
+            ).filter(
+                ~models.Exists(
+                    PagoCuota.objects.filter(
+                        alumno=models.OuterRef('pk'),
+                        cuota=models.OuterRef(models.OuterRef('pk'))
+                    )
+                )
+            )
+        )
+    
+    def con_totales(self):
+        """
+        Anota en cada cuota la cantidad de pagos (`cantidad_pagos`) y de alumnos
+        del curso sin pago (`cantidad_deudores`) como subconsultas, para no
+        ejecutar una consulta por fila
+        """
+        return self.annotate(
+            cantidad_pagos=self._cantidad_pagos(),
+            cantidad_deudores=self._cantidad_deudores()
+        )
+    
+    def pares_impagos(self):
+        """
+        Pares (cuota, alumno del curso) sin pago registrado, resueltos con un
+        único anti-join. Cada fila lleva el alumno en la anotación `alumno_id`
+        """
+        return self.annotate(
+            alumno_id=models.F('curso__alumnos__id')
+        ).filter(
+            alumno_id__isnull=False
+        ).filter(
+            ~models.Exists(
+                PagoCuota.objects.filter(
+                    alumno_id=models.OuterRef('alumno_id'),
+                    cuota_id=models.OuterRef('pk')
+                )
+            )
+        )
+    
+    def pares_adeudables(self):
+        """
+        Pares impagos que el alumno debe: un alumno trasladado solo debe las
+        cuotas de su curso actual que vencen desde su cambio de curso
+        """
+        return self.pares_impagos().annotate(
+            alumno_cambio_curso=TruncDate('curso__alumnos__fecha_cambio_curso')
+        ).filter(
+            models.Q(alumno_cambio_curso__isnull=True)
+            | models.Q(fecha_vencimiento__gte=models.F('alumno_cambio_curso'))
+        )
+    
+    def deudas_a_fecha(self, fecha, alumno_id=None):
+        """
+        Reconstruye las deudas vigentes a `fecha`: cuotas vencidas antes de
+        `fecha` que el alumno no había pagado a esa fecha. Une (UNION ALL) tres
+        conjuntos con la misma pertenencia que usa el registro de deudores:
+        - alumnos actuales del curso sin pago (desde su cambio de curso si
+          fueron trasladados)
+        - alumnos que ya no están en el curso y conservan la deuda sin pago
+          de cuando pertenecían a él (DeudorCuota)
+        - alumnos cuyo pago es posterior a `fecha`
+        Cada fila: id (cuota), alumno_id, alumno_nombre, alumno_apellido,
+        curso__nombre, mes, año, monto, fecha_vencimiento y fecha_pago_posterior
+        """
+        columnas = (
+            'id', 'alumno_id', 'alumno_nombre', 'alumno_apellido', 'curso__nombre',
+            'mes', 'año', 'monto', 'fecha_vencimiento', 'fecha_pago_posterior'
+        )
+        vencidas = self.filter(fecha_vencimiento__lt=fecha).order_by()
+        
+        sin_pago = vencidas.pares_adeudables().annotate(
+            alumno_nombre=models.F('curso__alumnos__nombre'),
+            alumno_apellido=models.F('curso__alumnos__apellido'),
+            fecha_pago_posterior=models.Value(None, output_field=models.DateField())
+        )
+        deuda_anterior = vencidas.annotate(
+            alumno_id=models.F('deudores__alumno_id'),
+            alumno_curso_id=models.F('deudores__alumno__curso_id'),
+            alumno_nombre=models.F('deudores__alumno__nombre'),
+            alumno_apellido=models.F('deudores__alumno__apellido'),
+            fecha_pago_posterior=models.Value(None, output_field=models.DateField())
+        ).filter(
+            alumno_id__isnull=False
+        ).exclude(
+            alumno_curso_id=models.F('curso_id')
+        ).filter(
+            ~models.Exists(
+                PagoCuota.objects.filter(
+                    alumno_id=models.OuterRef('alumno_id'),
+                    cuota_id=models.OuterRef('pk')
+                )
+            )
+        )
+        pago_posterior = vencidas.annotate(
+            pago_posterior=models.FilteredRelation(
+                'pagos', condition=models.Q(pagos__fecha_pago__gt=fecha)
+            )
+        ).annotate(
+            alumno_id=models.F('pago_posterior__alumno_id'),
+            alumno_nombre=models.F('pago_posterior__alumno__nombre'),
+            alumno_apellido=models.F('pago_posterior__alumno__apellido'),
+            fecha_pago_posterior=models.F('pago_posterior__fecha_pago')
+        ).filter(alumno_id__isnull=False)
+        
+        if alumno_id is not None:
+            sin_pago = sin_pago.filter(alumno_id=alumno_id)
+            deuda_anterior = deuda_anterior.filter(alumno_id=alumno_id)
+            pago_posterior = pago_posterior.filter(alumno_id=alumno_id)
+        
+        return sin_pago.values(*columnas).union(
+            deuda_anterior.values(*columnas),
+            pago_posterior.values(*columnas),
+            all=True
+        )
+
+
 class CuotaCurso(models.Model):
     """Cuotas mensuales de cada curso"""
     curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='cuotas')
@@ -591,16 +1122,24 @@ class CuotaCurso(models.Model):
     fecha_vencimiento = models.DateField(
         help_text="Fecha límite para pagar esta cuota sin atraso"
     )
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    objects = CuotaCursoQuerySet.as_manager()
     
     class Meta:
         unique_together = ['curso', 'mes', 'año']
         ordering = ['-año', '-mes']
+        indexes = [
+            models.Index(fields=['fecha_vencimiento'], name='cuota_vencimiento_idx'),
+            models.Index(fields=['año', 'mes'], name='cuota_anio_mes_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         # Auto-calcular fecha de vencimiento si no se proporciona
         if not self.fecha_vencimiento:
             self.fecha_vencimiento = self.curso.get_fecha_vencimiento(self.mes, self.año)
         super().save(*args, **kwargs)
+        ResumenFinancieroMensual.recalcular(CuotaCurso.objects.filter(pk=self.pk))
     
     @property
     def esta_vencida(self):
@@ -627,29 +1166,234 @@ class CuotaCurso(models.Model):
         if not self.esta_vencida:
             return 0, "La cuota aún no está vencida"
         
-        alumnos_deudores = self.get_alumnos_deudores()
-        deudores_marcados = 0
-        
-        for alumno in alumnos_deudores:
-            # Crear o actualizar registro de deudor
-            deudor, created = DeudorCuota.objects.get_or_create(
-                alumno=alumno,
-                cuota=self,
-                defaults={
-                    'fecha_vencimiento': self.fecha_vencimiento,
-                    'dias_atraso': self.dias_vencida,
-                    'monto_adeudado': self.monto
-                }
+        marcados = CuotaCurso._marcar_deudores(
+            CuotaCurso.objects.filter(pk=self.pk),
+            timezone.now().date()
+        )
+        deudores_marcados = marcados.get(self.pk, 0)
+        
+        return deudores_marcados, f"Marcados {deudores_marcados} alumnos como deudores"
+    
+    @classmethod
+    def generar_cuotas(cls, cursos, meses, dry_run=False):
+        """
+        Genera las cuotas de los cursos indicados para los (año, mes) dados con
+        una consulta de existencia y un único bulk_create. Con dry_run solo
+        calcula qué cuotas se crearían.
+        Devuelve (cuotas nuevas sin guardar o creadas, cantidad de existentes)
+        """
+        cursos = list(cursos)
+        años = {año for año, _ in meses}
+        existentes = set(
+            cls.objects.filter(
+                curso__in=cursos,
+                año__in=años
+            ).values_list('curso_id', 'año', 'mes')
+        )
+        
+        cuotas_nuevas = [
+            cls(
+                curso=curso,
+                mes=mes,
+                año=año,
+                monto=curso.cuota_mensual,
+                fecha_vencimiento=curso.get_fecha_vencimiento(mes, año)
+            )
+            for curso in cursos
+            for año, mes in meses
+            if (curso.pk, año, mes) not in existentes
+        ]
+        cantidad_existentes = len(cursos) * len(meses) - len(cuotas_nuevas)
+        
+        if cuotas_nuevas and not dry_run:
+            with transaction.atomic():
+                cls.objects.bulk_create(cuotas_nuevas, batch_size=1000, ignore_conflicts=True)
+                periodos = models.Q()
+                for año in años:
+                    periodos |= models.Q(año=año, mes__in=[m for a, m in meses if a == año])
+                ResumenFinancieroMensual.recalcular(
+                    cls.objects.filter(periodos, curso__in=cursos)
+                )
+        
+        return cuotas_nuevas, cantidad_existentes
+    
+    @classmethod
+    def _marcar_deudores(cls, cuotas, hoy, alumnos=None):
+        """
+        Marca deudores para un conjunto de cuotas vencidas con un número fijo
+        de consultas: un anti-join para encontrar los pares impagos, un
+        bulk_create para los deudores nuevos y un UPDATE para los días de atraso.
+        Si se indica `alumnos` solo se consideran esos alumnos.
+        Devuelve {cuota_id: deudores marcados}
+        """
+        pares = cuotas.pares_adeudables()
+        if alumnos is not None:
+            pares = pares.filter(alumno_id__in=alumnos.values('pk'))
+        pares = list(
+            pares.order_by().values_list(
+                'pk', 'alumno_id', 'fecha_vencimiento', 'monto'
+            )
+        )
+        
+        with transaction.atomic():
+            DeudorCuota.objects.bulk_create(
+                [
+                    DeudorCuota(
+                        alumno_id=alumno_id,
+                        cuota_id=cuota_id,
+                        fecha_vencimiento=fecha_vencimiento,
+                        dias_atraso=(hoy - fecha_vencimiento).days,
+                        monto_adeudado=monto
+                    )
+                    for cuota_id, alumno_id, fecha_vencimiento, monto in pares
+                ],
+                batch_size=1000,
+                ignore_conflicts=True
             )
             
-            if not created:
-                # Actualizar días de atraso si ya existía
-                deudor.dias_atraso = self.dias_vencida
-                deudor.save()
+            # Actualizar días de atraso de las deudas abiertas que ya existían
+            fechas_vencimiento = cuotas.order_by().values_list('fecha_vencimiento', flat=True).distinct()
+            deudas_abiertas = DeudorCuota.objects.filter(
+                cuota__in=cuotas.order_by().values('pk'),
+                pagado=False
+            )
+            if alumnos is not None:
+                deudas_abiertas = deudas_abiertas.filter(alumno__in=alumnos.values('pk'))
+            deudas_abiertas.update(
+                dias_atraso=_dias_atraso_expr(fechas_vencimiento, hoy)
+            )
             
-            deudores_marcados += 1
+            marcados = Counter(cuota_id for cuota_id, _, _, _ in pares)
+            if marcados:
+                ResumenFinancieroMensual.recalcular(
+                    CuotaCurso.objects.filter(pk__in=list(marcados))
+                )
         
-        return deudores_marcados, f"Marcados {deudores_marcados} alumnos como deudores"
+        return marcados
+    
+    @classmethod
+    def procesar_vencimientos_masivos(cls, fecha=None):
+        """
+        Procesa todas las cuotas vencidas y marca deudores automáticamente
+        """
+        if fecha is None:
+            fecha = timezone.now().date()
+        hoy = timezone.now().date()
+        
+        cuotas_vencidas = list(
+            cls.objects.filter(
+                fecha_vencimiento__lt=fecha
+            ).select_related('curso__ciclo_lectivo')
+        )
+        
+        # Solo se marcan las cuotas efectivamente vencidas al día de hoy
+        with transaction.atomic():
+            control = ControlVencimientos.bloquear()
+            marcados = cls._marcar_deudores(
+                cls.objects.filter(fecha_vencimiento__lt=min(fecha, hoy)),
+                hoy
+            )
+            control.avanzar(min(fecha, hoy), timezone.now())
+        
+        total_deudores = 0
+        cuotas_procesadas = 0
+        resultados = []
+        
+        for cuota in cuotas_vencidas:
+            if cuota.fecha_vencimiento < hoy:
+                deudores_marcados = marcados.get(cuota.pk, 0)
+                mensaje = f"Marcados {deudores_marcados} alumnos como deudores"
+            else:
+                deudores_marcados = 0
+                mensaje = "La cuota aún no está vencida"
+            
+            if deudores_marcados > 0:
+                total_deudores += deudores_marcados
+                cuotas_procesadas += 1
+            
+            resultados.append({
+                'cuota': str(cuota),
+                'deudores_marcados': deudores_marcados,
+                'mensaje': mensaje
+            })
+        
+        return {
+            'success': True,
+            'message': f'Proceso completado: {cuotas_procesadas} cuotas procesadas, {total_deudores} deudores marcados',
+            'total_deudores': total_deudores,
+            'cuotas_procesadas': cuotas_procesadas,
+            'resultados': resultados,
+            'fecha': fecha.strftime('%Y-%m-%d')
+        }
+    
+    @classmethod
+    def procesar_vencimientos_incremental(cls, fecha=None):
+        """
+        Procesa solo lo que cambió desde la última ejecución: las cuotas que
+        vencieron después de la marca de agua, las cuotas ya vencidas creadas
+        o modificadas desde entonces (cuotas retroactivas) y los alumnos que
+        cambiaron de curso. Los pagos ya saldan su deuda al registrarse.
+        Sin marca de agua previa se hace un procesamiento completo.
+        """
+        if fecha is None:
+            fecha = timezone.now().date()
+        hoy = timezone.now().date()
+        corte = min(fecha, hoy)
+        
+        # El bloqueo del control serializa las ejecuciones concurrentes: la
+        # segunda espera y procesa desde la marca de agua que dejó la primera
+        with transaction.atomic():
+            control = ControlVencimientos.bloquear()
+            if control.fecha_corte is None:
+                resultado = cls.procesar_vencimientos_masivos(fecha)
+                resultado['modo'] = 'completo'
+                return resultado
+            
+            inicio_ejecucion = timezone.now()
+            desde = control.fecha_corte
+            
+            # Cuotas que cruzaron su fecha de vencimiento desde la última
+            # ejecución, más las vencidas que se crearon o editaron después
+            cambios = models.Q(fecha_vencimiento__gte=desde)
+            if control.ultima_ejecucion:
+                cambios |= models.Q(fecha_actualizacion__gte=control.ultima_ejecucion)
+            cuotas_nuevas = cls.objects.filter(cambios, fecha_vencimiento__lt=corte)
+            marcados = cls._marcar_deudores(cuotas_nuevas, hoy)
+            
+            # Alumnos que cambiaron de curso desde la última ejecución
+            alumnos_cambiados = Alumno.objects.all()
+            if control.ultima_ejecucion:
+                alumnos_cambiados = alumnos_cambiados.filter(
+                    fecha_cambio_curso__gte=control.ultima_ejecucion
+                )
+            marcados.update(DeudorCuota.sincronizar_alumnos(alumnos_cambiados, corte))
+            
+            control.avanzar(corte, inicio_ejecucion)
+        
+        cuotas_procesadas = 0
+        total_deudores = 0
+        resultados = []
+        for cuota in cls.objects.filter(pk__in=list(marcados)).select_related('curso__ciclo_lectivo'):
+            deudores_marcados = marcados[cuota.pk]
+            if deudores_marcados > 0:
+                total_deudores += deudores_marcados
+                cuotas_procesadas += 1
+            resultados.append({
+                'cuota': str(cuota),
+                'deudores_marcados': deudores_marcados,
+                'mensaje': f"Marcados {deudores_marcados} alumnos como deudores"
+            })
+        
+        return {
+            'success': True,
+            'message': f'Proceso incremental completado: {cuotas_procesadas} cuotas procesadas, {total_deudores} deudores marcados',
+            'modo': 'incremental',
+            'desde': desde.strftime('%Y-%m-%d'),
+            'total_deudores': total_deudores,
+            'cuotas_procesadas': cuotas_procesadas,
+            'resultados': resultados,
+            'fecha': fecha.strftime('%Y-%m-%d')
+        }
     
     def __str__(self):
         meses = [
@@ -658,8 +1402,41 @@ class CuotaCurso(models.Model):
         ]
         return f"{self.curso} - {meses[self.mes]} {self.año}: ${self.monto}"
     
+class DeudorCuotaQuerySet(models.QuerySet):
+    """Consultas de conjunto sobre deudas"""
+    
+    def con_tramo(self, fecha):
+        """
+        Anota en `tramo` la antigüedad de la deuda respecto de `fecha`
+        ('0-30', '31-60', '61-90' o '90+' días), calculada en la base a partir
+        de fecha_vencimiento para poder filtrar, ordenar y agrupar por ella
+        """
+        return self.annotate(
+            tramo=models.Case(
+                *[
+                    models.When(
+                        fecha_vencimiento__gte=fecha - timedelta(days=hasta),
+                        then=models.Value(nombre)
+                    )
+                    for nombre, hasta in DeudorCuota.TRAMOS_ANTIGUEDAD
+                    if hasta is not None
+                ],
+                default=models.Value(DeudorCuota.TRAMOS_ANTIGUEDAD[-1][0]),
+                output_field=models.CharField()
+            )
+        )
+
+
 class DeudorCuota(models.Model):
     """Registro de alumnos deudores de cuotas"""
+    # (tramo, días máximos de atraso)
+    TRAMOS_ANTIGUEDAD = [
+        ('0-30', 30),
+        ('31-60', 60),
+        ('61-90', 90),
+        ('90+', None),
+    ]
+    
     alumno = models.ForeignKey(Alumno, on_delete=models.CASCADE, related_name='deudas')
     cuota = models.ForeignKey(CuotaCurso, on_delete=models.CASCADE, related_name='deudores')
     fecha_vencimiento = models.DateField()
@@ -668,10 +1445,43 @@ class DeudorCuota(models.Model):
     monto_adeudado = models.DecimalField(max_digits=10, decimal_places=2)
     pagado = models.BooleanField(default=False)
     fecha_pago = models.DateTimeField(null=True, blank=True)
+    interes = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0,
+        help_text="Recargo por mora según la política de recargos vigente"
+    )
+    
+    objects = DeudorCuotaQuerySet.as_manager()
     
     class Meta:
         unique_together = ['alumno', 'cuota']
         ordering = ['-fecha_marcado_deudor']
+        # Las consultas filtran siempre las deudas abiertas: índices parciales
+        # que no crecen con el historial de deudas saldadas
+        indexes = [
+            # Deudas abiertas: listado, antigüedad y recargos
+            models.Index(
+                fields=['fecha_vencimiento'],
+                condition=models.Q(pagado=False),
+                name='deudor_abierta_venc_idx'
+            ),
+            # Deudas abiertas de una cuota: deudores abiertos del resumen
+            # financiero y deudas abiertas de un curso
+            models.Index(
+                fields=['cuota'],
+                condition=models.Q(pagado=False),
+                name='deudor_abierta_cuota_idx'
+            ),
+        ]
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        ResumenFinancieroMensual.recalcular(CuotaCurso.objects.filter(pk=self.cuota_id))
+    
+    def delete(self, *args, **kwargs):
+        cuota_id = self.cuota_id
+        resultado = super().delete(*args, **kwargs)
+        ResumenFinancieroMensual.recalcular(CuotaCurso.objects.filter(pk=cuota_id))
+        return resultado
     
     @property
     def dias_atraso_actual(self):
@@ -687,49 +1497,120 @@ class DeudorCuota(models.Model):
         self.dias_atraso = self.dias_atraso_actual
         self.save()
     
+    @classmethod
+    def saldar(cls, alumno_id, cuota_id, fecha_vencimiento):
+        """Salda la deuda abierta de un alumno para una cuota con un único UPDATE"""
+        hoy = timezone.now().date()
+        return cls.objects.filter(
+            alumno_id=alumno_id,
+            cuota_id=cuota_id,
+            pagado=False
+        ).update(
+            pagado=True,
+            fecha_pago=timezone.now(),
+            dias_atraso=_dias_atraso_expr([fecha_vencimiento], hoy)
+        )
+    
+    @classmethod
+    def reabrir(cls, alumno_id, cuota_id):
+        """
+        Revierte `saldar` al eliminarse un pago: reabre la deuda saldada o, si
+        la cuota ya venció y no había deuda, la marca. Devuelve las deudas abiertas
+        """
+        hoy = timezone.now().date()
+        cuota = CuotaCurso.objects.filter(pk=cuota_id)
+        reabiertas = cls.objects.filter(
+            alumno_id=alumno_id,
+            cuota_id=cuota_id,
+            pagado=True
+        ).update(
+            pagado=False,
+            fecha_pago=None,
+            dias_atraso=_dias_atraso_expr(cuota.values_list('fecha_vencimiento', flat=True), hoy)
+        )
+        if reabiertas:
+            return reabiertas
+        
+        marcados = CuotaCurso._marcar_deudores(
+            cuota.filter(fecha_vencimiento__lt=hoy), hoy, alumnos=Alumno.objects.filter(pk=alumno_id)
+        )
+        return sum(marcados.values())
+    
+    @classmethod
+    def aplicar_recargos(cls, fecha=None, politica=None):
+        """
+        Recalcula días de atraso e interés de todas las deudas abiertas con un
+        único UPDATE: monto fijo + porcentaje diario sobre el monto adeudado por
+        día de atraso, limitado por el tope. Devuelve la cantidad de deudas
+        """
+        if fecha is None:
+            fecha = timezone.now().date()
+        if politica is None:
+            politica = PoliticaRecargo.get_politica()
+        
+        abiertas = cls.objects.filter(pagado=False)
+        fechas_vencimiento = list(
+            abiertas.order_by().values_list('fecha_vencimiento', flat=True).distinct()
+        )
+        if not fechas_vencimiento:
+            return 0
+        
+        decimal = models.DecimalField(max_digits=12, decimal_places=4)
+        dias = _dias_atraso_expr(fechas_vencimiento, fecha)
+        interes = models.ExpressionWrapper(
+            models.Value(politica.monto_fijo, output_field=decimal)
+            + models.F('monto_adeudado')
+            * models.Value(politica.porcentaje_diario / 100, output_field=decimal)
+            * dias,
+            output_field=decimal
+        )
+        if politica.tope is not None:
+            interes = Least(interes, models.Value(politica.tope, output_field=decimal))
+        
+        return abiertas.update(
+            dias_atraso=dias,
+            interes=models.Case(
+                models.When(fecha_vencimiento__lt=fecha, then=Round(interes, 2)),
+                default=models.Value(Decimal('0.00')),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2)
+            )
+        )
+    
+    @classmethod
+    def sincronizar_alumnos(cls, alumnos, fecha=None):
+        """
+        Ajusta las deudas de los alumnos indicados a su curso actual. Las deudas
+        del curso anterior vencidas antes del traslado se conservan; solo se
+        quitan las deudas abiertas de otros cursos que vencen desde el cambio
+        de curso, y se marcan las cuotas vencidas impagas del curso actual que
+        vencieron desde ese cambio. Devuelve {cuota_id: deudores marcados}
+        """
+        hoy = timezone.now().date()
+        if fecha is None:
+            fecha = hoy
+        
+        deudas_ajenas = cls.objects.filter(
+            alumno__in=alumnos.values('pk'),
+            alumno__fecha_cambio_curso__isnull=False,
+            pagado=False,
+            fecha_vencimiento__gte=TruncDate('alumno__fecha_cambio_curso')
+        ).exclude(
+            cuota__curso=models.F('alumno__curso')
+        )
+        cuotas_ajenas = list(deudas_ajenas.values_list('cuota_id', flat=True).distinct())
+        if cuotas_ajenas:
+            deudas_ajenas.delete()
+            ResumenFinancieroMensual.recalcular(CuotaCurso.objects.filter(pk__in=cuotas_ajenas))
+        
+        cuotas_vencidas = CuotaCurso.objects.filter(
+            curso__in=alumnos.values('curso'),
+            fecha_vencimiento__lt=min(fecha, hoy)
+        )
+        return CuotaCurso._marcar_deudores(cuotas_vencidas, hoy, alumnos=alumnos)
+    
     def __str__(self):
         estado = "PAGADO CON ATRASO" if self.pagado else f"DEUDOR ({self.dias_atraso_actual} días)"
         return f"{self.alumno} - {self.cuota} - {estado}"
-# Método de clase para procesar vencimientos masivos
-@classmethod
-def procesar_vencimientos_masivos(cls, fecha=None):
-    """
-    Procesa todas las cuotas vencidas y marca deudores automáticamente
-    """
-    if fecha is None:
-        fecha = timezone.now().date()
-    
-    # Obtener cuotas vencidas que no han sido procesadas recientemente
-    cuotas_vencidas = cls.objects.filter(
-        fecha_vencimiento__lt=fecha
-    )
-    
-    total_deudores = 0
-    cuotas_procesadas = 0
-    resultados = []
-    
-    for cuota in cuotas_vencidas:
-        deudores_marcados, mensaje = cuota.marcar_deudores_automaticamente()
-        
-        if deudores_marcados > 0:
-            total_deudores += deudores_marcados
-            cuotas_procesadas += 1
-        
-        resultados.append({
-            'cuota': str(cuota),
-            'deudores_marcados': deudores_marcados,
-            'mensaje': mensaje
-        })
-    
-    return {
-        'success': True,
-        'message': f'Proceso completado: {cuotas_procesadas} cuotas procesadas, {total_deudores} deudores marcados',
-        'total_deudores': total_deudores,
-        'cuotas_procesadas': cuotas_procesadas,
-        'resultados': resultados,
-        'fecha': fecha.strftime('%Y-%m-%d')
-    }
-    CuotaCurso.procesar_vencimientos_masivos = procesar_vencimientos_masivos
 
 class PagoCuota(models.Model):
     """Registro de pagos de cuotas"""
@@ -760,6 +1641,10 @@ class PagoCuota(models.Model):
     class Meta:
         unique_together = ['alumno', 'cuota']
         ordering = ['-fecha_pago']
+        indexes = [
+            models.Index(fields=['fecha_pago'], name='pago_fecha_idx'),
+            models.Index(fields=['estado_pago', 'fecha_pago'], name='pago_estado_fecha_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         # Auto-determinar estado del pago
@@ -773,11 +1658,171 @@ class PagoCuota(models.Model):
         super().save(*args, **kwargs)
         
         # Si había un registro de deudor, marcarlo como pagado
+        DeudorCuota.saldar(self.alumno_id, self.cuota_id, self.cuota.fecha_vencimiento)
+        ResumenFinancieroMensual.recalcular(CuotaCurso.objects.filter(pk=self.cuota_id))
+    
+    def delete(self, *args, **kwargs):
+        alumno_id, cuota_id = self.alumno_id, self.cuota_id
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            # Sin el pago, la deuda que había saldado vuelve a quedar abierta
+            DeudorCuota.reabrir(alumno_id, cuota_id)
+            ResumenFinancieroMensual.recalcular(CuotaCurso.objects.filter(pk=cuota_id))
+        return resultado
+    
+    @classmethod
+    def importar(cls, filas, tamaño_lote=500):
+        """
+        Importa pagos en lotes desde un iterable de (número de fila, dict) con
+        las claves alumno, cuota, familiar, monto_pagado y fecha_pago
+        (YYYY-MM-DD). Cada lote valida las referencias con búsquedas por
+        conjunto, inserta los pagos con un bulk_create y salda las deudas con
+        un único UPDATE. Las filas inválidas se informan sin cortar la importación
+        """
+        resultado = {'procesadas': 0, 'creados': 0, 'errores': []}
+        vistos = set()
+        lote = []
+        for numero, fila in filas:
+            resultado['procesadas'] += 1
+            lote.append((numero, fila))
+            if len(lote) >= tamaño_lote:
+                cls._importar_lote(lote, vistos, resultado)
+                lote = []
+        if lote:
+            cls._importar_lote(lote, vistos, resultado)
+        resultado['errores'].sort(key=lambda error: error['fila'])
+        return resultado
+    
+    @classmethod
+    def _importar_lote(cls, lote, vistos, resultado):
+        # Conversión de tipos; el importe debe entrar en la columna (max_digits)
+        campo_monto = cls._meta.get_field('monto_pagado')
+        limite_monto = Decimal(10) ** (campo_monto.max_digits - campo_monto.decimal_places)
+        convertidas = []
+        for numero, fila in lote:
+            if not isinstance(fila, dict):
+                resultado['errores'].append({
+                    'fila': numero,
+                    'errores': ["fila inválida: se esperaba un objeto con los datos del pago"]
+                })
+                continue
+            
+            errores = []
+            datos = {}
+            for campo in ['alumno', 'cuota', 'familiar']:
+                try:
+                    datos[campo] = int(fila.get(campo))
+                except (TypeError, ValueError):
+                    errores.append(f"{campo}: se esperaba un id numérico")
+            try:
+                datos['monto_pagado'] = Decimal(str(fila.get('monto_pagado'))).quantize(Decimal('0.01'))
+                if datos['monto_pagado'] <= 0:
+                    errores.append("monto_pagado: debe ser mayor a cero")
+                elif datos['monto_pagado'] >= limite_monto:
+                    errores.append(f"monto_pagado: debe ser menor a {limite_monto}")
+            except (ArithmeticError, ValueError):
+                errores.append("monto_pagado: importe inválido")
+            try:
+                datos['fecha_pago'] = date.fromisoformat(str(fila.get('fecha_pago')).strip())
+            except ValueError:
+                errores.append("fecha_pago: formato inválido, use YYYY-MM-DD")
+            
+            if errores:
+                resultado['errores'].append({'fila': numero, 'errores': errores})
+            else:
+                convertidas.append((numero, datos))
+        
+        if not convertidas:
+            return
+        
+        # Referencias del lote resueltas con una consulta por tabla
+        alumno_ids = {datos['alumno'] for _, datos in convertidas}
+        cuota_ids = {datos['cuota'] for _, datos in convertidas}
+        alumnos = set(Alumno.objects.filter(pk__in=alumno_ids).values_list('pk', flat=True))
+        cuotas = dict(CuotaCurso.objects.filter(pk__in=cuota_ids).values_list('pk', 'fecha_vencimiento'))
+        familiares = dict(
+            Familiar.objects.filter(
+                pk__in={datos['familiar'] for _, datos in convertidas}
+            ).values_list('pk', 'alumno_id')
+        )
+        existentes = set(
+            cls.objects.filter(
+                alumno_id__in=alumno_ids,
+                cuota_id__in=cuota_ids
+            ).values_list('alumno_id', 'cuota_id')
+        )
+        
+        pagos = []
+        numeros = []
+        for numero, datos in convertidas:
+            errores = []
+            par = (datos['alumno'], datos['cuota'])
+            if datos['alumno'] not in alumnos:
+                errores.append(f"alumno: no existe el alumno {datos['alumno']}")
+            if datos['cuota'] not in cuotas:
+                errores.append(f"cuota: no existe la cuota {datos['cuota']}")
+            if datos['familiar'] not in familiares:
+                errores.append(f"familiar: no existe el familiar {datos['familiar']}")
+            elif familiares[datos['familiar']] != datos['alumno']:
+                errores.append("familiar: no corresponde al alumno")
+            if par in existentes:
+                errores.append("ya existe un pago de este alumno para la cuota")
+            elif par in vistos:
+                errores.append("pago duplicado dentro de la importación")
+            
+            if errores:
+                resultado['errores'].append({'fila': numero, 'errores': errores})
+                continue
+            
+            vistos.add(par)
+            fecha_vencimiento = cuotas[datos['cuota']]
+            dias_atraso = (datos['fecha_pago'] - fecha_vencimiento).days
+            pagos.append(cls(
+                alumno_id=datos['alumno'],
+                cuota_id=datos['cuota'],
+                familiar_id=datos['familiar'],
+                monto_pagado=datos['monto_pagado'],
+                fecha_pago=datos['fecha_pago'],
+                estado_pago='con_atraso' if dias_atraso > 0 else 'a_tiempo',
+                dias_atraso_pago=max(dias_atraso, 0)
+            ))
+            numeros.append(numero)
+        
+        if not pagos:
+            return
+        
+        hoy = timezone.now().date()
+        cuotas_lote = CuotaCurso.objects.filter(pk__in={pago.cuota_id for pago in pagos})
         try:
-            deudor = DeudorCuota.objects.get(alumno=self.alumno, cuota=self.cuota)
-            deudor.marcar_como_pagado()
-        except DeudorCuota.DoesNotExist:
-            pass
+            with transaction.atomic():
+                cls.objects.bulk_create(pagos)
+                
+                # Saldar en un UPDATE las deudas abiertas que ahora tienen pago
+                DeudorCuota.objects.filter(
+                    pagado=False,
+                    cuota__in=cuotas_lote,
+                    alumno_id__in={pago.alumno_id for pago in pagos}
+                ).filter(
+                    models.Exists(
+                        cls.objects.filter(
+                            alumno_id=models.OuterRef('alumno_id'),
+                            cuota_id=models.OuterRef('cuota_id')
+                        )
+                    )
+                ).update(
+                    pagado=True,
+                    fecha_pago=timezone.now(),
+                    dias_atraso=_dias_atraso_expr([cuotas[pago.cuota_id] for pago in pagos], hoy)
+                )
+                
+                ResumenFinancieroMensual.recalcular(cuotas_lote)
+        except DatabaseError as e:
+            # Un lote rechazado por la base no corta el resto de la importación
+            for numero in numeros:
+                resultado['errores'].append({'fila': numero, 'errores': [f"no se pudo guardar el lote: {e}"]})
+            return
+        
+        resultado['creados'] += len(pagos)
     
     @property
     def descripcion_estado(self):
@@ -788,6 +1833,260 @@ class PagoCuota(models.Model):
     
     def __str__(self):
         return f"Pago de {self.alumno} - {self.cuota} ({self.descripcion_estado})"
+
+
+class ResumenFinancieroQuerySet(models.QuerySet):
+    """Consultas sobre el resumen financiero precalculado"""
+    
+    def resumen_por_curso(self, fecha):
+        """
+        Resumen de cuotas agrupado por curso sobre las filas precalculadas:
+        total, vencidas y vigentes a `fecha`, alumnos deudores de las cuotas
+        vencidas e importes facturados, cobrados y pendientes
+        """
+        vencida = models.Q(fecha_vencimiento__lt=fecha)
+        return self.order_by().values('curso', 'curso__nombre').annotate(
+            total=models.Count('pk'),
+            vencidas=models.Count('pk', filter=vencida),
+            vigentes=models.Count('pk', filter=~vencida),
+            total_deudores=Coalesce(models.Sum('alumnos_sin_pago', filter=vencida), 0),
+            monto_facturado=models.Sum('monto_facturado'),
+            monto_cobrado=models.Sum('monto_cobrado'),
+            saldo_pendiente=models.Sum('saldo_pendiente')
+        ).order_by('curso__nombre')
+
+
+class ResumenFinancieroMensual(models.Model):
+    """
+    Resumen financiero precalculado de cada cuota (curso, año y mes). Se
+    recalcula al cambiar cuotas, pagos, deudas o alumnos del curso
+    """
+    cuota = models.OneToOneField(CuotaCurso, on_delete=models.CASCADE, related_name='resumen_financiero')
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='resumenes_financieros')
+    año = models.PositiveIntegerField()
+    mes = models.PositiveIntegerField(validators=[MinValueValidator(1), MaxValueValidator(12)])
+    fecha_vencimiento = models.DateField()
+    
+    alumnos_inscriptos = models.PositiveIntegerField(default=0)
+    monto_facturado = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    monto_cobrado = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    pagos_a_tiempo = models.PositiveIntegerField(default=0)
+    pagos_con_atraso = models.PositiveIntegerField(default=0)
+    alumnos_sin_pago = models.PositiveIntegerField(
+        default=0,
+        help_text="Alumnos actuales del curso sin pago registrado para la cuota"
+    )
+    deudores_abiertos = models.PositiveIntegerField(default=0)
+    saldo_pendiente = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    actualizado = models.DateTimeField(auto_now=True)
+    
+    objects = ResumenFinancieroQuerySet.as_manager()
+    
+    class Meta:
+        unique_together = ['curso', 'año', 'mes']
+        ordering = ['-año', '-mes']
+        verbose_name = "Resumen Financiero Mensual"
+        verbose_name_plural = "Resúmenes Financieros Mensuales"
+    
+    @property
+    def pagos_realizados(self):
+        return self.pagos_a_tiempo + self.pagos_con_atraso
+    
+    @classmethod
+    def recalcular(cls, cuotas):
+        """
+        Recalcula el resumen de las cuotas indicadas: una consulta con los
+        totales como subconsultas y un upsert de las filas resultantes
+        """
+        pagos = PagoCuota.objects.filter(cuota=models.OuterRef('pk'))
+        deudas_abiertas = DeudorCuota.objects.filter(cuota=models.OuterRef('pk'), pagado=False)
+        filas = cuotas.order_by().annotate(
+            cantidad_inscriptos=_contar(Alumno.objects.filter(curso=models.OuterRef('curso'))),
+            cantidad_sin_pago=CuotaCursoQuerySet._cantidad_deudores(),
+            cantidad_a_tiempo=_contar(pagos.filter(estado_pago='a_tiempo')),
+            cantidad_con_atraso=_contar(pagos.filter(estado_pago='con_atraso')),
+            total_cobrado=_sumar(pagos, 'monto_pagado'),
+            cantidad_deudores_abiertos=_contar(deudas_abiertas),
+            total_pendiente=_sumar(deudas_abiertas, 'monto_adeudado')
+        ).values_list(
+            'pk', 'curso_id', 'año', 'mes', 'fecha_vencimiento', 'monto',
+            'cantidad_inscriptos', 'cantidad_sin_pago', 'cantidad_a_tiempo',
+            'cantidad_con_atraso', 'total_cobrado', 'cantidad_deudores_abiertos',
+            'total_pendiente'
+        )
+        
+        ahora = timezone.now()
+        resumenes = [
+            cls(
+                cuota_id=cuota_id,
+                curso_id=curso_id,
+                año=año,
+                mes=mes,
+                fecha_vencimiento=fecha_vencimiento,
+                alumnos_inscriptos=inscriptos,
+                monto_facturado=monto * inscriptos,
+                monto_cobrado=cobrado,
+                pagos_a_tiempo=a_tiempo,
+                pagos_con_atraso=con_atraso,
+                alumnos_sin_pago=sin_pago,
+                deudores_abiertos=deudores_abiertos,
+                saldo_pendiente=pendiente,
+                actualizado=ahora
+            )
+            for (cuota_id, curso_id, año, mes, fecha_vencimiento, monto, inscriptos,
+                 sin_pago, a_tiempo, con_atraso, cobrado, deudores_abiertos, pendiente) in filas
+        ]
+        cls.objects.bulk_create(
+            resumenes,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['cuota'],
+            update_fields=[
+                'curso', 'año', 'mes', 'fecha_vencimiento', 'alumnos_inscriptos',
+                'monto_facturado', 'monto_cobrado', 'pagos_a_tiempo', 'pagos_con_atraso',
+                'alumnos_sin_pago', 'deudores_abiertos', 'saldo_pendiente', 'actualizado'
+            ]
+        )
+        return len(resumenes)
+    
+    @classmethod
+    def reconstruir(cls):
+        """Reconstruye el resumen completo a partir de cuotas, pagos y deudas"""
+        with transaction.atomic():
+            cls.objects.all().delete()
+            return cls.recalcular(CuotaCurso.objects.all())
+    
+    def __str__(self):
+        return f"Resumen {self.curso} - {self.mes}/{self.año}"
+
+
+class ResumenAsistenciaDiaria(models.Model):
+    """
+    Resumen precalculado de la asistencia de alumnos por curso y día. Se
+    recalcula en la misma transacción que escribe los registros de asistencia.
+    Inscriptos y sin registro reflejan los alumnos del curso al recalcular
+    """
+    curso = models.ForeignKey(Curso, on_delete=models.CASCADE, related_name='resumenes_asistencia')
+    fecha = models.DateField()
+    
+    alumnos_inscriptos = models.PositiveIntegerField(default=0)
+    presentes = models.PositiveIntegerField(default=0)
+    ausentes = models.PositiveIntegerField(default=0)
+    llegadas_tarde = models.PositiveIntegerField(
+        default=0,
+        help_text="Presentes con hora de llegada posterior al inicio del curso"
+    )
+    sin_registro = models.PositiveIntegerField(
+        default=0,
+        help_text="Alumnos del curso sin registro de asistencia en el día"
+    )
+    actualizado = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['curso', 'fecha']
+        ordering = ['-fecha', 'curso__nombre']
+        verbose_name = "Resumen de Asistencia Diaria"
+        verbose_name_plural = "Resúmenes de Asistencia Diaria"
+    
+    @property
+    def porcentaje_asistencia(self):
+        registrados = self.presentes + self.ausentes
+        return (self.presentes / registrados * 100) if registrados > 0 else 0
+    
+    @classmethod
+    def recalcular(cls, pares):
+        """
+        Recalcula el resumen de los pares (curso_id, fecha) indicados con tres
+        consultas agrupadas y un upsert. Los pares sin registros se eliminan
+        """
+        pares = {
+            (curso_id, fecha.date() if isinstance(fecha, datetime) else fecha)
+            for curso_id, fecha in pares
+        }
+        if not pares:
+            return 0
+        cursos = {curso_id for curso_id, _ in pares}
+        fechas = {fecha for _, fecha in pares}
+        
+        inscriptos = dict(
+            Curso.objects.filter(pk__in=cursos).annotate(
+                cantidad=_contar(Alumno.objects.filter(curso=models.OuterRef('pk')))
+            ).values_list('pk', 'cantidad')
+        )
+        registros = RegistroAsistenciaAlumno.objects.filter(fecha__in=fechas).order_by()
+        conteos = {
+            (curso_id, fecha): (presentes, ausentes, tarde)
+            for curso_id, fecha, presentes, ausentes, tarde in registros.filter(
+                curso_id__in=cursos
+            ).values_list('curso', 'fecha').annotate(
+                cantidad_presentes=models.Count('pk', filter=models.Q(presente=True)),
+                cantidad_ausentes=models.Count('pk', filter=models.Q(presente=False)),
+                cantidad_tarde=models.Count('pk', filter=models.Q(
+                    presente=True, hora_llegada__gt=models.F('curso__hora_inicio')
+                ))
+            )
+        }
+        # Alumnos actuales de cada curso que ya tienen registro (en cualquier curso)
+        registrados = {
+            (curso_id, fecha): cantidad
+            for curso_id, fecha, cantidad in registros.filter(
+                alumno__curso_id__in=cursos
+            ).values_list('alumno__curso', 'fecha').annotate(cantidad=models.Count('pk'))
+        }
+        
+        ahora = timezone.now()
+        resumenes = []
+        vacios = models.Q(pk__in=[])
+        for curso_id, fecha in pares:
+            if (curso_id, fecha) not in conteos or curso_id not in inscriptos:
+                vacios |= models.Q(curso_id=curso_id, fecha=fecha)
+                continue
+            presentes, ausentes, tarde = conteos[(curso_id, fecha)]
+            resumenes.append(cls(
+                curso_id=curso_id,
+                fecha=fecha,
+                alumnos_inscriptos=inscriptos[curso_id],
+                presentes=presentes,
+                ausentes=ausentes,
+                llegadas_tarde=tarde,
+                sin_registro=max(inscriptos[curso_id] - registrados.get((curso_id, fecha), 0), 0),
+                actualizado=ahora
+            ))
+        
+        with transaction.atomic():
+            if len(resumenes) < len(pares):
+                cls.objects.filter(vacios).delete()
+            cls.objects.bulk_create(
+                resumenes,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=['curso', 'fecha'],
+                update_fields=[
+                    'alumnos_inscriptos', 'presentes', 'ausentes', 'llegadas_tarde',
+                    'sin_registro', 'actualizado'
+                ]
+            )
+        return len(resumenes)
+    
+    @classmethod
+    def recalcular_hoy(cls, cursos):
+        """Recalcula la fila del día de los cursos cuyos alumnos cambiaron"""
+        pares = cls.objects.filter(
+            curso_id__in=cursos, fecha=timezone.now().date()
+        ).values_list('curso_id', 'fecha')
+        return cls.recalcular(list(pares))
+    
+    @classmethod
+    def reconstruir(cls):
+        """Reconstruye el resumen completo a partir de los registros de asistencia"""
+        with transaction.atomic():
+            cls.objects.all().delete()
+            return cls.recalcular(
+                RegistroAsistenciaAlumno.objects.order_by().values_list('curso_id', 'fecha').distinct()
+            )
+    
+    def __str__(self):
+        return f"Asistencia {self.curso} - {self.fecha}"
 # Modelo para tokens de recuperación
 class PasswordResetToken(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.utils import timezone
 from .models import (
     CustomUser, CicloLectivo, Curso, Alumno, Familiar,
     RegistroAsistenciaMaestro, RegistroRetiroAlumno, CuotaCurso, PagoCuota,
-    ConfiguracionSistema, RegistroAsistenciaAlumno, AvisoDirectivo, DeudorCuota
+    ConfiguracionSistema, RegistroAsistenciaAlumno, AvisoDirectivo, DeudorCuota,
+    PoliticaRecargo
 )
 
 
@@ -304,6 +306,11 @@ class MarcadoAusenciasSerializer(serializers.Serializer):
         required=False, 
         help_text="Fecha para marcar ausencias (opcional, por defecto hoy)"
     )
+    dry_run = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Solo informar cuántas ausencias se marcarían, sin registrarlas"
+    )
     
     def validate_fecha(self, value):
         """Validar que la fecha no sea futura"""
@@ -325,6 +332,11 @@ class EstadisticasAsistenciaSerializer(serializers.Serializer):
     fecha_inicio = serializers.DateField(required=False)
     fecha_fin = serializers.DateField(required=False)
     curso = serializers.IntegerField(required=False)
+    group_by = serializers.ChoiceField(
+        choices=list(RegistroAsistenciaAlumno.AGRUPACIONES_ESTADISTICAS),
+        required=False,
+        help_text="Desglose opcional: curso, dia, semana, mes o alumno"
+    )
     
     def validate(self, data):
         fecha_inicio = data.get('fecha_inicio')
@@ -476,9 +488,14 @@ class CuotaCursoSerializer(serializers.ModelSerializer):
         return meses[obj.mes]
     
     def get_total_deudores(self, obj):
+        # Usar la anotación de CuotaCursoQuerySet.con_totales si está disponible
+        if hasattr(obj, 'cantidad_deudores'):
+            return obj.cantidad_deudores
         return obj.get_alumnos_deudores().count()
     
     def get_total_pagos(self, obj):
+        if hasattr(obj, 'cantidad_pagos'):
+            return obj.cantidad_pagos
         return obj.pagos.count()
 
 class DeudorCuotaSerializer(serializers.ModelSerializer):
@@ -491,8 +508,9 @@ class DeudorCuotaSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'alumno', 'alumno_nombre', 'cuota', 'cuota_detalle',
             'fecha_vencimiento', 'fecha_marcado_deudor', 'dias_atraso',
-            'dias_atraso_actual', 'monto_adeudado', 'pagado', 'fecha_pago'
+            'dias_atraso_actual', 'monto_adeudado', 'interes', 'pagado', 'fecha_pago'
         ]
+        read_only_fields = ['interes']
     
     def get_alumno_nombre(self, obj):
         return f"{obj.alumno.nombre} {obj.alumno.apellido}"
@@ -532,9 +550,32 @@ class PagoCuotaSerializer(serializers.ModelSerializer):
         ]
         return f"{meses[obj.cuota.mes]} {obj.cuota.año} - {obj.cuota.curso.nombre}"
 
+class PoliticaRecargoSerializer(serializers.ModelSerializer):
+    actualizado_por_nombre = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = PoliticaRecargo
+        fields = [
+            'id', 'monto_fijo', 'porcentaje_diario', 'tope', 'fecha_actualizacion',
+            'actualizado_por', 'actualizado_por_nombre'
+        ]
+        read_only_fields = ['fecha_actualizacion', 'actualizado_por']
+    
+    def get_actualizado_por_nombre(self, obj):
+        if obj.actualizado_por:
+            return f"{obj.actualizado_por.first_name} {obj.actualizado_por.last_name}"
+        return None
+
+
 class ProcesamientoVencimientosSerializer(serializers.Serializer):
     """Serializer para el endpoint de procesamiento de vencimientos"""
     fecha = serializers.DateField(required=False, help_text="Fecha para procesar vencimientos (por defecto: hoy)")
+    modo = serializers.ChoiceField(
+        choices=['completo', 'incremental'],
+        required=False,
+        default='completo',
+        help_text="completo: revisa todas las cuotas vencidas; incremental: solo lo que cambió desde la última ejecución"
+    )
 
 
 # Serializers específicos para operaciones comunes
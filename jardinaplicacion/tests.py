@@ -1,3 +1,594 @@
-from django.test import TestCase
+import json
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.test import AsyncClient, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from . import eventos
+from .models import (
+    Alumno, CicloLectivo, ControlVencimientos, CuotaCurso, CustomUser, Curso, DeudorCuota,
+    Familiar, PagoCuota, RegistroAsistenciaAlumno, ResumenAsistenciaDiaria, ResumenFinancieroMensual
+)
+
+
+class CuotaCursoListadoTests(TestCase):
+    """El listado de cuotas no debe ejecutar consultas por fila"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.directivo = CustomUser.objects.create_user(
+            username='directivo', password='clave-segura-123', dni='1000', es_directivo=True
+        )
+        cls.ciclo = CicloLectivo.objects.create(inicio=date(2025, 3, 1), finalizacion=date(2025, 12, 15))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.directivo)
+
+    def crear_curso_con_cuotas(self, numero, meses):
+        curso = Curso.objects.create(
+            nombre=f'Sala {numero}', cupo_habilitado=20, turno='mañana',
+            horario='8:00 - 12:00', edad_sala=3, ciclo_lectivo=self.ciclo,
+            cuota_mensual=Decimal('1000.00')
+        )
+        alumnos = [
+            Alumno.objects.create(
+                nombre=f'Alumno {numero}-{i}', apellido='Prueba', dni=f'{numero}{i:03d}',
+                fecha_nacimiento=date(2021, 1, 1), curso=curso
+            )
+            for i in range(3)
+        ]
+        familiar = Familiar.objects.create(
+            nombre='Familiar', apellido='Prueba', dni='1', telefono='1',
+            relacion_con_alumno='madre', alumno=alumnos[0]
+        )
+        for mes in meses:
+            cuota = CuotaCurso.objects.create(
+                curso=curso, mes=mes, año=2025, monto=Decimal('1000.00'),
+                fecha_vencimiento=date(2025, mes, 10)
+            )
+            PagoCuota.objects.create(
+                alumno=alumnos[0], cuota=cuota, familiar=familiar,
+                monto_pagado=Decimal('1000.00'), fecha_pago=date(2025, mes, 5)
+            )
+
+    def consultas_listado(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('cuotacurso-list'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(consultas)
+
+    def test_listado_con_cantidad_fija_de_consultas(self):
+        self.crear_curso_con_cuotas(1, range(3, 5))
+        _, consultas_pocas_filas = self.consultas_listado()
+
+        for numero in range(2, 6):
+            self.crear_curso_con_cuotas(numero, range(3, 13))
+        response, consultas_muchas_filas = self.consultas_listado()
+
+        self.assertEqual(len(response.data), 42)
+        self.assertEqual(consultas_pocas_filas, consultas_muchas_filas)
+
+    def test_totales_anotados(self):
+        self.crear_curso_con_cuotas(1, [3])
+        response, _ = self.consultas_listado()
+
+        cuota = response.data[0]
+        self.assertEqual(cuota['curso_nombre'], 'Sala 1')
+        self.assertEqual(cuota['total_pagos'], 1)
+        self.assertEqual(cuota['total_deudores'], 2)
+
+    def test_reportes_rechazan_filtros_no_numericos(self):
+        self.crear_curso_con_cuotas(1, [3])
+        for nombre in ['cuotacurso-resumen-cuotas', 'cuotacurso-cuotas-vencidas']:
+            for filtro in [{'curso': 'x'}, {'año': '2025a'}]:
+                response = self.client.get(reverse(nombre), filtro)
+                self.assertEqual(response.status_code, 400)
+            self.assertEqual(self.client.get(reverse(nombre), {'año': 2025}).status_code, 200)
+
+    def test_as_of_valida_filtros_y_redondea_montos(self):
+        self.crear_curso_con_cuotas(1, [3])
+        for parametro in ['curso', 'año', 'mes', 'cuota', 'alumno']:
+            response = self.client.get(reverse('deudorcuota-list'), {'as_of': '2025-04-01', parametro: 'x'})
+            self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(reverse('cuotacurso-resumen-cuotas'), {'as_of': '2025-04-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(str(response.data['por_curso']['Sala 1']['monto_cobrado']), '1000.00')
+        self.assertEqual(str(response.data['resumen_general']['monto_cobrado']), '1000.00')
+
+
+class EventosAvisosTests(TestCase):
+    """Los avisos a directivos se publican a las conexiones abiertas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.maestro = CustomUser.objects.create_user(
+            username='maestro', password='clave-segura-123', dni='2000',
+            es_maestro=True, first_name='Ana', last_name='Pérez'
+        )
+        ciclo = CicloLectivo.objects.create(inicio=date(2025, 3, 1), finalizacion=date(2025, 12, 15))
+        cls.curso = Curso.objects.create(
+            nombre='Sala Roja', cupo_habilitado=20, turno='mañana',
+            horario='8:00 - 12:00', edad_sala=3, ciclo_lectivo=ciclo
+        )
+        cls.curso.maestros.add(cls.maestro)
+
+    def avisar_ingreso(self):
+        client = APIClient()
+        client.force_authenticate(self.maestro)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(
+                reverse('registroasistenciamaestro-avisar-directivo-ingreso'),
+                {'curso_id': self.curso.id}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_aviso_publicado_y_suscripcion_liberada(self):
+        async def escuchar():
+            flujo = eventos.flujo_eventos(eventos.difusor.suscribir())
+            await flujo.__anext__()
+            await sync_to_async(self.avisar_ingreso)()
+            mensaje = await flujo.__anext__()
+            await flujo.aclose()
+            return mensaje
+
+        mensaje = async_to_sync(escuchar)()
+
+        self.assertIn('event: aviso_creado', mensaje)
+        self.assertIn('"curso_nombre": "Sala Roja"', mensaje)
+        self.assertEqual(eventos.difusor.cantidad_suscripciones, 0)
+
+    def test_flujo_requiere_ticket_de_directivo(self):
+        directivo = CustomUser.objects.create_user(
+            username='directivo', password='clave-segura-123', dni='1000', es_directivo=True
+        )
+        client = APIClient()
+        client.force_authenticate(self.maestro)
+        self.assertEqual(client.post(reverse('avisodirectivo-ticket-eventos')).status_code, 403)
+        client.force_authenticate(directivo)
+        ticket = client.post(reverse('avisodirectivo-ticket-eventos')).data['ticket']
+        url = reverse('eventos_avisos')
+
+        async def conectar():
+            client = AsyncClient()
+            invalido = await client.get(url, {'ticket': ticket + 'x'})
+            token_api = await client.get(url, {'token': (await Token.objects.acreate(user=directivo)).key})
+            maestro = await client.get(url, {'ticket': eventos.emitir_ticket(self.maestro)})
+            response = await client.get(url, {'ticket': ticket})
+            flujo = aiter(response.streaming_content)
+            await anext(flujo)
+            conectado = await anext(flujo)
+            await flujo.aclose()
+            return invalido.status_code, token_api.status_code, maestro.status_code, response, conectado
+
+        invalido, token_api, maestro, response, conectado = async_to_sync(conectar)()
+
+        self.assertEqual(invalido, 401)
+        self.assertEqual(token_api, 401)
+        self.assertEqual(maestro, 403)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn(b'event: conectado', conectado)
+
+    def test_ticket_vencido(self):
+        ticket = eventos.emitir_ticket(self.maestro)
+        self.assertEqual(eventos.usuario_del_ticket(ticket), self.maestro.pk)
+        with mock.patch('time.time', return_value=time.time() + eventos.VIGENCIA_TICKET + 1):
+            self.assertIsNone(eventos.usuario_del_ticket(ticket))
+
+
+class ResumenAsistenciaDiariaTests(TestCase):
+    """El resumen diario se mantiene al escribir y coincide con una reconstrucción"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.maestro = CustomUser.objects.create_user(
+            username='maestro', password='clave-segura-123', dni='2000', es_maestro=True
+        )
+        ciclo = CicloLectivo.objects.create(inicio=date(2025, 3, 1), finalizacion=date(2025, 12, 15))
+        cls.curso = Curso.objects.create(
+            nombre='Sala Verde', cupo_habilitado=20, turno='mañana',
+            horario='8:00 - 12:00', edad_sala=3, ciclo_lectivo=ciclo
+        )
+        cls.curso.maestros.add(cls.maestro)
+        cls.alumnos = [
+            Alumno.objects.create(
+                nombre=f'Alumno {i}', apellido='Prueba', dni=f'3{i:03d}',
+                fecha_nacimiento=date(2021, 1, 1), curso=cls.curso
+            )
+            for i in range(4)
+        ]
+
+    def resumen(self):
+        return list(ResumenAsistenciaDiaria.objects.order_by('curso', 'fecha').values_list(
+            'curso', 'fecha', 'alumnos_inscriptos', 'presentes', 'ausentes', 'llegadas_tarde', 'sin_registro'
+        ))
+
+    def test_registro_masivo_y_baja(self):
+        client = APIClient()
+        client.force_authenticate(self.maestro)
+        response = client.post(reverse('registroasistenciaalumno-registrar-masiva'), {
+            'curso': self.curso.id, 'fecha': '2025-06-02', 'maestro': self.maestro.id,
+            'registros': [
+                {'alumno': self.alumnos[0].id, 'presente': True, 'hora_llegada': '08:20'},
+                {'alumno': self.alumnos[1].id, 'presente': True, 'hora_llegada': '07:50'},
+                {'alumno': self.alumnos[2].id, 'presente': False},
+            ]
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.resumen(), [(self.curso.id, date(2025, 6, 2), 4, 2, 1, 1, 1)])
+
+        RegistroAsistenciaAlumno.objects.get(alumno=self.alumnos[0], fecha=date(2025, 6, 2)).delete()
+        incremental = self.resumen()
+        ResumenAsistenciaDiaria.reconstruir()
+
+        self.assertEqual(incremental, [(self.curso.id, date(2025, 6, 2), 4, 1, 1, 0, 2)])
+        self.assertEqual(incremental, self.resumen())
+
+    def test_baja_de_alumno_recalcula_dias_pasados(self):
+        for alumno in self.alumnos[:2]:
+            for dia in (2, 3):
+                RegistroAsistenciaAlumno.objects.create(
+                    alumno=alumno, curso=self.curso, maestro=self.maestro,
+                    fecha=date(2025, 6, dia), presente=True
+                )
+        self.alumnos[0].delete()
+        incremental = self.resumen()
+        ResumenAsistenciaDiaria.reconstruir()
+
+        self.assertEqual([fila[3] for fila in incremental], [1, 1])
+        self.assertEqual(incremental, self.resumen())
+
+    def test_tablero_valida_parametros(self):
+        client = APIClient()
+        client.force_authenticate(self.maestro)
+        url = reverse('registroasistenciaalumno-tablero-asistencia')
+        for parametros in [{'curso': 'abc'}, {'año': '2025a'}, {'mes': 'x'}, {'mes': 13}]:
+            self.assertEqual(client.get(url, parametros).status_code, 400)
+        self.assertEqual(client.get(url, {'año': 2025, 'curso': self.curso.id}).status_code, 200)
+
+    def test_marcado_forzado(self):
+        directivo = CustomUser.objects.create_user(
+            username='directivo', password='clave-segura-123', dni='1000', es_directivo=True
+        )
+        client = APIClient()
+        client.force_authenticate(directivo)
+        url = reverse('registroasistenciaalumno-forzar-marcado-ausencias')
+
+        # Un curso: sin verificar horario; si el motor no procesa la fecha, 400 y no 500
+        sin_procesar = {'success': False, 'message': 'No se procesan ausencias en fines de semana'}
+        with mock.patch.object(Curso, 'procesar_ausencias_alumnos', return_value=sin_procesar):
+            response = client.post(url, {'curso': self.curso.id, 'fecha': '2025-06-02'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], sin_procesar['message'])
+
+        response = client.post(url, {'curso': self.curso.id, 'fecha': '2025-06-02'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['ausencias_marcadas'], 4)
+
+        # Todos los cursos: se respeta el horario de cada uno
+        with mock.patch.object(Curso, 'procesar_ausencias_alumnos', wraps=Curso.procesar_ausencias_alumnos) as motor:
+            response = client.post(url, {'fecha': '2025-06-03'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(motor.call_args.kwargs.get('verificar_horario', True))
+
+
+class DeudoresEventosTests(TestCase):
+    """Las deudas se mantienen al pagar, al cambiar de curso y al vencer cuotas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hoy = timezone.now().date()
+        ciclo = CicloLectivo.objects.create(inicio=date(2025, 3, 1), finalizacion=date(2025, 12, 15))
+        cls.sala_a, cls.sala_b = [
+            Curso.objects.create(
+                nombre=f'Sala {letra}', cupo_habilitado=20, turno='mañana',
+                horario='8:00 - 12:00', edad_sala=3, ciclo_lectivo=ciclo
+            )
+            for letra in 'AB'
+        ]
+        cls.alumno = Alumno.objects.create(
+            nombre='Alumno', apellido='Prueba', dni='4000',
+            fecha_nacimiento=date(2021, 1, 1), curso=cls.sala_a
+        )
+        cls.familiar = Familiar.objects.create(
+            nombre='Familiar', apellido='Prueba', dni='4001', telefono='1',
+            relacion_con_alumno='madre', alumno=cls.alumno
+        )
+
+    def crear_cuota(self, curso, mes, dias_vencida):
+        return CuotaCurso.objects.create(
+            curso=curso, mes=mes, año=2025, monto=Decimal('1000.00'),
+            fecha_vencimiento=self.hoy - timedelta(days=dias_vencida)
+        )
+
+    def deudas(self, **filtros):
+        return DeudorCuota.objects.filter(alumno=self.alumno, **filtros)
+
+    def test_pago_salda_y_su_baja_reabre_la_deuda(self):
+        cuota = self.crear_cuota(self.sala_a, 3, 20)
+        CuotaCurso.procesar_vencimientos_masivos()
+        self.assertEqual(self.deudas(pagado=False).count(), 1)
+
+        pago = PagoCuota.objects.create(
+            alumno=self.alumno, cuota=cuota, familiar=self.familiar,
+            monto_pagado=Decimal('1000.00'), fecha_pago=self.hoy
+        )
+        deuda = self.deudas().get()
+        self.assertTrue(deuda.pagado)
+        self.assertIsNotNone(deuda.fecha_pago)
+
+        pago.delete()
+        deuda.refresh_from_db()
+        self.assertFalse(deuda.pagado)
+        self.assertIsNone(deuda.fecha_pago)
+        self.assertEqual(deuda.dias_atraso, 20)
+
+    def test_cambio_de_curso_conserva_deudas_previas(self):
+        for mes in (3, 4):
+            self.crear_cuota(self.sala_a, mes, 60 - mes * 10)
+            self.crear_cuota(self.sala_b, mes, 60 - mes * 10)
+        CuotaCurso.procesar_vencimientos_masivos()
+        self.assertEqual(self.deudas(cuota__curso=self.sala_a, pagado=False).count(), 2)
+
+        self.alumno.curso = self.sala_b
+        self.alumno.save()
+        CuotaCurso.procesar_vencimientos_masivos()
+
+        # Lo adeudado en la sala A se conserva y no se inventan deudas de la
+        # sala B anteriores al traslado
+        self.assertEqual(self.deudas(cuota__curso=self.sala_a, pagado=False).count(), 2)
+        self.assertFalse(self.deudas(cuota__curso=self.sala_b).exists())
+
+        # Las cuotas de la sala B que vencen desde el traslado sí se adeudan
+        Alumno.objects.filter(pk=self.alumno.pk).update(
+            fecha_cambio_curso=timezone.now() - timedelta(days=25)
+        )
+        CuotaCurso.procesar_vencimientos_masivos()
+        self.assertEqual(
+            list(self.deudas(cuota__curso=self.sala_b).values_list('cuota__mes', flat=True)), [4]
+        )
+
+    def test_as_of_hoy_coincide_con_deudores_tras_traslado(self):
+        directivo = CustomUser.objects.create_user(
+            username='directivo', password='clave-segura-123', dni='4100', es_directivo=True
+        )
+        otro = Alumno.objects.create(
+            nombre='Otro', apellido='Prueba', dni='4200',
+            fecha_nacimiento=date(2021, 1, 1), curso=self.sala_b
+        )
+        for curso in (self.sala_a, self.sala_b):
+            self.crear_cuota(curso, 3, 30)
+        CuotaCurso.procesar_vencimientos_masivos()
+
+        # Traslados de A a B y de B a A hace 20 días; abril vence después
+        for alumno, curso in [(self.alumno, self.sala_b), (otro, self.sala_a)]:
+            alumno.curso = curso
+            alumno.save()
+        Alumno.objects.filter(pk__in=[self.alumno.pk, otro.pk]).update(
+            fecha_cambio_curso=timezone.now() - timedelta(days=20)
+        )
+        for curso in (self.sala_a, self.sala_b):
+            self.crear_cuota(curso, 4, 10)
+        CuotaCurso.procesar_vencimientos_masivos()
+
+        client = APIClient()
+        client.force_authenticate(directivo)
+        vivo = client.get(reverse('deudorcuota-list')).data
+        as_of = client.get(reverse('deudorcuota-list'), {'as_of': self.hoy.isoformat()}).data['deudas']
+        pares_vivo = sorted((deuda['alumno'], deuda['cuota']) for deuda in vivo)
+        pares_as_of = sorted((deuda['alumno'], deuda['cuota']) for deuda in as_of)
+
+        # Cada uno debe la cuota de marzo de su curso anterior y la de abril del nuevo
+        self.assertEqual(len(pares_vivo), 4)
+        self.assertEqual(pares_as_of, pares_vivo)
+
+    def test_por_alumno_sin_paginar_devuelve_todos(self):
+        directivo = CustomUser.objects.create_user(
+            username='directivo', password='clave-segura-123', dni='4100', es_directivo=True
+        )
+        for i in range(3):
+            Alumno.objects.create(
+                nombre=f'Otro {i}', apellido='Prueba', dni=f'41{i:02d}',
+                fecha_nacimiento=date(2021, 1, 1), curso=self.sala_a
+            )
+        self.crear_cuota(self.sala_a, 3, 20)
+        CuotaCurso.procesar_vencimientos_masivos()
+        client = APIClient()
+        client.force_authenticate(directivo)
+
+        def consultar(**parametros):
+            response = client.get(reverse('deudorcuota-por-alumno'), parametros)
+            self.assertEqual(response.status_code, 200)
+            return json.loads(b''.join(response.streaming_content))
+
+        todos = consultar()
+        self.assertEqual(len(todos['alumnos']), 4)
+        self.assertNotIn('page', todos)
+
+        pagina = consultar(page_size=3, page=2)
+        self.assertEqual([alumno['alumno_id'] for alumno in pagina['alumnos']], [todos['alumnos'][3]['alumno_id']])
+        self.assertEqual(pagina['total_paginas'], 2)
+
+    def test_incremental_avanza_la_marca_de_agua(self):
+        CuotaCurso.procesar_vencimientos_masivos()
+        control = ControlVencimientos.get_control()
+        self.assertEqual(control.fecha_corte, self.hoy)
+
+        # Una cuota que venció después de la marca de agua entra en la ventana
+        ControlVencimientos.objects.update(fecha_corte=self.hoy - timedelta(days=15))
+        self.crear_cuota(self.sala_a, 5, 10)
+        CuotaCurso.procesar_vencimientos_incremental()
+        self.assertEqual(self.deudas().count(), 1)
+        self.assertEqual(ControlVencimientos.get_control().fecha_corte, self.hoy)
+
+        # Una cuota vencida que no se modificó desde la última ejecución no se vuelve a tomar
+        cuota = self.crear_cuota(self.sala_a, 6, 12)
+        CuotaCurso.objects.filter(pk=cuota.pk).update(
+            fecha_actualizacion=timezone.now() - timedelta(days=1)
+        )
+        CuotaCurso.procesar_vencimientos_incremental()
+        self.assertEqual(self.deudas().count(), 1)
+
+    def test_incremental_marca_cuotas_retroactivas(self):
+        CuotaCurso.procesar_vencimientos_masivos()
+
+        # Cuotas con vencimiento anterior a la marca de agua creadas después
+        self.crear_cuota(self.sala_a, 3, 40)
+        CuotaCurso.generar_cuotas([self.sala_a], [(self.hoy.year - 1, 4)])
+        CuotaCurso.procesar_vencimientos_incremental()
+
+        self.assertEqual(
+            sorted(self.deudas(pagado=False).values_list('cuota__año', 'cuota__mes')),
+            [(2025, 3), (self.hoy.year - 1, 4)]
+        )
+
+
+class ResumenFinancieroMensualTests(TestCase):
+    """El resumen financiero mantenido al escribir coincide con una reconstrucción"""
+
+    def resumen(self):
+        return list(ResumenFinancieroMensual.objects.order_by('cuota').values_list(
+            'cuota', 'curso', 'año', 'mes', 'alumnos_inscriptos', 'monto_facturado', 'monto_cobrado',
+            'pagos_a_tiempo', 'pagos_con_atraso', 'alumnos_sin_pago', 'deudores_abiertos', 'saldo_pendiente'
+        ))
+
+    def test_escrituras_sucesivas_coinciden_con_reconstruir(self):
+        hoy = timezone.now().date()
+        ciclo = CicloLectivo.objects.create(inicio=date(2025, 3, 1), finalizacion=date(2025, 12, 15))
+        sala_a, sala_b = [
+            Curso.objects.create(
+                nombre=f'Sala {letra}', cupo_habilitado=20, turno='mañana',
+                horario='8:00 - 12:00', edad_sala=3, ciclo_lectivo=ciclo
+            )
+            for letra in 'AB'
+        ]
+        cuotas = [
+            CuotaCurso.objects.create(
+                curso=curso, mes=mes, año=2025, monto=Decimal('1000.00'),
+                fecha_vencimiento=hoy + timedelta(days=(mes - 5) * 30)
+            )
+            for curso in (sala_a, sala_b)
+            for mes in (3, 4, 5, 6)
+        ]
+        alumnos = [
+            Alumno.objects.create(
+                nombre=f'Alumno {i}', apellido='Prueba', dni=f'5{i:03d}',
+                fecha_nacimiento=date(2021, 1, 1), curso=sala_a if i % 2 else sala_b
+            )
+            for i in range(5)
+        ]
+        familiar = Familiar.objects.create(
+            nombre='Familiar', apellido='Prueba', dni='5100', telefono='1',
+            relacion_con_alumno='madre', alumno=alumnos[0]
+        )
+        CuotaCurso.procesar_vencimientos_masivos()
+
+        pagos = [
+            PagoCuota.objects.create(
+                alumno=alumno, cuota=cuota, familiar=familiar,
+                monto_pagado=Decimal('1000.00'), fecha_pago=hoy
+            )
+            for alumno in alumnos[:3]
+            for cuota in cuotas
+            if cuota.curso_id == alumno.curso_id and cuota.mes in (3, 5)
+        ]
+        pagos[0].delete()
+        alumnos[1].curso = sala_b
+        alumnos[1].save()
+        alumnos[4].delete()
+        cuotas[-1].delete()
+
+        incremental = self.resumen()
+        ResumenFinancieroMensual.reconstruir()
+        self.assertEqual(len(incremental), 7)
+        self.assertEqual(incremental, self.resumen())
+
+
+class PagoCuotaImportacionTests(TestCase):
+    """La importación masiva informa errores por fila, salda deudas y actualiza el resumen"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.directivo = CustomUser.objects.create_user(
+            username='directivo', password='clave-segura-123', dni='6000', es_directivo=True
+        )
+        cls.hoy = timezone.now().date()
+        ciclo = CicloLectivo.objects.create(inicio=date(2025, 3, 1), finalizacion=date(2025, 12, 15))
+        curso = Curso.objects.create(
+            nombre='Sala Roja', cupo_habilitado=20, turno='mañana',
+            horario='8:00 - 12:00', edad_sala=3, ciclo_lectivo=ciclo
+        )
+        cls.alumnos = [
+            Alumno.objects.create(
+                nombre=f'Alumno {i}', apellido='Prueba', dni=f'6{i:03d}',
+                fecha_nacimiento=date(2021, 1, 1), curso=curso
+            )
+            for i in range(2)
+        ]
+        cls.familiares = [
+            Familiar.objects.create(
+                nombre='Familiar', apellido='Prueba', dni=f'61{i:02d}', telefono='1',
+                relacion_con_alumno='madre', alumno=alumno
+            )
+            for i, alumno in enumerate(cls.alumnos)
+        ]
+        cls.cuota = CuotaCurso.objects.create(
+            curso=curso, mes=3, año=2025, monto=Decimal('1000.00'),
+            fecha_vencimiento=cls.hoy - timedelta(days=10)
+        )
+
+    def test_importar_pagos(self):
+        CuotaCurso.procesar_vencimientos_masivos()
+        self.assertEqual(self.cuota.resumen_financiero.deudores_abiertos, 2)
+
+        client = APIClient()
+        client.force_authenticate(self.directivo)
+        pago = {
+            'alumno': self.alumnos[0].id, 'cuota': self.cuota.id, 'familiar': self.familiares[0].id,
+            'monto_pagado': '1000.00', 'fecha_pago': self.hoy.isoformat()
+        }
+        response = client.post(reverse('pagocuota-importar'), {'pagos': [
+            pago,
+            {**pago, 'alumno': self.alumnos[1].id},
+            {**pago, 'alumno': self.alumnos[1].id, 'familiar': self.familiares[1].id, 'monto_pagado': '1e12'},
+            {**pago, 'fecha_pago': '10/03/2025'},
+            'no es un pago',
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['procesadas'], 5)
+        self.assertEqual(response.data['creados'], 1)
+        self.assertEqual([error['fila'] for error in response.data['errores']], [2, 3, 4, 5])
+        self.assertIn('familiar: no corresponde al alumno', response.data['errores'][0]['errores'])
+        self.assertTrue(response.data['errores'][1]['errores'][0].startswith('monto_pagado: debe ser menor'))
+
+        deudas = dict(DeudorCuota.objects.values_list('alumno_id', 'pagado'))
+        self.assertEqual(deudas, {self.alumnos[0].id: True, self.alumnos[1].id: False})
+
+        resumen = ResumenFinancieroMensual.objects.get(cuota=self.cuota)
+        self.assertEqual(resumen.monto_cobrado, Decimal('1000.00'))
+        self.assertEqual(resumen.deudores_abiertos, 1)
+        self.assertEqual(resumen.alumnos_sin_pago, 1)
+
+
+    def test_exportar_valida_ciclo(self):
+        client = APIClient()
+        client.force_authenticate(self.directivo)
+        for nombre in ['pagocuota-exportar', 'deudorcuota-exportar']:
+            self.assertEqual(client.get(reverse(nombre), {'ciclo': 'x'}).status_code, 400)
+
+        CuotaCurso.procesar_vencimientos_masivos()
+        response = client.get(reverse('deudorcuota-exportar'), {'ciclo': self.cuota.curso.ciclo_lectivo_id})
+        self.assertEqual(response.status_code, 200)
+        lineas = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lineas), 3)
@@ -29,6 +29,8 @@ urlpatterns = [
     path('auth/reset-password/', views.reset_password, name='reset_password'),
     path('auth/verify-reset-token/', views.verify_reset_token, name='verify_reset_token'),
     path('api/recordatorios/ejecutar/', views.ejecutar_recordatorios, name='ejecutar_recordatorios'),
+    # Eventos en vivo de avisos (antes del router para no confundirse con un id)
+    path('avisos-directivo/eventos/', views.eventos_avisos, name='eventos_avisos'),
     # Incluir todas las rutas del router
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -4,8 +4,25 @@ from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import login, logout, authenticate
 from django.utils import timezone
-from django.db.models import Q
-from datetime import date
+from django.db.models import F, Q, Count, Max, Sum, FilteredRelation, Prefetch
+from django.db import connection
+from django.db.models.functions import TruncMonth, JSONObject
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.utils.encoders import JSONEncoder
+from datetime import date, datetime
+from itertools import groupby
+import csv
+import json
+import tempfile
+from django.http import FileResponse, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # La exportación XLSX queda deshabilitada sin openpyxl
+    Workbook = None
+from decimal import Decimal
 from django.shortcuts import get_object_or_404
 import secrets
 from django.core.management import call_command
@@ -30,8 +47,11 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from .models import (
     CustomUser, CicloLectivo, Curso, Alumno, Familiar,
     RegistroAsistenciaMaestro, RegistroRetiroAlumno, CuotaCurso, PagoCuota,
-    ConfiguracionSistema, RegistroAsistenciaAlumno,AvisoDirectivo, DeudorCuota, PasswordResetToken,generate_random_token
+    ConfiguracionSistema, RegistroAsistenciaAlumno,AvisoDirectivo, DeudorCuota, PasswordResetToken,generate_random_token,
+    ResumenFinancieroMensual, PoliticaRecargo, ResumenAsistenciaDiaria
 )
+from . import eventos
+from .importacion import FORMATOS_IMPORTACION, detectar_formato, leer_filas
 from .serializers import (
     CustomUserSerializer, LoginSerializer, CicloLectivoSerializer,
     CursoSerializer, AlumnoSerializer, FamiliarSerializer, ProcesamientoVencimientosSerializer, ProcesarAusenciasMasivasSerializer,
@@ -42,7 +62,8 @@ from .serializers import (
     ProcesarAvisoSerializer,AvisarDirectivoSerializer,  # Add this line
     AvisoDirectivoSerializer,   # Add this line
     ProcesarAvisoSerializer,  DeudorCuotaSerializer,  ForgotPasswordSerializer, ResetPasswordSerializer, 
-    ForgotUsernameSerializer, MarcarAusenteSerializer
+    ForgotUsernameSerializer, MarcarAusenteSerializer, PoliticaRecargoSerializer,
+    MarcadoAusenciasSerializer, EstadisticasAsistenciaSerializer
 )
 
 
@@ -64,6 +85,139 @@ class IsMaestroOrDirectivo(permissions.BasePermission):
         return request.user.is_authenticated and (request.user.es_maestro or request.user.es_directivo)
 
 
+class _Eco:
+    """Pseudo-buffer que devuelve lo escrito, para generar el CSV fila por fila"""
+    def write(self, valor):
+        return valor
+
+
+def _en_bloques(queryset, orden, tamaño=2000):
+    """
+    Recorre un queryset de values() ordenado por `orden` (campos ascendentes
+    incluidos en las filas, el último único, como id) leyendo bloques completos
+    con paginación por clave: cada bloque sigue a la última fila del anterior.
+    A diferencia de iterator() no abre cursores del lado del servidor, que no
+    sobreviven fuera de una transacción detrás de PgBouncer en modo transacción,
+    y a diferencia de OFFSET las filas que se agregan durante la exportación no
+    desplazan los bloques
+    """
+    queryset = queryset.order_by(*orden)
+    ultima = None
+    while True:
+        bloque = queryset
+        if ultima is not None:
+            # (a, b, id) > (a0, b0, id0) expresado como condiciones encadenadas
+            siguiente = Q()
+            for indice, campo in enumerate(orden):
+                siguiente |= Q(
+                    **{anterior: ultima[anterior] for anterior in orden[:indice]},
+                    **{f'{campo}__gt': ultima[campo]}
+                )
+            bloque = bloque.filter(siguiente)
+        bloque = list(bloque[:tamaño])
+        yield from bloque
+        if len(bloque) < tamaño:
+            return
+        ultima = bloque[-1]
+
+
+def _exportar_filas(filas, columnas, nombre, formato):
+    """
+    Exporta `filas` (dicts de values()) con las `columnas` [(clave, título)].
+    CSV se envía en streaming; XLSX se arma en un archivo temporal con
+    openpyxl en modo write_only, así la memoria no crece con las filas
+    """
+    if formato == 'xlsx':
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet(nombre)
+        hoja.append([titulo for _, titulo in columnas])
+        for fila in filas:
+            valores = []
+            for clave, _ in columnas:
+                valor = fila[clave]
+                if isinstance(valor, datetime) and timezone.is_aware(valor):
+                    valor = timezone.localtime(valor).replace(tzinfo=None)
+                valores.append(valor)
+            hoja.append(valores)
+        archivo = tempfile.TemporaryFile()
+        libro.save(archivo)
+        archivo.seek(0)
+        return FileResponse(
+            archivo,
+            as_attachment=True,
+            filename=f'{nombre}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+    
+    escritor = csv.writer(_Eco())
+    
+    def generar():
+        # BOM para que Excel reconozca los acentos
+        yield '\ufeff' + escritor.writerow([titulo for _, titulo in columnas])
+        for fila in filas:
+            yield escritor.writerow([fila[clave] for clave, _ in columnas])
+    
+    respuesta = StreamingHttpResponse(generar(), content_type='text/csv; charset=utf-8')
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre}.csv"'
+    return respuesta
+
+
+def _fecha_as_of(request):
+    """Fecha del parámetro as_of (None si no se indicó) o una respuesta de error"""
+    as_of = request.query_params.get('as_of')
+    if not as_of:
+        return None, None
+    try:
+        fecha = datetime.strptime(as_of, '%Y-%m-%d').date()
+    except ValueError:
+        return None, Response(
+            {'error': 'Formato de as_of inválido. Use YYYY-MM-DD'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if fecha > timezone.now().date():
+        return None, Response(
+            {'error': 'as_of no puede ser una fecha futura'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return fecha, None
+
+
+def _parametros_enteros(request, nombres):
+    """
+    Parámetros numéricos opcionales de la consulta ({nombre: int} solo con los
+    indicados) o una respuesta de error
+    """
+    parametros = {}
+    for nombre in nombres:
+        valor = request.query_params.get(nombre)
+        if not valor:
+            continue
+        try:
+            parametros[nombre] = int(valor)
+        except ValueError:
+            return None, Response(
+                {'error': f'{nombre} debe ser un número entero'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    return parametros, None
+
+
+def _formato_exportacion(request):
+    """Formato pedido (csv o xlsx) o una respuesta de error"""
+    formato = request.query_params.get('formato', 'csv').lower()
+    if formato not in ['csv', 'xlsx']:
+        return None, Response(
+            {'error': 'Formato inválido. Use: csv o xlsx'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if formato == 'xlsx' and Workbook is None:
+        return None, Response(
+            {'error': 'La exportación XLSX no está disponible: falta instalar openpyxl'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return formato, None
+
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def login_view(request):
@@ -225,6 +379,49 @@ class CicloLectivoViewSet(viewsets.ModelViewSet):
     queryset = CicloLectivo.objects.all()
     serializer_class = CicloLectivoSerializer
     permission_classes = [IsDirectivo]
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsDirectivo])
+    def generar_cuotas(self, request, pk=None):
+        """
+        Generar las cuotas de todos los cursos del ciclo para cada mes del ciclo.
+        Con dry_run=true solo devuelve la vista previa de las cuotas a crear
+        """
+        ciclo = self.get_object()
+        dry_run = str(request.data.get('dry_run', request.query_params.get('dry_run', 'false'))).lower() in ['true', '1']
+        
+        try:
+            cursos = ciclo.cursos.order_by('nombre')
+            cuotas_nuevas, cuotas_existentes = CuotaCurso.generar_cuotas(
+                cursos, ciclo.meses_del_ciclo(), dry_run=dry_run
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Error al generar cuotas: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        por_curso = {}
+        for cuota in cuotas_nuevas:
+            por_curso.setdefault(cuota.curso.nombre, []).append({
+                'mes': cuota.mes,
+                'año': cuota.año,
+                'monto': cuota.monto,
+                'fecha_vencimiento': cuota.fecha_vencimiento
+            })
+        
+        if dry_run:
+            mensaje = f'Vista previa: se crearían {len(cuotas_nuevas)} cuotas para {ciclo}'
+        else:
+            mensaje = f'Cuotas generadas para {ciclo}'
+        
+        return Response({
+            'message': mensaje,
+            'dry_run': dry_run,
+            'cuotas_creadas': 0 if dry_run else len(cuotas_nuevas),
+            'cuotas_a_crear': len(cuotas_nuevas),
+            'cuotas_existentes': cuotas_existentes,
+            'por_curso': por_curso
+        })
 
 
 class CursoViewSet(viewsets.ModelViewSet):
@@ -304,28 +501,15 @@ class CursoViewSet(viewsets.ModelViewSet):
         año = request.data.get('año', timezone.now().year)
         
         try:
-            cuotas_creadas = 0
-            cuotas_existentes = 0
-            
-            for mes in range(1, 13):  # Enero a Diciembre
-                cuota, created = CuotaCurso.objects.get_or_create(
-                    curso=curso,
-                    mes=mes,
-                    año=año,
-                    defaults={
-                        'monto': curso.cuota_mensual,
-                        'fecha_vencimiento': curso.get_fecha_vencimiento(mes, año)
-                    }
-                )
-                
-                if created:
-                    cuotas_creadas += 1
-                else:
-                    cuotas_existentes += 1
+            año = int(año)
+            cuotas_creadas, cuotas_existentes = CuotaCurso.generar_cuotas(
+                [curso],
+                [(año, mes) for mes in range(1, 13)]  # Enero a Diciembre
+            )
             
             return Response({
                 'message': f'Cuotas generadas para {curso.nombre} - Año {año}',
-                'cuotas_creadas': cuotas_creadas,
+                'cuotas_creadas': len(cuotas_creadas),
                 'cuotas_existentes': cuotas_existentes
             })
             
@@ -423,7 +607,10 @@ class AlumnoViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filtrar alumnos según el rol del usuario con prefetch de familiares"""
-        base_queryset = Alumno.objects.prefetch_related('familiares')
+        if self.action == 'estado_cuenta':
+            base_queryset = Alumno.objects.select_related('curso')
+        else:
+            base_queryset = Alumno.objects.prefetch_related('familiares')
         
         if self.request.user.es_directivo:
             return base_queryset.all()
@@ -478,6 +665,106 @@ class AlumnoViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(alumnos, many=True)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'], permission_classes=[IsMaestroOrDirectivo])
+    def estado_cuenta(self, request, pk=None):
+        """
+        Estado de cuenta del alumno: cada cuota de su curso (y las de otros
+        cursos en las que tenga pago o deuda) con su pago y su registro de
+        deudor, más los totales acumulados. Se resuelve en una consulta
+        """
+        alumno = self.get_object()
+        hoy = timezone.now().date()
+        meses = [
+            '', 'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+            'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'
+        ]
+        
+        cuotas = CuotaCurso.objects.annotate(
+            pago=FilteredRelation('pagos', condition=Q(pagos__alumno_id=alumno.pk)),
+            deuda=FilteredRelation('deudores', condition=Q(deudores__alumno_id=alumno.pk))
+        ).filter(
+            Q(curso_id=alumno.curso_id) | Q(pago__id__isnull=False) | Q(deuda__id__isnull=False)
+        ).order_by('año', 'mes', 'curso__nombre').values(
+            'id', 'mes', 'año', 'monto', 'fecha_vencimiento', 'curso__nombre',
+            'pago__id', 'pago__fecha_pago', 'pago__monto_pagado', 'pago__estado_pago',
+            'pago__dias_atraso_pago',
+            'deuda__id', 'deuda__fecha_marcado_deudor', 'deuda__dias_atraso',
+            'deuda__monto_adeudado', 'deuda__pagado', 'deuda__fecha_pago'
+        )
+        
+        total_facturado = Decimal('0.00')
+        total_pagado = Decimal('0.00')
+        saldo_vencido = Decimal('0.00')
+        cuotas_adeudadas = 0
+        movimientos = []
+        
+        for cuota in cuotas:
+            vencida = hoy > cuota['fecha_vencimiento']
+            
+            if cuota['pago__id'] is not None:
+                estado = 'pagada_con_atraso' if cuota['pago__estado_pago'] == 'con_atraso' else 'pagada_a_tiempo'
+                pago = {
+                    'id': cuota['pago__id'],
+                    'fecha_pago': cuota['pago__fecha_pago'],
+                    'monto_pagado': cuota['pago__monto_pagado'],
+                    'estado_pago': cuota['pago__estado_pago'],
+                    'dias_atraso_pago': cuota['pago__dias_atraso_pago']
+                }
+                total_pagado += cuota['pago__monto_pagado']
+            else:
+                estado = 'adeudada' if vencida else 'pendiente'
+                pago = None
+            
+            deuda = None
+            if cuota['deuda__id'] is not None:
+                deuda = {
+                    'id': cuota['deuda__id'],
+                    'fecha_marcado': cuota['deuda__fecha_marcado_deudor'],
+                    'dias_atraso': (
+                        cuota['deuda__dias_atraso'] if cuota['deuda__pagado']
+                        else (hoy - cuota['fecha_vencimiento']).days
+                    ),
+                    'monto_adeudado': cuota['deuda__monto_adeudado'],
+                    'pagado': cuota['deuda__pagado'],
+                    'fecha_pago': cuota['deuda__fecha_pago']
+                }
+            
+            if estado == 'adeudada':
+                cuotas_adeudadas += 1
+                saldo_vencido += deuda['monto_adeudado'] if deuda else cuota['monto']
+            
+            total_facturado += cuota['monto']
+            movimientos.append({
+                'cuota_id': cuota['id'],
+                'curso': cuota['curso__nombre'],
+                'mes': cuota['mes'],
+                'mes_nombre': meses[cuota['mes']],
+                'año': cuota['año'],
+                'monto': cuota['monto'],
+                'fecha_vencimiento': cuota['fecha_vencimiento'],
+                'estado': estado,
+                'pago': pago,
+                'deuda': deuda,
+                'total_facturado': total_facturado,
+                'total_pagado': total_pagado,
+                'saldo': total_facturado - total_pagado
+            })
+        
+        return Response({
+            'alumno_id': alumno.id,
+            'alumno_nombre': f"{alumno.nombre} {alumno.apellido}",
+            'curso': alumno.curso.nombre if alumno.curso else None,
+            'fecha_consulta': hoy.strftime('%Y-%m-%d'),
+            'resumen': {
+                'total_facturado': total_facturado,
+                'total_pagado': total_pagado,
+                'saldo': total_facturado - total_pagado,
+                'saldo_vencido': saldo_vencido,
+                'cuotas_adeudadas': cuotas_adeudadas
+            },
+            'movimientos': movimientos
+        })
+    
 class FamiliarViewSet(viewsets.ModelViewSet):
     queryset = Familiar.objects.all()
     serializer_class = FamiliarSerializer
@@ -633,6 +920,8 @@ class RegistroAsistenciaMaestroViewSet(viewsets.ModelViewSet):
                 aviso.hora_solicitada = hora_actual
                 aviso.save()
             
+            eventos.publicar_aviso(aviso, 'aviso_creado' if created else 'aviso_actualizado')
+            
             return Response({
                 'message': f'Aviso enviado a directivos para registrar tu ingreso en {curso.nombre} a las {hora_actual.strftime("%H:%M")}'
             })
@@ -698,6 +987,8 @@ class RegistroAsistenciaMaestroViewSet(viewsets.ModelViewSet):
                 aviso.hora_solicitada = hora_actual
                 aviso.save()
             
+            eventos.publicar_aviso(aviso, 'aviso_creado' if created else 'aviso_actualizado')
+            
             return Response({
                 'message': f'Aviso enviado a directivos para registrar tu salida de {curso.nombre} a las {hora_actual.strftime("%H:%M")}'
             })
@@ -787,7 +1078,13 @@ class RegistroAsistenciaMaestroViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'], permission_classes=[IsDirectivo])
     def reporte_ausencias(self, request):
-        """Obtener reporte de ausencias por fecha"""
+        """
+        Obtener reporte de ausencias por fecha, o por rango con
+        fecha_inicio/fecha_fin (totales por día, por maestro y por curso)
+        """
+        if request.query_params.get('fecha_inicio') or request.query_params.get('fecha_fin'):
+            return self._reporte_ausencias_rango(request)
+        
         fecha_param = request.query_params.get('fecha')
         
         if fecha_param:
@@ -801,28 +1098,103 @@ class RegistroAsistenciaMaestroViewSet(viewsets.ModelViewSet):
         else:
             fecha = timezone.now().date()
         
-        # Obtener registros de ausencias para la fecha
-        ausencias = self.queryset.filter(fecha=fecha, ausente=True)
+        # Una sola consulta con los datos de curso y maestro ya unidos
+        ausencias = self.queryset.filter(fecha=fecha, ausente=True).order_by(
+            'curso__nombre', 'maestro__last_name', 'maestro__first_name'
+        ).values(
+            'curso__nombre', 'curso__horario', 'curso__turno',
+            'maestro__first_name', 'maestro__last_name'
+        )
         
         # Organizar por curso
         ausencias_por_curso = {}
+        total_ausencias = 0
         for ausencia in ausencias:
-            curso_nombre = ausencia.curso.nombre
-            if curso_nombre not in ausencias_por_curso:
-                ausencias_por_curso[curso_nombre] = []
-            
-            ausencias_por_curso[curso_nombre].append({
-                'maestro_nombre': f"{ausencia.maestro.first_name} {ausencia.maestro.last_name}",
-                'curso_horario': ausencia.curso.horario,
-                'turno': ausencia.curso.turno
+            total_ausencias += 1
+            ausencias_por_curso.setdefault(ausencia['curso__nombre'], []).append({
+                'maestro_nombre': f"{ausencia['maestro__first_name']} {ausencia['maestro__last_name']}",
+                'curso_horario': ausencia['curso__horario'],
+                'turno': ausencia['curso__turno']
             })
         
         return Response({
             'fecha': fecha.strftime('%Y-%m-%d'),
-            'total_ausencias': ausencias.count(),
+            'total_ausencias': total_ausencias,
             'ausencias_por_curso': ausencias_por_curso
         })
     
+    def _reporte_ausencias_rango(self, request):
+        """Totales de ausencias de un rango de fechas, agrupados en la base de datos"""
+        fechas = {}
+        for parametro in ('fecha_inicio', 'fecha_fin'):
+            valor = request.query_params.get(parametro)
+            if not valor:
+                return Response(
+                    {'error': 'Debe indicar fecha_inicio y fecha_fin'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                fechas[parametro] = datetime.strptime(valor, '%Y-%m-%d').date()
+            except ValueError:
+                return Response(
+                    {'error': f'Formato de {parametro} inválido. Use YYYY-MM-DD'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        fecha_inicio, fecha_fin = fechas['fecha_inicio'], fechas['fecha_fin']
+        if fecha_inicio > fecha_fin:
+            return Response(
+                {'error': 'fecha_inicio no puede ser posterior a fecha_fin'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (fecha_fin - fecha_inicio).days > 366:
+            return Response(
+                {'error': 'El rango no puede superar un año'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Una fila por (día, maestro, curso); los totales se acumulan desde ahí
+        grupos = self.queryset.filter(
+            fecha__range=(fecha_inicio, fecha_fin), ausente=True
+        ).order_by().values(
+            'fecha', 'maestro', 'maestro__first_name', 'maestro__last_name',
+            'curso', 'curso__nombre', 'curso__turno'
+        ).annotate(cantidad=Count('id'))
+        
+        por_dia = {
+            (fecha_inicio + timedelta(days=dias)).strftime('%Y-%m-%d'): 0
+            for dias in range((fecha_fin - fecha_inicio).days + 1)
+        }
+        por_maestro = {}
+        por_curso = {}
+        total_ausencias = 0
+        for grupo in grupos:
+            total_ausencias += grupo['cantidad']
+            por_dia[grupo['fecha'].strftime('%Y-%m-%d')] += grupo['cantidad']
+            
+            maestro = por_maestro.setdefault(grupo['maestro'], {
+                'maestro_id': grupo['maestro'],
+                'maestro_nombre': f"{grupo['maestro__first_name']} {grupo['maestro__last_name']}",
+                'ausencias': 0
+            })
+            maestro['ausencias'] += grupo['cantidad']
+            
+            curso = por_curso.setdefault(grupo['curso'], {
+                'curso_id': grupo['curso'],
+                'curso_nombre': grupo['curso__nombre'],
+                'turno': grupo['curso__turno'],
+                'ausencias': 0
+            })
+            curso['ausencias'] += grupo['cantidad']
+        
+        return Response({
+            'fecha_inicio': fecha_inicio.strftime('%Y-%m-%d'),
+            'fecha_fin': fecha_fin.strftime('%Y-%m-%d'),
+            'total_ausencias': total_ausencias,
+            'por_dia': por_dia,
+            'por_maestro': sorted(por_maestro.values(), key=lambda fila: (-fila['ausencias'], fila['maestro_nombre'])),
+            'por_curso': sorted(por_curso.values(), key=lambda fila: (-fila['ausencias'], fila['curso_nombre']))
+        })
+    
     @action(detail=False, methods=['get'])
     def mis_ausencias(self, request):
         """Obtener ausencias del maestro actual"""
@@ -867,65 +1239,45 @@ class RegistroAsistenciaMaestroViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsDirectivo])
     def cursos_en_horario(self, request):
         """Obtener cursos que están en horario actual con sus maestros"""
-        from datetime import datetime, time
-        
-        hora_actual = timezone.now().time()
-        fecha_hoy = timezone.now().date()
+        ahora = timezone.now()
+        hora_actual = ahora.time()
+        fecha_hoy = ahora.date()
+        
+        # Una consulta por los cursos en horario y una por cada relación precargada
+        cursos = Curso.objects.filter(
+            hora_inicio__lte=hora_actual,
+            hora_fin__gte=hora_actual,
+            maestros__isnull=False
+        ).distinct().order_by('hora_inicio', 'nombre').prefetch_related(
+            Prefetch('maestros', queryset=CustomUser.objects.only('id', 'first_name', 'last_name')),
+            Prefetch(
+                'registros_asistencia_maestros',
+                queryset=RegistroAsistenciaMaestro.objects.filter(fecha=fecha_hoy),
+                to_attr='registros_hoy'
+            )
+        )
         
-        # Obtener cursos que están en horario
         cursos_en_horario = []
-        
-        for curso in Curso.objects.all():
-            # Parsear el horario del curso (formato: "08:00 - 12:00")
-            try:
-                horario_parts = curso.horario.split(' - ')
-                if len(horario_parts) == 2:
-                    hora_inicio_str = horario_parts[0].strip()
-                    hora_fin_str = horario_parts[1].strip()
-                    
-                    # Convertir a objetos time
-                    hora_inicio = datetime.strptime(hora_inicio_str, '%H:%M').time()
-                    hora_fin = datetime.strptime(hora_fin_str, '%H:%M').time()
-                    
-                    # Verificar si está en horario
-                    if hora_inicio <= hora_actual <= hora_fin:
-                        # Obtener maestros del curso con su estado de asistencia
-                        maestros_info = []
-                        
-                        for maestro in curso.maestros.all():
-                            # Buscar registro de hoy
-                            try:
-                                registro = RegistroAsistenciaMaestro.objects.get(
-                                    maestro=maestro,
-                                    curso=curso,
-                                    fecha=fecha_hoy
-                                )
-                                estado_asistencia = registro.estado_asistencia
-                                ya_tiene_registro = True
-                            except RegistroAsistenciaMaestro.DoesNotExist:
-                                estado_asistencia = 'sin_registro'
-                                ya_tiene_registro = False
-                            
-                            maestros_info.append({
-                                'id': maestro.id,
-                                'first_name': maestro.first_name,
-                                'last_name': maestro.last_name,
-                                'ya_tiene_registro': ya_tiene_registro,
-                                'estado_asistencia': estado_asistencia
-                            })
-                        
-                        if maestros_info:  # Solo incluir cursos que tienen maestros
-                            cursos_en_horario.append({
-                                'id': curso.id,
-                                'nombre': curso.nombre,
-                                'horario': curso.horario,
-                                'turno': curso.turno,
-                                'maestros': maestros_info
-                            })
-                            
-            except (ValueError, AttributeError) as e:
-                logger.warning(f"Error parsing horario for curso {curso.nombre}: {e}")
-                continue
+        for curso in cursos:
+            registros = {registro.maestro_id: registro for registro in curso.registros_hoy}
+            maestros_info = []
+            for maestro in curso.maestros.all():
+                registro = registros.get(maestro.id)
+                maestros_info.append({
+                    'id': maestro.id,
+                    'first_name': maestro.first_name,
+                    'last_name': maestro.last_name,
+                    'ya_tiene_registro': registro is not None,
+                    'estado_asistencia': registro.estado_asistencia if registro else 'sin_registro'
+                })
+            
+            cursos_en_horario.append({
+                'id': curso.id,
+                'nombre': curso.nombre,
+                'horario': curso.horario,
+                'turno': curso.turno,
+                'maestros': maestros_info
+            })
         
         return Response(cursos_en_horario)
 
@@ -1020,17 +1372,15 @@ class AvisoDirectivoViewSet(viewsets.ModelViewSet):
     def pendientes(self, request):  # Added 'request' parameter
         """Obtener avisos pendientes de procesar"""
         avisos = self.queryset.filter(procesado=False).select_related('maestro', 'curso')
-        data = []
-        for aviso in avisos:
-            data.append({
-                'id': aviso.id,
-                'tipo': aviso.tipo,
-                'maestro_nombre': f"{aviso.maestro.first_name} {aviso.maestro.last_name}",
-                'curso_nombre': aviso.curso.nombre,
-                'fecha': aviso.fecha,
-                'hora_solicitada': aviso.hora_solicitada.strftime('%H:%M')  # MOSTRAR LA HORA GUARDADA
-            })
-        return Response(data)
+        return Response([eventos.datos_aviso(aviso) for aviso in avisos])
+
+    @action(detail=False, methods=['post'])
+    def ticket_eventos(self, request):
+        """Ticket de corta duración para abrir el flujo de eventos (?ticket=)"""
+        return Response({
+            'ticket': eventos.emitir_ticket(request.user),
+            'vigencia_segundos': eventos.VIGENCIA_TICKET
+        })
 
     @action(detail=True, methods=['post'])
     def procesar(self, request, pk=None):
@@ -1101,6 +1451,7 @@ class AvisoDirectivoViewSet(viewsets.ModelViewSet):
             aviso.procesado_por = request.user
             aviso.fecha_procesado = timezone.now()
             aviso.save()
+            eventos.publicar_aviso(aviso, 'aviso_procesado')
 
             return Response({
                 'message': f'{aviso.tipo.capitalize()} procesado correctamente a las {hora_a_registrar.strftime("%H:%M")}'
@@ -1112,6 +1463,59 @@ class AvisoDirectivoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+async def eventos_avisos(request):
+    """
+    Flujo server-sent events con los avisos a directivos (aviso_creado,
+    aviso_actualizado, aviso_procesado). EventSource no permite enviar
+    encabezados: el navegador pide antes un ticket en
+    avisos-directivo/ticket_eventos/ y se conecta con ?ticket=. Otros clientes
+    pueden usar el encabezado Authorization: Token.
+    
+    Solo funciona si la aplicación se sirve por ASGI (ver projectjardinAPI/asgi.py);
+    servida por WSGI responde 501
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'Los eventos en vivo requieren servir la aplicación por ASGI'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    
+    ticket = request.GET.get('ticket')
+    if ticket:
+        usuario_id = eventos.usuario_del_ticket(ticket)
+        usuario = await CustomUser.objects.filter(pk=usuario_id).afirst() if usuario_id else None
+        if usuario is None:
+            return JsonResponse({'error': 'Ticket inválido o vencido'}, status=status.HTTP_401_UNAUTHORIZED)
+    else:
+        encabezado = request.headers.get('Authorization', '').split()
+        clave = encabezado[1] if len(encabezado) == 2 and encabezado[0] == 'Token' else ''
+        try:
+            usuario = (await Token.objects.select_related('user').aget(key=clave)).user
+        except Token.DoesNotExist:
+            return JsonResponse({'error': 'Token inválido'}, status=status.HTTP_401_UNAUTHORIZED)
+    if not usuario.is_active or not usuario.es_directivo:
+        return JsonResponse(
+            {'error': 'Solo directivos pueden recibir avisos'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    # Suscribir antes de contar los pendientes para no perder eventos intermedios
+    suscripcion = eventos.difusor.suscribir()
+    try:
+        pendientes = await AvisoDirectivo.objects.filter(procesado=False).acount()
+    except Exception:
+        eventos.difusor.desuscribir(suscripcion)
+        raise
+    
+    respuesta = StreamingHttpResponse(
+        eventos.flujo_eventos(suscripcion, inicial=('conectado', {'pendientes': pendientes})),
+        content_type='text/event-stream'
+    )
+    respuesta['Cache-Control'] = 'no-cache'
+    respuesta['X-Accel-Buffering'] = 'no'
+    return respuesta
+
+
 class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
     queryset = RegistroAsistenciaAlumno.objects.all()
     serializer_class = RegistroAsistenciaAlumnoSerializer
@@ -1152,6 +1556,14 @@ class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        try:
+            fecha = datetime.strptime(fecha, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'Formato de fecha inválido. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         try:
             curso = Curso.objects.get(id=curso_id)
             maestro = CustomUser.objects.get(id=maestro_id, es_maestro=True)
@@ -1163,45 +1575,18 @@ class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            registros_creados = []
-            registros_actualizados = []
-            
-            for registro_data in registros:
-                alumno_id = registro_data.get('alumno')
-                presente = registro_data.get('presente', False)
-                hora_llegada = registro_data.get('hora_llegada')
-                
-                try:
-                    alumno = Alumno.objects.get(id=alumno_id, curso=curso)
-                    
-                    # Crear o actualizar el registro
-                    registro, created = RegistroAsistenciaAlumno.objects.update_or_create(
-                        alumno=alumno,
-                        fecha=fecha,
-                        defaults={
-                            'curso': curso,
-                            'maestro': maestro,
-                            'presente': presente,
-                            'hora_llegada': hora_llegada if presente and hora_llegada else None
-                        }
-                    )
-                    
-                    if created:
-                        registros_creados.append(registro.id)
-                    else:
-                        registros_actualizados.append(registro.id)
-                        
-                except Alumno.DoesNotExist:
-                    return Response(
-                        {'error': f'Alumno con ID {alumno_id} no encontrado en el curso'}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
+            try:
+                creados, actualizados = RegistroAsistenciaAlumno.registrar_masiva(
+                    curso, fecha, maestro, registros
+                )
+            except Alumno.DoesNotExist as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
             return Response({
                 'message': 'Asistencia registrada correctamente',
-                'registros_creados': len(registros_creados),
-                'registros_actualizados': len(registros_actualizados),
-                'total_procesados': len(registros_creados) + len(registros_actualizados)
+                'registros_creados': creados,
+                'registros_actualizados': actualizados,
+                'total_procesados': creados + actualizados
             })
             
         except Curso.DoesNotExist:
@@ -1227,6 +1612,7 @@ class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
         
         curso_id = serializer.validated_data.get('curso')
         fecha = serializer.validated_data.get('fecha', timezone.now().date())
+        dry_run = serializer.validated_data['dry_run']
         
         try:
             if curso_id:
@@ -1240,19 +1626,20 @@ class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_403_FORBIDDEN
                     )
                 
-                ausencias_marcadas, mensaje = curso.marcar_ausencias_automaticas(fecha, request.user)
+                ausencias_marcadas, mensaje = curso.marcar_ausencias_automaticas(fecha, request.user, dry_run=dry_run)
                 
                 return Response({
                     'success': True,
                     'message': mensaje,
                     'curso': curso.nombre,
                     'fecha': fecha.strftime('%Y-%m-%d'),
-                    'ausencias_marcadas': ausencias_marcadas
+                    'ausencias_marcadas': ausencias_marcadas,
+                    'dry_run': dry_run
                 }, status=status.HTTP_200_OK)
                 
             else:
                 # Marcar ausencias para todos los cursos del usuario
-                resultado = Curso.marcar_ausencias_masivas(fecha, request.user)
+                resultado = Curso.marcar_ausencias_masivas(fecha, request.user, dry_run=dry_run)
                 
                 if resultado['success']:
                     return Response(resultado, status=status.HTTP_200_OK)
@@ -1275,7 +1662,9 @@ class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
         """
         Verifica qué cursos ya pasaron su horario de clases
         """
-        fecha = timezone.now().date()
+        # Una sola lectura del reloj para toda la respuesta
+        ahora = timezone.now()
+        fecha = ahora.date()
         
         # Obtener cursos según permisos
         if request.user.es_directivo:
@@ -1286,19 +1675,17 @@ class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
             cursos = Curso.objects.none()
         
         resultados = []
-        for curso in cursos:
-            hora_inicio, hora_fin = curso.parse_horario()
-            ya_paso = curso.ya_paso_horario(fecha)
-            alumnos_sin_registro = curso.get_alumnos_sin_asistencia(fecha).count()
+        for curso in cursos.con_alumnos_sin_asistencia(fecha).only('id', 'nombre', 'horario', 'hora_fin'):
+            ya_paso = curso.ya_paso_horario(fecha, ahora=ahora)
             
             resultados.append({
                 'curso_id': curso.id,
                 'curso_nombre': curso.nombre,
                 'horario': curso.horario,
-                'hora_fin': hora_fin.strftime('%H:%M') if hora_fin else None,
+                'hora_fin': curso.hora_fin.strftime('%H:%M') if curso.hora_fin else None,
                 'ya_paso_horario': ya_paso,
-                'alumnos_sin_registro': alumnos_sin_registro,
-                'puede_marcar_ausencias': ya_paso and alumnos_sin_registro > 0
+                'alumnos_sin_registro': curso.alumnos_sin_registro,
+                'puede_marcar_ausencias': ya_paso and curso.alumnos_sin_registro > 0
             })
         
         return Response({
@@ -1306,6 +1693,68 @@ class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
             'cursos': resultados
         })
 
+    @action(detail=False, methods=['get'], permission_classes=[IsMaestroOrDirectivo])
+    def tablero_asistencia(self, request):
+        """
+        Tablero de asistencia leído del resumen diario precalculado: con mes
+        devuelve un detalle por día y sin mes uno por mes del año, por curso
+        """
+        parametros, error = _parametros_enteros(request, ['año', 'mes', 'curso'])
+        if error:
+            return error
+        año = parametros.get('año', timezone.now().year)
+        mes = parametros.get('mes')
+        if mes is not None and not 1 <= mes <= 12:
+            return Response({'error': 'mes debe estar entre 1 y 12'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        resumenes = ResumenAsistenciaDiaria.objects.filter(fecha__year=año)
+        if mes:
+            resumenes = resumenes.filter(fecha__month=mes)
+        curso_id = parametros.get('curso')
+        if curso_id:
+            resumenes = resumenes.filter(curso_id=curso_id)
+        if not request.user.es_directivo:
+            resumenes = resumenes.filter(curso__maestros=request.user)
+        
+        periodo = F('fecha') if mes else TruncMonth('fecha')
+        filas = resumenes.annotate(periodo=periodo).order_by(
+            'curso__nombre', 'curso', 'periodo'
+        ).values('curso', 'curso__nombre', 'periodo').annotate(
+            dias=Count('pk'),
+            alumnos_inscriptos=Max('alumnos_inscriptos'),
+            presentes=Sum('presentes'),
+            ausentes=Sum('ausentes'),
+            llegadas_tarde=Sum('llegadas_tarde'),
+            sin_registro=Sum('sin_registro')
+        )
+        
+        def con_porcentaje(datos):
+            registrados = datos['presentes'] + datos['ausentes']
+            datos['porcentaje_asistencia'] = (datos['presentes'] / registrados * 100) if registrados > 0 else 0
+            return datos
+        
+        campos = ['dias', 'presentes', 'ausentes', 'llegadas_tarde', 'sin_registro']
+        cursos = []
+        for (curso, curso_nombre), grupo in groupby(filas, key=lambda fila: (fila['curso'], fila['curso__nombre'])):
+            detalle = []
+            totales = dict.fromkeys(campos, 0)
+            for fila in grupo:
+                for campo in campos:
+                    totales[campo] += fila[campo]
+                detalle.append(con_porcentaje({
+                    'fecha' if mes else 'mes': fila['periodo'].strftime('%Y-%m-%d' if mes else '%Y-%m'),
+                    'alumnos_inscriptos': fila['alumnos_inscriptos'],
+                    **{campo: fila[campo] for campo in campos}
+                }))
+            cursos.append({
+                'curso_id': curso,
+                'curso_nombre': curso_nombre,
+                'totales': con_porcentaje(totales),
+                'detalle': detalle
+            })
+        
+        return Response({'año': año, 'mes': mes, 'cursos': cursos})
+
     @action(detail=False, methods=['get'], permission_classes=[IsMaestroOrDirectivo])
     def estadisticas_asistencia(self, request):
         """
@@ -1337,7 +1786,7 @@ class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
                 )
         
         estadisticas = RegistroAsistenciaAlumno.obtener_estadisticas_ausencias(
-            fecha_inicio, fecha_fin, curso_obj
+            fecha_inicio, fecha_fin, curso_obj, agrupar_por=serializer.validated_data.get('group_by')
         )
         
         return Response({
@@ -1361,53 +1810,44 @@ class RegistroAsistenciaAlumnoViewSet(viewsets.ModelViewSet):
         
         curso_id = serializer.validated_data.get('curso')
         fecha = serializer.validated_data.get('fecha', timezone.now().date())
+        dry_run = serializer.validated_data['dry_run']
         
         try:
             if curso_id:
                 curso = Curso.objects.get(id=curso_id)
                 
                 # Forzar marcado sin verificar horario
-                alumnos_sin_registro = curso.get_alumnos_sin_asistencia(fecha)
-                maestro = curso.maestros.first()
+                resultado = Curso.procesar_ausencias_alumnos(
+                    fecha, Curso.objects.filter(pk=curso.pk), verificar_horario=False, dry_run=dry_run
+                )
+                if not resultado['success']:
+                    return Response({'error': resultado['message']}, status=status.HTTP_400_BAD_REQUEST)
+                resultado_curso = resultado['resultados'][0]
+                ausencias_marcadas = resultado_curso['ausencias_marcadas']
                 
-                if not maestro:
+                if resultado_curso['mensaje'] == "No hay maestros asignados a este curso":
                     return Response(
-                        {'error': 'No hay maestros asignados a este curso'}, 
+                        {'error': resultado_curso['mensaje']}, 
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 
-                if not alumnos_sin_registro.exists():
+                if not ausencias_marcadas:
                     return Response({
-                        'message': 'Todos los alumnos ya tienen registro de asistencia',
+                        'message': resultado_curso['mensaje'],
                         'ausencias_marcadas': 0
                     })
                 
-                # Crear registros de ausencia
-                registros_crear = []
-                for alumno in alumnos_sin_registro:
-                    registros_crear.append(
-                        RegistroAsistenciaAlumno(
-                            alumno=alumno,
-                            curso=curso,
-                            maestro=maestro,
-                            fecha=fecha,
-                            presente=False,
-                            hora_llegada=None
-                        )
-                    )
-                
-                RegistroAsistenciaAlumno.objects.bulk_create(registros_crear)
-                
                 return Response({
                     'success': True,
-                    'message': f'Marcadas {len(registros_crear)} ausencias forzadamente',
+                    'message': resultado_curso['mensaje'] if dry_run else f'Marcadas {ausencias_marcadas} ausencias forzadamente',
                     'curso': curso.nombre,
                     'fecha': fecha.strftime('%Y-%m-%d'),
-                    'ausencias_marcadas': len(registros_crear)
+                    'ausencias_marcadas': ausencias_marcadas,
+                    'dry_run': dry_run
                 })
             else:
                 # Procesar todos los cursos
-                resultado = Curso.marcar_ausencias_masivas(fecha, request.user)
+                resultado = Curso.marcar_ausencias_masivas(fecha, request.user, dry_run=dry_run)
                 return Response(resultado)
                 
         except Curso.DoesNotExist:
@@ -1442,6 +1882,12 @@ class CuotaCursoViewSet(viewsets.ModelViewSet):
         if vencidas == 'true':
             queryset = queryset.filter(fecha_vencimiento__lt=timezone.now().date())
         
+        if self.action in ['list', 'retrieve']:
+            # Totales como subconsultas para no consultar por cada fila
+            queryset = queryset.select_related('curso').con_totales()
+        elif self.action == 'deudores':
+            queryset = queryset.select_related('curso__ciclo_lectivo')
+        
         return queryset
     @action(detail=False, methods=['post'], permission_classes=[IsDirectivo])
     def procesar_vencimientos(self, request):
@@ -1452,11 +1898,16 @@ class CuotaCursoViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             fecha = serializer.validated_data.get('fecha', timezone.now().date())
+            modo = serializer.validated_data.get('modo', 'completo')
         else:
             fecha = timezone.now().date()
+            modo = 'completo'
         
         try:
-            resultado = CuotaCurso.procesar_vencimientos_masivos(fecha)
+            if modo == 'incremental':
+                resultado = CuotaCurso.procesar_vencimientos_incremental(fecha)
+            else:
+                resultado = CuotaCurso.procesar_vencimientos_masivos(fecha)
             return Response(resultado, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(
@@ -1496,27 +1947,117 @@ class CuotaCursoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    def _filtros_reporte(self):
+        """Filtros opcionales de año y curso de los reportes o una respuesta de error"""
+        return _parametros_enteros(self.request, ['año', 'curso'])
+    
+    def _filtrar_reporte(self, queryset, filtros):
+        """Aplica los filtros de año y curso ya validados por `_filtros_reporte`"""
+        if 'año' in filtros:
+            queryset = queryset.filter(año=filtros['año'])
+        if 'curso' in filtros:
+            queryset = queryset.filter(curso_id=filtros['curso'])
+        
+        return queryset
+    
+    def _resumen_por_curso(self, queryset, fecha):
+        """Resumen por curso (clave: nombre del curso) a partir del resumen financiero precalculado"""
+        cuotas_por_curso = {}
+        for fila in queryset.resumen_por_curso(fecha):
+            resumen = cuotas_por_curso.setdefault(fila['curso__nombre'], {
+                'total': 0,
+                'vencidas': 0,
+                'vigentes': 0,
+                'total_deudores': 0,
+                'monto_facturado': Decimal('0.00'),
+                'monto_cobrado': Decimal('0.00'),
+                'saldo_pendiente': Decimal('0.00')
+            })
+            for clave in resumen:
+                resumen[clave] += fila[clave]
+        return cuotas_por_curso
+    
+    def _resumen_a_fecha(self, fecha, filtros):
+        """
+        Resumen de cuotas reconstruido a una fecha pasada a partir de los
+        vencimientos y las fechas de pago, sin usar el estado actual de deudores
+        """
+        cuotas = self._filtrar_reporte(CuotaCurso.objects.all(), filtros)
+        vencida = Q(fecha_vencimiento__lt=fecha)
+        
+        cuotas_por_curso = {}
+        for fila in cuotas.order_by().values('curso__nombre').annotate(
+            total=Count('pk'),
+            vencidas=Count('pk', filter=vencida),
+            vigentes=Count('pk', filter=~vencida)
+        ):
+            cuotas_por_curso[fila['curso__nombre']] = {
+                'total': fila['total'],
+                'vencidas': fila['vencidas'],
+                'vigentes': fila['vigentes'],
+                'total_deudores': 0,
+                'monto_cobrado': Decimal('0.00'),
+                'saldo_pendiente': Decimal('0.00')
+            }
+        
+        for fila in PagoCuota.objects.filter(
+            cuota__in=cuotas, fecha_pago__lte=fecha
+        ).order_by().values('cuota__curso__nombre').annotate(monto=Sum('monto_pagado')):
+            cuotas_por_curso[fila['cuota__curso__nombre']]['monto_cobrado'] = fila['monto'].quantize(Decimal('0.01'))
+        
+        for deuda in cuotas.deudas_a_fecha(fecha):
+            resumen = cuotas_por_curso[deuda['curso__nombre']]
+            resumen['total_deudores'] += 1
+            resumen['saldo_pendiente'] += deuda['monto']
+        
+        return {
+            'fecha_consulta': timezone.now().date().strftime('%Y-%m-%d'),
+            'as_of': fecha.strftime('%Y-%m-%d'),
+            'resumen_general': {
+                'total_cuotas': sum(resumen['total'] for resumen in cuotas_por_curso.values()),
+                'cuotas_vencidas': sum(resumen['vencidas'] for resumen in cuotas_por_curso.values()),
+                'cuotas_vigentes': sum(resumen['vigentes'] for resumen in cuotas_por_curso.values()),
+                'total_deudores': sum(resumen['total_deudores'] for resumen in cuotas_por_curso.values()),
+                'monto_cobrado': sum((resumen['monto_cobrado'] for resumen in cuotas_por_curso.values()), Decimal('0.00')),
+                'saldo_pendiente': sum((resumen['saldo_pendiente'] for resumen in cuotas_por_curso.values()), Decimal('0.00'))
+            },
+            'por_curso': dict(sorted(cuotas_por_curso.items()))
+        }
+    
     @action(detail=False, methods=['get'], permission_classes=[IsDirectivo])
     def cuotas_vencidas(self, request):
         """
         Obtiene todas las cuotas vencidas
         """
+        filtros, error = self._filtros_reporte()
+        if error:
+            return error
+        
         fecha_actual = timezone.now().date()
-        cuotas_vencidas = self.queryset.filter(
-            fecha_vencimiento__lt=fecha_actual
-        ).order_by('-fecha_vencimiento')
+        cuotas_vencidas = self._filtrar_reporte(
+            CuotaCurso.objects.filter(fecha_vencimiento__lt=fecha_actual),
+            filtros
+        )
         
-        # Agregar información de deudores a cada cuota
-        resultado = []
-        for cuota in cuotas_vencidas:
-            cuota_data = self.get_serializer(cuota).data
-            cuota_data['alumnos_deudores'] = cuota.get_alumnos_deudores().count()
-            resultado.append(cuota_data)
+        # Deudores anotados en la misma consulta del listado
+        resultado = self.get_serializer(
+            cuotas_vencidas.select_related('curso').con_totales().order_by('-fecha_vencimiento'),
+            many=True
+        ).data
+        for cuota_data in resultado:
+            cuota_data['alumnos_deudores'] = cuota_data['total_deudores']
         
         return Response({
             'total_cuotas_vencidas': len(resultado),
             'fecha_consulta': fecha_actual.strftime('%Y-%m-%d'),
-            'cuotas': resultado
+            'cuotas': resultado,
+            'por_curso': self._resumen_por_curso(
+                self._filtrar_reporte(
+                    ResumenFinancieroMensual.objects.filter(fecha_vencimiento__lt=fecha_actual),
+                    filtros
+                ),
+                fecha_actual
+            )
         })
     
     @action(detail=True, methods=['get'], permission_classes=[IsMaestroOrDirectivo])
@@ -1525,36 +2066,49 @@ class CuotaCursoViewSet(viewsets.ModelViewSet):
         Obtiene los alumnos deudores de una cuota específica
         """
         cuota = self.get_object()
-        alumnos_deudores = cuota.get_alumnos_deudores()
+        hoy = timezone.now().date()
+        esta_vencida = hoy > cuota.fecha_vencimiento
+        dias_vencida = (hoy - cuota.fecha_vencimiento).days if esta_vencida else 0
+        
+        # Alumnos sin pago con su registro de deudor (si existe) en un único LEFT JOIN
+        alumnos_deudores = cuota.get_alumnos_deudores().annotate(
+            deuda=FilteredRelation('deudas', condition=Q(deudas__cuota_id=cuota.pk))
+        ).values(
+            'id', 'nombre', 'apellido',
+            'deuda__id', 'deuda__fecha_marcado_deudor', 'deuda__fecha_vencimiento',
+            'deuda__dias_atraso', 'deuda__pagado', 'deuda__monto_adeudado'
+        )
         
         deudores_data = []
         for alumno in alumnos_deudores:
-            # Buscar registro de deudor si existe
-            try:
-                deudor = DeudorCuota.objects.get(alumno=alumno, cuota=cuota)
+            if alumno['deuda__id'] is not None:
+                if alumno['deuda__pagado']:
+                    dias_atraso = alumno['deuda__dias_atraso']
+                else:
+                    dias_atraso = (hoy - alumno['deuda__fecha_vencimiento']).days
                 deudores_data.append({
-                    'alumno_id': alumno.id,
-                    'alumno_nombre': f"{alumno.nombre} {alumno.apellido}",
+                    'alumno_id': alumno['id'],
+                    'alumno_nombre': f"{alumno['nombre']} {alumno['apellido']}",
                     'tiene_registro_deudor': True,
-                    'fecha_marcado': deudor.fecha_marcado_deudor,
-                    'dias_atraso': deudor.dias_atraso_actual,
-                    'monto_adeudado': deudor.monto_adeudado
+                    'fecha_marcado': alumno['deuda__fecha_marcado_deudor'],
+                    'dias_atraso': dias_atraso,
+                    'monto_adeudado': alumno['deuda__monto_adeudado']
                 })
-            except DeudorCuota.DoesNotExist:
+            else:
                 deudores_data.append({
-                    'alumno_id': alumno.id,
-                    'alumno_nombre': f"{alumno.nombre} {alumno.apellido}",
+                    'alumno_id': alumno['id'],
+                    'alumno_nombre': f"{alumno['nombre']} {alumno['apellido']}",
                     'tiene_registro_deudor': False,
                     'fecha_marcado': None,
-                    'dias_atraso': cuota.dias_vencida if cuota.esta_vencida else 0,
+                    'dias_atraso': dias_vencida,
                     'monto_adeudado': cuota.monto
                 })
         
         return Response({
             'cuota': str(cuota),
             'fecha_vencimiento': cuota.fecha_vencimiento,
-            'esta_vencida': cuota.esta_vencida,
-            'dias_vencida': cuota.dias_vencida,
+            'esta_vencida': esta_vencida,
+            'dias_vencida': dias_vencida,
             'total_deudores': len(deudores_data),
             'deudores': deudores_data
         })
@@ -1564,39 +2118,37 @@ class CuotaCursoViewSet(viewsets.ModelViewSet):
         """
         Obtiene un resumen general de las cuotas y sus estados
         """
+        as_of, error = _fecha_as_of(request)
+        if error:
+            return error
+        filtros, error = self._filtros_reporte()
+        if error:
+            return error
+        if as_of:
+            return Response(self._resumen_a_fecha(as_of, filtros))
+        
         fecha_actual = timezone.now().date()
         
-        # Estadísticas generales
-        total_cuotas = self.queryset.count()
-        cuotas_vencidas = self.queryset.filter(fecha_vencimiento__lt=fecha_actual).count()
-        cuotas_vigentes = self.queryset.filter(fecha_vencimiento__gte=fecha_actual).count()
+        # Cuotas por curso (una sola consulta sobre el resumen precalculado)
+        cuotas_por_curso = self._resumen_por_curso(
+            self._filtrar_reporte(ResumenFinancieroMensual.objects.all(), filtros),
+            fecha_actual
+        )
         
-        # Cuotas por curso
-        cuotas_por_curso = {}
-        for cuota in self.queryset.select_related('curso'):
-            curso_nombre = cuota.curso.nombre
-            if curso_nombre not in cuotas_por_curso:
-                cuotas_por_curso[curso_nombre] = {
-                    'total': 0,
-                    'vencidas': 0,
-                    'vigentes': 0,
-                    'total_deudores': 0
-                }
-            
-            cuotas_por_curso[curso_nombre]['total'] += 1
-            
-            if cuota.esta_vencida:
-                cuotas_por_curso[curso_nombre]['vencidas'] += 1
-                cuotas_por_curso[curso_nombre]['total_deudores'] += cuota.get_alumnos_deudores().count()
-            else:
-                cuotas_por_curso[curso_nombre]['vigentes'] += 1
+        # Estadísticas generales
+        total_cuotas = sum(resumen['total'] for resumen in cuotas_por_curso.values())
+        cuotas_vencidas = sum(resumen['vencidas'] for resumen in cuotas_por_curso.values())
+        cuotas_vigentes = sum(resumen['vigentes'] for resumen in cuotas_por_curso.values())
         
         return Response({
             'fecha_consulta': fecha_actual.strftime('%Y-%m-%d'),
             'resumen_general': {
                 'total_cuotas': total_cuotas,
                 'cuotas_vencidas': cuotas_vencidas,
-                'cuotas_vigentes': cuotas_vigentes
+                'cuotas_vigentes': cuotas_vigentes,
+                'monto_facturado': sum((resumen['monto_facturado'] for resumen in cuotas_por_curso.values()), Decimal('0.00')),
+                'monto_cobrado': sum((resumen['monto_cobrado'] for resumen in cuotas_por_curso.values()), Decimal('0.00')),
+                'saldo_pendiente': sum((resumen['saldo_pendiente'] for resumen in cuotas_por_curso.values()), Decimal('0.00'))
             },
             'por_curso': cuotas_por_curso
         })
@@ -1611,7 +2163,10 @@ class DeudorCuotaViewSet(viewsets.ModelViewSet):
         curso_id = self.request.query_params.get('curso')
         año = self.request.query_params.get('año')
         mes = self.request.query_params.get('mes')
-        solo_activos = self.request.query_params.get('solo_activos', 'true')
+        # La exportación incluye el historial completo salvo que se pida lo contrario
+        solo_activos = self.request.query_params.get(
+            'solo_activos', 'false' if self.action == 'exportar' else 'true'
+        )
         
         if curso_id:
             queryset = queryset.filter(cuota__curso_id=curso_id)
@@ -1636,8 +2191,66 @@ class DeudorCuotaViewSet(viewsets.ModelViewSet):
         if solo_pendientes and solo_pendientes.lower() in ['true', '1']:
             queryset = queryset.filter(pagado=False)
         
+        tramo = self.request.query_params.get('tramo')
+        if tramo in dict(DeudorCuota.TRAMOS_ANTIGUEDAD):
+            queryset = queryset.con_tramo(timezone.now().date()).filter(tramo=tramo)
+        
+        ordenar = self.request.query_params.get('ordenar')
+        if ordenar and ordenar.lstrip('-') in ['interes', 'dias_atraso', 'fecha_vencimiento', 'monto_adeudado']:
+            queryset = queryset.order_by(ordenar, 'id')
+        
         return queryset.select_related('alumno', 'cuota', 'cuota__curso')
     
+    def list(self, request, *args, **kwargs):
+        """
+        Con as_of=YYYY-MM-DD devuelve las deudas vigentes a esa fecha,
+        reconstruidas desde vencimientos y fechas de pago
+        """
+        as_of, error = _fecha_as_of(request)
+        if error:
+            return error
+        if not as_of:
+            return super().list(request, *args, **kwargs)
+        
+        meses = [
+            '', 'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+            'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'
+        ]
+        campos = {'curso': 'curso_id', 'año': 'año', 'mes': 'mes', 'cuota': 'pk'}
+        filtros, error = _parametros_enteros(request, [*campos, 'alumno'])
+        if error:
+            return error
+        cuotas = CuotaCurso.objects.all()
+        for parametro, campo in campos.items():
+            if parametro in filtros:
+                cuotas = cuotas.filter(**{campo: filtros[parametro]})
+        
+        deudas = cuotas.deudas_a_fecha(as_of, alumno_id=filtros.get('alumno')).order_by(
+            'fecha_vencimiento', 'curso__nombre', 'alumno_apellido', 'alumno_nombre'
+        )
+        
+        resultado = []
+        monto_total = Decimal('0.00')
+        for deuda in deudas:
+            monto_total += deuda['monto']
+            resultado.append({
+                'alumno': deuda['alumno_id'],
+                'alumno_nombre': f"{deuda['alumno_nombre']} {deuda['alumno_apellido']}",
+                'cuota': deuda['id'],
+                'cuota_detalle': f"{meses[deuda['mes']]} {deuda['año']} - {deuda['curso__nombre']}",
+                'fecha_vencimiento': deuda['fecha_vencimiento'],
+                'dias_atraso': (as_of - deuda['fecha_vencimiento']).days,
+                'monto_adeudado': deuda['monto'],
+                'fecha_pago_posterior': deuda['fecha_pago_posterior']
+            })
+        
+        return Response({
+            'as_of': as_of.strftime('%Y-%m-%d'),
+            'total_deudas': len(resultado),
+            'monto_total_adeudado': monto_total,
+            'deudas': resultado
+        })
+    
     @action(detail=True, methods=['post'], permission_classes=[IsDirectivo])
     def marcar_pagado(self, request, pk=None):
         """
@@ -1663,43 +2276,307 @@ class DeudorCuotaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get', 'put'], permission_classes=[IsDirectivo])
+    def politica_recargos(self, request):
+        """Consultar o modificar la política de recargos por mora"""
+        politica = PoliticaRecargo.get_politica()
+        if request.method == 'GET':
+            return Response(PoliticaRecargoSerializer(politica).data)
+        
+        serializer = PoliticaRecargoSerializer(politica, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(actualizado_por=request.user)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsDirectivo])
+    def aplicar_recargos(self, request):
+        """
+        Recalcula el interés por mora de todas las deudas abiertas según la
+        política vigente, con una única actualización en la base
+        """
+        fecha_param = request.data.get('fecha')
+        if fecha_param:
+            try:
+                fecha = datetime.strptime(fecha_param, '%Y-%m-%d').date()
+            except ValueError:
+                return Response(
+                    {'error': 'Formato de fecha inválido. Use YYYY-MM-DD'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            fecha = timezone.now().date()
+        
+        politica = PoliticaRecargo.get_politica()
+        actualizadas = DeudorCuota.aplicar_recargos(fecha, politica)
+        totales = DeudorCuota.objects.filter(pagado=False).aggregate(
+            interes_total=Sum('interes'),
+            monto_total=Sum('monto_adeudado')
+        )
+        
+        return Response({
+            'message': f'Recargos aplicados a {actualizadas} deudas abiertas',
+            'fecha': fecha.strftime('%Y-%m-%d'),
+            'deudas_actualizadas': actualizadas,
+            'politica': PoliticaRecargoSerializer(politica).data,
+            'interes_total': totales['interes_total'] or Decimal('0.00'),
+            'monto_total_adeudado': totales['monto_total'] or Decimal('0.00')
+        })
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsMaestroOrDirectivo])
+    def antiguedad(self, request):
+        """
+        Antigüedad de las deudas abiertas por tramos (0-30, 31-60, 61-90 y 90+
+        días) respecto de `fecha` (por defecto hoy), con cantidades y montos
+        por curso y por mes de la cuota. Se resuelve en una consulta agrupada
+        """
+        fecha_param = request.query_params.get('fecha')
+        if fecha_param:
+            try:
+                fecha = datetime.strptime(fecha_param, '%Y-%m-%d').date()
+            except ValueError:
+                return Response(
+                    {'error': 'Formato de fecha inválido. Use YYYY-MM-DD'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            fecha = timezone.now().date()
+        
+        filas = self.get_queryset().filter(
+            pagado=False,
+            fecha_vencimiento__lt=fecha
+        ).con_tramo(fecha).order_by().values(
+            'tramo', 'cuota__curso__nombre', 'cuota__año', 'cuota__mes'
+        ).annotate(
+            cantidad=Count('pk'),
+            monto=Sum('monto_adeudado')
+        ).order_by('cuota__curso__nombre', 'cuota__año', 'cuota__mes')
+        
+        def tramos_vacios():
+            return {
+                nombre: {'cantidad': 0, 'monto': Decimal('0.00')}
+                for nombre, _ in DeudorCuota.TRAMOS_ANTIGUEDAD
+            }
+        
+        def acumular(destino, fila):
+            destino['cantidad'] += fila['cantidad']
+            destino['monto'] += fila['monto']
+        
+        total = {'cantidad': 0, 'monto': Decimal('0.00')}
+        tramos = tramos_vacios()
+        por_curso = {}
+        por_mes = {}
+        
+        for fila in filas:
+            mes_key = f"{fila['cuota__año']}-{fila['cuota__mes']:02d}"
+            acumular(total, fila)
+            acumular(tramos[fila['tramo']], fila)
+            acumular(por_curso.setdefault(fila['cuota__curso__nombre'], tramos_vacios())[fila['tramo']], fila)
+            acumular(por_mes.setdefault(mes_key, tramos_vacios())[fila['tramo']], fila)
+        
+        return Response({
+            'fecha_referencia': fecha.strftime('%Y-%m-%d'),
+            'total': total,
+            'tramos': tramos,
+            'por_curso': por_curso,
+            'por_mes': por_mes
+        })
+    
+    COLUMNAS_EXPORTACION = [
+        ('id', 'ID'),
+        ('cuota__curso__ciclo_lectivo__inicio__year', 'Ciclo'),
+        ('cuota__curso__nombre', 'Curso'),
+        ('cuota__año', 'Año'),
+        ('cuota__mes', 'Mes'),
+        ('alumno__dni', 'DNI alumno'),
+        ('alumno__apellido', 'Apellido'),
+        ('alumno__nombre', 'Nombre'),
+        ('fecha_vencimiento', 'Vencimiento'),
+        ('fecha_marcado_deudor', 'Marcado deudor'),
+        ('dias_atraso', 'Días de atraso'),
+        ('monto_adeudado', 'Monto adeudado'),
+        ('interes', 'Interés'),
+        ('pagado', 'Pagado'),
+        ('fecha_pago', 'Fecha de pago'),
+    ]
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsDirectivo])
+    def exportar(self, request):
+        """
+        Exporta las deudas (por defecto todo el historial) en CSV o XLSX.
+        Parámetros: ciclo, formato=csv|xlsx y los filtros del listado
+        """
+        formato, error = _formato_exportacion(request)
+        if error:
+            return error
+        
+        filtros, error = _parametros_enteros(request, ['ciclo'])
+        if error:
+            return error
+        
+        queryset = self.get_queryset()
+        ciclo_id = filtros.get('ciclo')
+        if ciclo_id:
+            queryset = queryset.filter(cuota__curso__ciclo_lectivo_id=ciclo_id)
+        
+        filas = _en_bloques(
+            queryset.values(*[clave for clave, _ in self.COLUMNAS_EXPORTACION]),
+            ['fecha_vencimiento', 'alumno__apellido', 'alumno__nombre', 'id']
+        )
+        
+        nombre = f'deudas_ciclo_{ciclo_id}' if ciclo_id else 'deudas'
+        return _exportar_filas(filas, self.COLUMNAS_EXPORTACION, nombre, formato)
+    
+    # Campos de cada deuda en el listado por alumno
+    CAMPOS_DEUDA = {
+        'id': 'id',
+        'cuota': 'cuota_id',
+        'cuota_mes': 'cuota__mes',
+        'cuota_año': 'cuota__año',
+        'curso_nombre': 'cuota__curso__nombre',
+        'fecha_vencimiento': 'fecha_vencimiento',
+        'fecha_marcado_deudor': 'fecha_marcado_deudor',
+        'dias_atraso': 'dias_atraso',
+        'monto_adeudado': 'monto_adeudado',
+        'interes': 'interes',
+        'pagado': 'pagado',
+        'fecha_pago': 'fecha_pago',
+    }
+    
+    def _deuda_data(self, deuda, alumno, hoy, campos):
+        """
+        Arma una deuda con el mismo formato que DeudorCuotaSerializer a partir
+        de una fila de values() o de un objeto JSON agregado en la base
+        """
+        meses = [
+            '', 'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+            'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'
+        ]
+        fecha_vencimiento = deuda['fecha_vencimiento']
+        if isinstance(fecha_vencimiento, str):
+            fecha_vencimiento = parse_date(fecha_vencimiento)
+        fecha_marcado = deuda['fecha_marcado_deudor']
+        if isinstance(fecha_marcado, str):
+            fecha_marcado = parse_datetime(fecha_marcado)
+        fecha_pago = deuda['fecha_pago']
+        if isinstance(fecha_pago, str):
+            fecha_pago = parse_datetime(fecha_pago)
+        
+        return {
+            'id': deuda['id'],
+            'alumno': alumno['alumno_id'],
+            'alumno_nombre': f"{alumno['alumno__nombre']} {alumno['alumno__apellido']}",
+            'cuota': deuda['cuota'],
+            'cuota_detalle': f"{meses[deuda['cuota_mes']]} {deuda['cuota_año']} - {deuda['curso_nombre']}",
+            'fecha_vencimiento': campos['fecha_vencimiento'].to_representation(fecha_vencimiento),
+            'fecha_marcado_deudor': campos['fecha_marcado_deudor'].to_representation(fecha_marcado),
+            'dias_atraso': deuda['dias_atraso'],
+            'dias_atraso_actual': deuda['dias_atraso'] if deuda['pagado'] else (hoy - fecha_vencimiento).days,
+            'monto_adeudado': campos['monto_adeudado'].to_representation(deuda['monto_adeudado']),
+            'interes': campos['interes'].to_representation(deuda['interes']),
+            'pagado': deuda['pagado'],
+            'fecha_pago': campos['fecha_pago'].to_representation(fecha_pago) if fecha_pago else None
+        }
+    
     @action(detail=False, methods=['get'], permission_classes=[IsMaestroOrDirectivo])
     def por_alumno(self, request):
         """
-        Obtiene todas las deudas agrupadas por alumno
+        Obtiene todas las deudas agrupadas por alumno. Con page o page_size
+        devuelve solo esa página de alumnos. La agrupación y los totales se
+        resuelven en la base y la respuesta se envía en streaming
         """
         solo_pendientes = request.query_params.get('solo_pendientes', 'true').lower() in ['true', '1']
+        paginar = 'page' in request.query_params or 'page_size' in request.query_params
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', 50)), 1), 500)
+        except ValueError:
+            return Response(
+                {'error': 'page y page_size deben ser números enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         queryset = self.get_queryset()
         if solo_pendientes:
             queryset = queryset.filter(pagado=False)
         
-        # Agrupar por alumno
-        deudas_por_alumno = {}
-        for deuda in queryset:
-            alumno_key = deuda.alumno.id
-            alumno_nombre = f"{deuda.alumno.nombre} {deuda.alumno.apellido}"
-            
-            if alumno_key not in deudas_por_alumno:
-                deudas_por_alumno[alumno_key] = {
-                    'alumno_id': alumno_key,
-                    'alumno_nombre': alumno_nombre,
-                    'total_deudas': 0,
-                    'monto_total_adeudado': 0,
-                    'deudas': []
-                }
+        # Totales por alumno en una consulta agrupada
+        grupos = queryset.order_by().values(
+            'alumno_id', 'alumno__nombre', 'alumno__apellido'
+        ).annotate(
+            total_deudas=Count('pk'),
+            monto_total_adeudado=Sum('monto_adeudado')
+        )
+        total_alumnos = grupos.count()
+        grupos = grupos.order_by('alumno__apellido', 'alumno__nombre', 'alumno_id')
+        
+        if paginar:
+            paginas = [grupos[(page - 1) * page_size:page * page_size]]
+        else:
+            # Sin paginación se recorren todos los alumnos en bloques de 500
+            paginas = (grupos[desde:desde + 500] for desde in range(0, total_alumnos, 500))
+        
+        hoy = timezone.now().date()
+        campos = DeudorCuotaSerializer().fields
+        
+        def alumnos_con_deudas(pagina):
+            # Cada página se lee completa (sin cursores del lado del servidor,
+            # que no funcionan detrás de PgBouncer en modo transacción)
+            if connection.vendor == 'postgresql':
+                from django.contrib.postgres.aggregates import JSONBAgg
+                
+                # Las deudas de cada alumno llegan agregadas como JSON en la misma fila
+                filas = list(pagina.annotate(
+                    deudas=JSONBAgg(
+                        JSONObject(**self.CAMPOS_DEUDA),
+                        order_by='-fecha_marcado_deudor'
+                    )
+                ))
+                for fila in filas:
+                    yield fila, fila['deudas']
+                return
             
-            deudas_por_alumno[alumno_key]['total_deudas'] += 1
-            deudas_por_alumno[alumno_key]['monto_total_adeudado'] += float(deuda.monto_adeudado)
-            deudas_por_alumno[alumno_key]['deudas'].append(
-                self.get_serializer(deuda).data
+            # Resto de los motores: una consulta con las deudas de la página
+            alumnos = {fila['alumno_id']: fila for fila in pagina}
+            deudas = list(queryset.filter(
+                alumno_id__in=list(alumnos)
+            ).order_by(
+                'alumno__apellido', 'alumno__nombre', 'alumno_id', '-fecha_marcado_deudor'
+            ).values('alumno_id', *self.CAMPOS_DEUDA.values()))
+            for alumno_id, filas in groupby(deudas, key=lambda deuda: deuda['alumno_id']):
+                yield alumnos[alumno_id], (
+                    {clave: fila[campo] for clave, campo in self.CAMPOS_DEUDA.items()}
+                    for fila in filas
+                )
+        
+        def generar():
+            encabezado = {
+                'solo_pendientes': solo_pendientes,
+                'total_alumnos_con_deudas': total_alumnos,
+            }
+            if paginar:
+                encabezado.update({
+                    'page': page,
+                    'page_size': page_size,
+                    'total_paginas': (total_alumnos + page_size - 1) // page_size,
+                })
+            yield json.dumps(encabezado, cls=JSONEncoder)[:-1] + ', "alumnos": ['
+            alumnos = (
+                fila
+                for pagina in paginas
+                for fila in alumnos_con_deudas(pagina)
             )
+            for indice, (alumno, deudas) in enumerate(alumnos):
+                alumno_data = {
+                    'alumno_id': alumno['alumno_id'],
+                    'alumno_nombre': f"{alumno['alumno__nombre']} {alumno['alumno__apellido']}",
+                    'total_deudas': alumno['total_deudas'],
+                    'monto_total_adeudado': alumno['monto_total_adeudado'],
+                    'deudas': [self._deuda_data(deuda, alumno, hoy, campos) for deuda in deudas]
+                }
+                yield (', ' if indice else '') + json.dumps(alumno_data, cls=JSONEncoder)
+            yield ']}'
         
-        return Response({
-            'solo_pendientes': solo_pendientes,
-            'total_alumnos_con_deudas': len(deudas_por_alumno),
-            'alumnos': list(deudas_por_alumno.values())
-        })
+        return StreamingHttpResponse(generar(), content_type='application/json')
 
 class PagoCuotaViewSet(viewsets.ModelViewSet):
     queryset = PagoCuota.objects.all()
@@ -1741,50 +2618,165 @@ class PagoCuotaViewSet(viewsets.ModelViewSet):
         
         return queryset.select_related('alumno', 'cuota', 'cuota__curso', 'familiar')
     
-    @action(detail=False, methods=['get'], permission_classes=[IsMaestroOrDirectivo])
-    def estadisticas_pagos(self, request):
+    COLUMNAS_EXPORTACION = [
+        ('id', 'ID'),
+        ('cuota__curso__ciclo_lectivo__inicio__year', 'Ciclo'),
+        ('cuota__curso__nombre', 'Curso'),
+        ('cuota__año', 'Año'),
+        ('cuota__mes', 'Mes'),
+        ('cuota__monto', 'Monto cuota'),
+        ('alumno__dni', 'DNI alumno'),
+        ('alumno__apellido', 'Apellido'),
+        ('alumno__nombre', 'Nombre'),
+        ('familiar__apellido', 'Apellido familiar'),
+        ('familiar__nombre', 'Nombre familiar'),
+        ('fecha_pago', 'Fecha de pago'),
+        ('monto_pagado', 'Monto pagado'),
+        ('estado_pago', 'Estado'),
+        ('dias_atraso_pago', 'Días de atraso'),
+    ]
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsDirectivo])
+    def exportar(self, request):
         """
-        Obtiene estadísticas de los pagos realizados
+        Exporta los pagos en CSV o XLSX.
+        Parámetros: ciclo, formato=csv|xlsx y los filtros del listado
         """
+        formato, error = _formato_exportacion(request)
+        if error:
+            return error
+        
+        filtros, error = _parametros_enteros(request, ['ciclo'])
+        if error:
+            return error
+        
         queryset = self.get_queryset()
+        ciclo_id = filtros.get('ciclo')
+        if ciclo_id:
+            queryset = queryset.filter(cuota__curso__ciclo_lectivo_id=ciclo_id)
         
-        total_pagos = queryset.count()
-        pagos_a_tiempo = queryset.filter(estado_pago='a_tiempo').count()
-        pagos_con_atraso = queryset.filter(estado_pago='con_atraso').count()
+        filas = _en_bloques(
+            queryset.values(*[clave for clave, _ in self.COLUMNAS_EXPORTACION]),
+            ['fecha_pago', 'id']
+        )
         
-        # Monto total recaudado
-        monto_total = sum(float(pago.monto_pagado) for pago in queryset)
+        nombre = f'pagos_ciclo_{ciclo_id}' if ciclo_id else 'pagos'
+        return _exportar_filas(filas, self.COLUMNAS_EXPORTACION, nombre, formato)
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsDirectivo])
+    def importar(self, request):
+        """
+        Importación masiva de pagos. Acepta un archivo en `archivo` (csv, ndjson
+        o json; formato por extensión o parámetro `formato`) o un cuerpo JSON con
+        la lista de pagos. Las filas con errores se informan sin cortar la importación
+        """
+        archivo = request.FILES.get('archivo')
         
-        # Pagos por mes
-        pagos_por_mes = {}
-        for pago in queryset:
-            mes_key = pago.fecha_pago.strftime('%Y-%m')
-            if mes_key not in pagos_por_mes:
-                pagos_por_mes[mes_key] = {
-                    'cantidad': 0,
-                    'monto_total': 0,
-                    'a_tiempo': 0,
-                    'con_atraso': 0
-                }
+        try:
+            if archivo:
+                formato = request.data.get('formato') or detectar_formato(archivo.name)
+                if formato not in FORMATOS_IMPORTACION:
+                    return Response(
+                        {'error': f'Formato no soportado. Use: {", ".join(FORMATOS_IMPORTACION)}'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                filas = leer_filas(archivo, formato)
+            else:
+                pagos = request.data.get('pagos') if isinstance(request.data, dict) else request.data
+                if not isinstance(pagos, list):
+                    return Response(
+                        {'error': 'Envíe un archivo en "archivo" o una lista de pagos en "pagos"'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                filas = enumerate(
+                    (pago if isinstance(pago, dict) else None for pago in pagos),
+                    start=1
+                )
             
-            pagos_por_mes[mes_key]['cantidad'] += 1
-            pagos_por_mes[mes_key]['monto_total'] += float(pago.monto_pagado)
+            resultado = PagoCuota.importar(filas)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            return Response(
+                {'error': f'No se pudo leer el archivo: {str(e)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        resultado['message'] = (
+            f"Importación finalizada: {resultado['creados']} pagos creados, "
+            f"{len(resultado['errores'])} filas con errores"
+        )
+        return Response(resultado)
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsMaestroOrDirectivo])
+    def estadisticas_pagos(self, request):
+        """
+        Obtiene estadísticas de los pagos realizados.
+        Parámetro opcional agrupar_por=curso|estado para desglosar los totales.
+        """
+        dimensiones = {
+            'curso': ('cuota__curso__nombre', 'por_curso'),
+            'estado': ('estado_pago', 'por_estado'),
+        }
+        agrupar_por = request.query_params.get('agrupar_por')
+        if agrupar_por and agrupar_por not in dimensiones:
+            return Response(
+                {'error': 'agrupar_por inválido. Use: curso o estado'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        campos = ['mes']
+        if agrupar_por:
+            campos.append(dimensiones[agrupar_por][0])
+        
+        # Una sola consulta agregada por mes (y dimensión opcional)
+        filas = self.get_queryset().order_by().annotate(
+            mes=TruncMonth('fecha_pago')
+        ).values(*campos).annotate(
+            cantidad=Count('pk'),
+            monto_total=Sum('monto_pagado'),
+            a_tiempo=Count('pk', filter=Q(estado_pago='a_tiempo')),
+            con_atraso=Count('pk', filter=Q(estado_pago='con_atraso'))
+        ).order_by(*campos)
+        
+        def acumular(destino, fila):
+            destino['cantidad'] += fila['cantidad']
+            destino['monto_total'] += fila['monto_total']
+            destino['a_tiempo'] += fila['a_tiempo']
+            destino['con_atraso'] += fila['con_atraso']
+        
+        def totales_vacios():
+            return {'cantidad': 0, 'monto_total': Decimal('0.00'), 'a_tiempo': 0, 'con_atraso': 0}
+        
+        totales = totales_vacios()
+        pagos_por_mes = {}
+        desglose = {}
+        
+        for fila in filas:
+            mes_key = fila['mes'].strftime('%Y-%m')
+            acumular(totales, fila)
+            acumular(pagos_por_mes.setdefault(mes_key, totales_vacios()), fila)
             
-            if pago.estado_pago == 'a_tiempo':
-                pagos_por_mes[mes_key]['a_tiempo'] += 1
-            else:
-                pagos_por_mes[mes_key]['con_atraso'] += 1
+            if agrupar_por:
+                grupo = desglose.setdefault(fila[campos[1]], dict(totales_vacios(), por_mes={}))
+                acumular(grupo, fila)
+                acumular(grupo['por_mes'].setdefault(mes_key, totales_vacios()), fila)
         
-        return Response({
+        total_pagos = totales['cantidad']
+        pagos_a_tiempo = totales['a_tiempo']
+        
+        respuesta = {
             'resumen_general': {
                 'total_pagos': total_pagos,
                 'pagos_a_tiempo': pagos_a_tiempo,
-                'pagos_con_atraso': pagos_con_atraso,
+                'pagos_con_atraso': totales['con_atraso'],
                 'porcentaje_a_tiempo': round((pagos_a_tiempo / total_pagos * 100) if total_pagos > 0 else 0, 2),
-                'monto_total_recaudado': monto_total
+                'monto_total_recaudado': totales['monto_total']
             },
             'por_mes': pagos_por_mes
-        })
+        }
+        if agrupar_por:
+            respuesta[dimensiones[agrupar_por][1]] = desglose
+        
+        return Response(respuesta)
 
 
 @api_view(['GET'])
@@ -3,6 +3,15 @@ ASGI config for projectjardinAPI project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Los eventos en vivo de avisos (/avisos-directivo/eventos/) solo funcionan
+sirviendo este módulo. gunicorn no trae un worker ASGI propio: hay que usar
+el de uvicorn (incluido en requirements.txt) como comando de inicio:
+
+    gunicorn -k uvicorn.workers.UvicornWorker projectjardinAPI.asgi
+
+Con el comando WSGI (gunicorn projectjardinAPI.wsgi) el resto de la API
+funciona igual, pero esa ruta responde 501.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
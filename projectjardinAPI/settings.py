@@ -80,7 +80,10 @@ DATABASES = {
         'PORT': '5432',
         'OPTIONS': {
             'sslmode': 'require'
-        }
+        },
+        # El host -pooler es PgBouncer en modo transacción: los cursores del
+        # lado del servidor no sobreviven entre transacciones
+        'DISABLE_SERVER_SIDE_CURSORS': True,
     }
 }
 